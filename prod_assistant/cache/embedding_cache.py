@@ -0,0 +1,162 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+def normalize_text(text: str, lowercase: bool = False) -> str:
+    """Cache key text: collapsed whitespace, optionally lowercased (for uncased models)."""
+    text = re.sub(r"\s+", " ", text).strip()
+    return text.lower() if lowercase else text
+
+
+class EmbeddingCache:
+    """
+    Bounded, thread-safe LRU of embedding vectors, shared by every
+    CachedEmbeddings in the process.
+
+    Keys combine the model name, the call kind (query / document) and the
+    normalized text; vectors are kept as float32 arrays. With `sqlite_path`
+    set, new vectors are written through to SQLite and the most recently used
+    entries are loaded back on startup.
+    """
+
+    def __init__(self, max_entries: int = 10000, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = self._open(sqlite_path) if sqlite_path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ---------- Persistence ----------
+    def _open(self, path: str) -> sqlite3.Connection:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache "
+            "(key TEXT PRIMARY KEY, vector BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        rows = db.execute(
+            "SELECT key, vector FROM embedding_cache ORDER BY created_at DESC LIMIT ?", (self.max_entries,)
+        ).fetchall()
+        for key, blob in reversed(rows):
+            self._entries[key] = np.frombuffer(blob, dtype=np.float32)
+        log.info("Embedding cache loaded", path=path, entries=len(self._entries))
+        return db
+
+    def _persist(self, items: Sequence[Tuple[str, np.ndarray]], evicted: List[str]):
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embedding_cache (key, vector, created_at) VALUES (?, ?, ?)",
+            [(key, vector.tobytes(), now) for key, vector in items],
+        )
+        self._db.executemany("DELETE FROM embedding_cache WHERE key = ?", [(k,) for k in evicted])
+        self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # ---------- Lookup / store ----------
+    def get_many(self, keys: Sequence[str]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            found = []
+            for key in keys:
+                vector = self._entries.get(key)
+                if vector is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                else:
+                    self.misses += 1
+                found.append(vector)
+            return found
+
+    def put_many(self, items: Sequence[Tuple[str, np.ndarray]]):
+        with self._lock:
+            for key, vector in items:
+                self._entries[key] = vector
+                self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+                self.evictions += 1
+            if self._db is not None:
+                self._persist(items, evicted)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "persistent": self._db is not None,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that serves repeated texts from an EmbeddingCache and
+    sends only the misses (de-duplicated, in one batch) to the wrapped model.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: str, lowercase: bool = False):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+        self.lowercase = lowercase
+
+    def _keys(self, kind: str, texts: Sequence[str]) -> List[str]:
+        return [f"{self.model_name}\x1f{kind}\x1f{normalize_text(t, self.lowercase)}" for t in texts]
+
+    def _embed(self, kind: str, texts: List[str], embed_fn) -> List[List[float]]:
+        keys = self._keys(kind, texts)
+        vectors = self.cache.get_many(keys)
+        missing: Dict[str, str] = {}  # key -> first text with that key
+        for key, text, vector in zip(keys, texts, vectors):
+            if vector is None:
+                missing.setdefault(key, text)
+        if missing:
+            computed = embed_fn(list(missing.values()))
+            fresh = {key: np.asarray(v, dtype=np.float32) for key, v in zip(missing, computed)}
+            self.cache.put_many(list(fresh.items()))
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return [vector.tolist() for vector in vectors]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self._embed("doc", list(texts), self.embeddings.embed_documents)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed("query", [text], lambda texts: [self.embeddings.embed_query(texts[0])])[0]
+
+
+_shared_cache: Optional[EmbeddingCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_embedding_cache(max_entries: int = 10000, sqlite_path: Optional[str] = None) -> EmbeddingCache:
+    """Process-wide EmbeddingCache; settings apply on first call."""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = EmbeddingCache(max_entries=max_entries, sqlite_path=sqlite_path)
+        return _shared_cache
@@ -0,0 +1,191 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import FrozenSet, Optional
+
+import numpy as np
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+DEFAULT_INVALIDATION_FILE = "data/.catalog_version"
+
+# Tokens with a digit (prices, sizes, model numbers such as "16", "128gb", "s24") and
+# variant words: embeddings barely separate "iPhone 15" from "iPhone 16", these do.
+_KEY_TOKEN = re.compile(r"\b(?:\w*\d(?:[\w.]*\w)?|pro|max|plus|ultra|mini|lite|fe)\b")
+
+
+def key_tokens(query: str) -> FrozenSet[str]:
+    """Numeric and model tokens of a query that must match for a cached answer to apply."""
+    return frozenset(_KEY_TOKEN.findall(query.lower().replace(",", "")))
+
+
+def mark_catalog_updated(invalidation_file: str = DEFAULT_INVALIDATION_FILE):
+    """
+    Signal every SemanticCache watching `invalidation_file` that the product
+    catalog changed. Ingestion runs in a different process than the API, so
+    the signal is the file's mtime rather than an in-memory call.
+    """
+    path = Path(invalidation_file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(str(time.time()), encoding="utf-8")
+    log.info("Catalog update marked, semantic caches will be invalidated", file=str(path))
+
+
+class _Entry:
+    __slots__ = ("query", "answer", "created_at", "key")
+
+    def __init__(self, query: str, answer: str, created_at: float):
+        self.query = query
+        self.answer = answer
+        self.created_at = created_at
+        self.key = key_tokens(query)
+
+
+class SemanticCache:
+    """
+    Answer cache keyed on normalized query embeddings.
+
+    A lookup is a hit when the cosine similarity between the query vector and
+    a cached vector reaches `similarity_threshold`. Entries expire after
+    `ttl_seconds`, the least recently used entry is evicted once
+    `max_entries` is reached, and the whole cache is cleared when
+    `invalidation_file` is touched by the ingestion pipeline. With
+    `match_key_tokens`, a hit also needs the same numbers and model tokens
+    (see `key_tokens`) as the cached query, so "price of iPhone 15" is not
+    served the answer for "price of iPhone 16". `max_entries <= 0` disables
+    the cache: nothing is stored and every lookup misses.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 1000,
+        invalidation_file: Optional[str] = DEFAULT_INVALIDATION_FILE,
+        match_key_tokens: bool = True,
+    ):
+        self.similarity_threshold = similarity_threshold
+        self.match_key_tokens = match_key_tokens
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(0, max_entries)
+        self.invalidation_file = invalidation_file
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # (max_entries, dim) slot matrix
+        self._entries: "OrderedDict[int, _Entry]" = OrderedDict()  # slot -> entry, LRU order
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+        self._catalog_stamp = self._read_stamp()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.key_mismatches = 0
+
+    # ---------- Invalidation ----------
+    def _read_stamp(self) -> Optional[int]:
+        if not self.invalidation_file:
+            return None
+        try:
+            return os.stat(self.invalidation_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _check_catalog(self):
+        stamp = self._read_stamp()
+        if stamp != self._catalog_stamp:
+            self._catalog_stamp = stamp
+            self._clear()
+            self.invalidations += 1
+            log.info("Semantic cache invalidated after catalog update")
+
+    def _clear(self):
+        self._entries.clear()
+        self._free_slots = list(range(self.max_entries - 1, -1, -1))
+
+    def invalidate(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._clear()
+            self.invalidations += 1
+
+    # ---------- Lookup / store ----------
+    def _best_match(self, vector: np.ndarray, key: Optional[FrozenSet[str]] = None):
+        """Most similar entry, restricted to entries with the same key tokens when `key` is given."""
+        if key is None:
+            slots = list(self._entries)
+        else:
+            slots = [slot for slot, entry in self._entries.items() if entry.key == key]
+        if not slots:
+            return None, 0.0
+        slots = np.asarray(slots, dtype=np.int64)
+        scores = self._vectors[slots] @ vector
+        best = int(np.argmax(scores))
+        return int(slots[best]), float(scores[best])
+
+    def _key(self, query: Optional[str]) -> Optional[FrozenSet[str]]:
+        return key_tokens(query) if self.match_key_tokens and query is not None else None
+
+    def _evict(self, slot: int):
+        del self._entries[slot]
+        self._free_slots.append(slot)
+
+    def lookup(self, vector: np.ndarray, query: Optional[str] = None) -> Optional[str]:
+        """
+        Return the cached answer for a normalized query vector, or None on a
+        miss. Pass the query text to require matching key tokens.
+        """
+        with self._lock:
+            self._check_catalog()
+            key = self._key(query)
+            slot, score = self._best_match(vector, key)
+            if key is not None and (slot is None or score < self.similarity_threshold):
+                _, unguarded = self._best_match(vector)
+                if unguarded >= self.similarity_threshold:
+                    self.key_mismatches += 1
+            if slot is not None and score >= self.similarity_threshold:
+                entry = self._entries[slot]
+                if time.time() - entry.created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    return entry.answer
+                self._evict(slot)
+            self.misses += 1
+            return None
+
+    def put(self, vector: np.ndarray, query: str, answer: str):
+        """Store an answer under a normalized query vector."""
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._check_catalog()
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+
+            slot, score = self._best_match(vector, self._key(query))
+            if slot is None or score < self.similarity_threshold:
+                if not self._free_slots:
+                    lru_slot = next(iter(self._entries))
+                    self._evict(lru_slot)
+                    self.evictions += 1
+                slot = self._free_slots.pop()
+
+            self._vectors[slot] = vector
+            self._entries[slot] = _Entry(query, answer, time.time())
+            self._entries.move_to_end(slot)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "key_mismatches": self.key_mismatches,
+        }
@@ -0,0 +1,152 @@
+import asyncio
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a search query: lowercase, single spaces, no surrounding punctuation."""
+    return re.sub(r"\s+", " ", query).strip(" \t\n?!.,").lower()
+
+
+class WebSearchCache:
+    """
+    TTL + LRU cache for web search results keyed on the normalized query.
+
+    Entries live in memory (at most `max_entries`, least recently used
+    evicted first) and, when `sqlite_path` is set, are written through to a
+    SQLite file so they survive restarts. Concurrent lookups of the same
+    query while a search is in flight share that single search.
+    """
+
+    def __init__(self, ttl_seconds: float = 21600, max_entries: int = 2000, sqlite_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()  # key -> (result, created_at)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._db_lock = threading.Lock()
+        self._db = self._open(sqlite_path) if sqlite_path else None
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    # ---------- Persistence ----------
+    def _open(self, path: str) -> sqlite3.Connection:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS web_search_cache "
+            "(query TEXT PRIMARY KEY, result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        db.execute("DELETE FROM web_search_cache WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+        db.commit()
+
+        rows = db.execute(
+            "SELECT query, result, created_at FROM web_search_cache ORDER BY created_at DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        for query, result, created_at in reversed(rows):
+            self._entries[query] = (result, created_at)
+        log.info("Web search cache loaded", path=path, entries=len(self._entries))
+        return db
+
+    def _persist(self, key: str, result: str, created_at: float, evicted: list):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO web_search_cache (query, result, created_at) VALUES (?, ?, ?)",
+                (key, result, created_at),
+            )
+            self._db.executemany("DELETE FROM web_search_cache WHERE query = ?", [(k,) for k in evicted])
+            self._db.commit()
+
+    def close(self):
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    # ---------- Lookup / store ----------
+    def get(self, query: str) -> Optional[str]:
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.time() - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return entry[0]
+            del self._entries[key]
+        return None
+
+    async def put(self, query: str, result: str):
+        key = normalize_query(query)
+        created_at = time.time()
+        self._entries[key] = (result, created_at)
+        self._entries.move_to_end(key)
+
+        evicted = []
+        while len(self._entries) > self.max_entries:
+            evicted.append(self._entries.popitem(last=False)[0])
+            self.evictions += 1
+        if self._db is not None:
+            await asyncio.to_thread(self._persist, key, result, created_at, evicted)
+
+    async def get_or_fetch(self, query: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        """Return the cached result, joining an in-flight search or running `fetch()` on a miss."""
+        cached = self.get(query)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        key = normalize_query(query)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise  # this caller was cancelled
+                # The caller running the search was cancelled; search again ourselves.
+                return await self.get_or_fetch(query, fetch)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+            await self.put(query, result)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Failures are not cached; waiting callers see the same error.
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "persistent": self._db is not None,
+        }
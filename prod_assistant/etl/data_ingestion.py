@@ -3,13 +3,17 @@ import pandas as pd
 from dotenv import load_dotenv
 from typing import List
 from langchain_core.documents import Document
-from langchain_astradb import AstraDBVectorStore
 from prod_assistant.utils.model_loader import ModelLoader
 from prod_assistant.utils.config_loader import load_config
+from prod_assistant.retriever.vector_store import create_vector_store, vector_store_backend
+from prod_assistant.retriever.bm25_index import bm25_index_from_config
+from prod_assistant.retriever.query_filters import numeric_metadata
+from prod_assistant.cache.semantic_cache import mark_catalog_updated
+from prod_assistant.etl.manifest import IngestionDiff, IngestionManifest, document_id
 
 class DataIngestion:
     """
-    Class to handle data transformation and ingestion into AstraDB vector store.
+    Class to handle data transformation and ingestion into the vector store (AstraDB or local).
     """
 
     def __init__(self):
@@ -18,10 +22,10 @@ class DataIngestion:
         """
         print("Initializing DataIngestion pipeline...")
         self.model_loader=ModelLoader()
+        self.config=load_config()
         self._load_env_variables()
         self.csv_path = self._get_csv_path()
         self.product_data = self._load_csv()
-        self.config=load_config()
 
     def _load_env_variables(self):
         """
@@ -29,7 +33,9 @@ class DataIngestion:
         """
         load_dotenv()
         
-        required_vars = ["GOOGLE_API_KEY", "ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
+        required_vars = ["GOOGLE_API_KEY"]
+        if vector_store_backend(self.config) == "astra":
+            required_vars += ["ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
         
         missing_vars = [var for var in required_vars if os.getenv(var) is None]
         if missing_vars:
@@ -90,7 +96,9 @@ class DataIngestion:
                     "product_title": entry["product_title"],
                     "rating": entry["rating"],
                     "total_reviews": entry["total_reviews"],
-                    "price": entry["price"]
+                    "price": entry["price"],
+                    # Numeric copies for range filters ("under 50k", "above 4 stars")
+                    **numeric_metadata(entry["price"], entry["rating"], entry["total_reviews"]),
             }
             # Include price/title/rating in content so retriever+compressor can match price queries.
             content_parts = [
@@ -100,35 +108,101 @@ class DataIngestion:
                 f"Total Reviews: {entry['total_reviews']}",
                 f"Reviews: {entry['top_reviews']}",
             ]
-            doc = Document(page_content=" | ".join(content_parts), metadata=metadata)
+            # Stable id, so re-ingesting a product replaces its document instead of duplicating it.
+            doc = Document(id=document_id(entry["product_id"], entry["product_title"]),
+                           page_content=" | ".join(content_parts), metadata=metadata)
             documents.append(doc)
 
         print(f"Transformed {len(documents)} documents.")
         return documents
 
-    def store_in_vector_db(self, documents: List[Document]):
+    def _manifest_target(self) -> str:
+        """Store + embedding model the manifest hashes belong to."""
+        store_cfg = self.config.get("vector_store", {})
+        if vector_store_backend(self.config) == "local":
+            store = f"local:{store_cfg.get('local_path', 'data/vector_store')}"
+        else:
+            store = f"astra:{self.db_keyspace}/{self.config['astra_db']['collection_name']}"
+        embedding_cfg = self.config["embedding_model"]
+        return f"{store}|{embedding_cfg['model_name']}:{embedding_cfg.get('backend', 'torch')}"
+
+    def _check_unchanged(self, vstore, diff: IngestionDiff, sample_size: int = 20):
+        """
+        Re-ingest everything if a sample of "unchanged" ids is missing from the
+        store (e.g. the collection was dropped after the manifest was written).
         """
-        Store documents into AstraDB vector store.
+        sample = [doc.id for doc in diff.unchanged[:sample_size]]
+        if not sample:
+            return
+        try:
+            found = {doc.id for doc in vstore.get_by_ids(sample)}
+        except NotImplementedError:
+            return
+        if len(found) < len(sample):
+            print("Vector store is missing documents recorded in the ingestion manifest, re-ingesting them all.")
+            diff.added += diff.unchanged
+            diff.unchanged = []
+
+    def store_in_vector_db(self, documents: List[Document], delete_missing: bool = None, full: bool = False):
+        """
+        Upsert new and changed documents into the configured vector store.
+
+        Content hashes from the previous run (`ingestion.manifest_path`) decide
+        which documents are skipped; with `delete_missing`, products no longer
+        in the CSV are deleted. `full` ignores the manifest and re-embeds everything.
         """
-        collection_name=self.config["astra_db"]["collection_name"]
-        vstore = AstraDBVectorStore(
-            embedding= self.model_loader.load_embeddings(),
-            collection_name=collection_name,
+        ingestion_cfg = self.config.get("ingestion", {})
+        if delete_missing is None:
+            delete_missing = ingestion_cfg.get("delete_missing", False)
+        manifest = IngestionManifest(ingestion_cfg.get("manifest_path", "data/ingestion_manifest.json"),
+                                     self._manifest_target())
+        diff = manifest.diff(documents, delete_missing=delete_missing)
+        if full:
+            diff.added, diff.updated, diff.unchanged = diff.upserts + diff.unchanged, [], []
+
+        vstore = create_vector_store(
+            self.config,
+            self.model_loader.load_embeddings(cached=False),
             api_endpoint=self.db_api_endpoint,
             token=self.db_application_token,
             namespace=self.db_keyspace,
         )
-
-        inserted_ids = vstore.add_documents(documents)
-        print(f"Successfully inserted {len(inserted_ids)} documents into AstraDB.")
-        return vstore, inserted_ids
-
-    def run_pipeline(self):
+        self._check_unchanged(vstore, diff)
+
+        upserts = diff.upserts
+        if upserts:
+            inserted_ids = vstore.add_documents(upserts, ids=[doc.id for doc in upserts])
+            print(f"Upserted {len(inserted_ids)} documents into {vector_store_backend(self.config)} vector store.")
+        if diff.deleted:
+            vstore.delete(ids=diff.deleted)
+            print(f"Deleted {len(diff.deleted)} documents no longer in the catalog.")
+
+        # Keep the BM25 index in step with the vector store (incremental, same ids).
+        lexical_index = bm25_index_from_config(self.config)
+        if lexical_index is not None:
+            missing = [doc for doc in diff.unchanged if doc.id not in lexical_index]
+            if upserts or missing:
+                lexical_index.add_documents(upserts + missing, ids=[doc.id for doc in upserts + missing])
+            if diff.deleted:
+                lexical_index.delete(diff.deleted)
+            print(f"BM25 index: {lexical_index.count} documents.")
+
+        manifest.apply(diff)
+        manifest.save()
+        print(f"Ingestion diff: {diff.summary()}")
+        return vstore, diff
+
+    def run_pipeline(self, delete_missing: bool = None, full: bool = False):
         """
-        Run the full data ingestion pipeline: transform data and store into vector DB.
+        Run the full data ingestion pipeline: transform data and upsert changes into the vector DB.
         """
         documents = self.transform_data()
-        vstore, _ = self.store_in_vector_db(documents)
+        vstore, diff = self.store_in_vector_db(documents, delete_missing=delete_missing, full=full)
+
+        # Cached answers may reference the old catalog.
+        if diff.upserts or diff.deleted:
+            cache_cfg = self.config.get("semantic_cache", {})
+            mark_catalog_updated(cache_cfg.get("invalidation_file", "data/.catalog_version"))
 
         #Optionally do a quick search
         query = "Can you tell me the low budget iphone?"
@@ -140,5 +214,13 @@ class DataIngestion:
 
 # Run if this file is executed directly
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Incrementally ingest data/product_reviews.csv")
+    parser.add_argument("--delete-missing", action="store_true", default=None,
+                        help="delete products that are no longer in the CSV (default: ingestion.delete_missing)")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-embed every row")
+    args = parser.parse_args()
+
     ingestion = DataIngestion()
-    ingestion.run_pipeline()
+    ingestion.run_pipeline(delete_missing=args.delete_missing, full=args.full)
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from langchain_core.documents import Document
+
+
+def document_id(product_id, product_title: str = "") -> str:
+    """Stable id for a product row: its product_id, or a hash of the title when the id is missing."""
+    if product_id is not None and str(product_id).strip() and str(product_id).lower() != "nan":
+        return str(product_id).strip()
+    return "title-" + hashlib.sha1(str(product_title).encode("utf-8")).hexdigest()[:16]
+
+
+def content_hash(doc: Document) -> str:
+    """Hash of everything that ends up in the store: page content and metadata."""
+    payload = json.dumps({"text": doc.page_content, "metadata": doc.metadata}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestionDiff:
+    """Documents to upsert and ids to delete for one ingestion run."""
+
+    added: List[Document] = field(default_factory=list)
+    updated: List[Document] = field(default_factory=list)
+    unchanged: List[Document] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    duplicates: int = 0
+
+    @property
+    def upserts(self) -> List[Document]:
+        return self.added + self.updated
+
+    def summary(self) -> str:
+        text = (f"{len(self.added)} added, {len(self.updated)} updated, "
+                f"{len(self.unchanged)} unchanged, {len(self.deleted)} deleted")
+        if self.duplicates:
+            text += f" ({self.duplicates} duplicate product rows skipped, last row wins)"
+        return text
+
+
+class IngestionManifest:
+    """
+    JSON record of the content hash ingested for every document id.
+
+    `target` identifies the store and embedding model the hashes belong to; a
+    manifest written for another target is ignored, so switching collection,
+    backend or embedding model re-ingests everything.
+    """
+
+    def __init__(self, path: str, target: str):
+        self.path = Path(path)
+        self.target = target
+        self.hashes: Dict[str, str] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("target") == target:
+                self.hashes = data.get("documents", {})
+            else:
+                print(f"Ingestion manifest was written for '{data.get('target')}', re-ingesting everything.")
+
+    def diff(self, documents: Sequence[Document], delete_missing: bool = False) -> IngestionDiff:
+        """Compare documents (with ids set) against the manifest."""
+        latest: Dict[str, Document] = {}
+        for doc in documents:
+            latest[doc.id] = doc
+        result = IngestionDiff(duplicates=len(documents) - len(latest))
+        for doc_id, doc in latest.items():
+            previous = self.hashes.get(doc_id)
+            if previous is None:
+                result.added.append(doc)
+            elif previous != content_hash(doc):
+                result.updated.append(doc)
+            else:
+                result.unchanged.append(doc)
+        if delete_missing:
+            result.deleted = [doc_id for doc_id in self.hashes if doc_id not in latest]
+        return result
+
+    def apply(self, diff: IngestionDiff):
+        """Record a diff after its upserts and deletes went through."""
+        for doc in diff.upserts:
+            self.hashes[doc.id] = content_hash(doc)
+        for doc_id in diff.deleted:
+            self.hashes.pop(doc_id, None)
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps({"target": self.target, "documents": self.hashes}, indent=0), encoding="utf-8")
+        os.replace(tmp, self.path)
@@ -5,8 +5,17 @@ from ragas.llms import LangchainLLMWrapper
 from ragas.embeddings import LangchainEmbeddingsWrapper
 from ragas.metrics import LLMContextPrecisionWithoutReference, ResponseRelevancy
 import grpc.experimental.aio as grpc_aio
-grpc_aio.init_grpc_aio()
-model_loader=ModelLoader()
+
+_model_loader = None
+
+
+def get_model_loader() -> ModelLoader:
+    """ModelLoader for the evaluator models, created (with gRPC aio) on first evaluation."""
+    global _model_loader
+    if _model_loader is None:
+        grpc_aio.init_grpc_aio()
+        _model_loader = ModelLoader()
+    return _model_loader
 
 
 def evaluate_context_precision(query, response, retrieved_context):
@@ -18,7 +27,7 @@ def evaluate_context_precision(query, response, retrieved_context):
         )
 
         async def main():
-            llm = model_loader.load_llm()
+            llm = get_model_loader().load_llm()
             evaluator_llm = LangchainLLMWrapper(llm)
             context_precision = LLMContextPrecisionWithoutReference(llm=evaluator_llm)
             result = await context_precision.single_turn_ascore(sample)
@@ -37,9 +46,9 @@ def evaluate_response_relevancy(query, response, retrieved_context):
         )
 
         async def main():
-            llm = model_loader.load_llm()
+            llm = get_model_loader().load_llm()
             evaluator_llm = LangchainLLMWrapper(llm)
-            embedding_model = model_loader.load_embeddings()
+            embedding_model = get_model_loader().load_embeddings()
             evaluator_embeddings = LangchainEmbeddingsWrapper(embedding_model)
             scorer = ResponseRelevancy(llm=evaluator_llm, embeddings=evaluator_embeddings)
             result = await scorer.single_turn_ascore(sample)
@@ -1,16 +1,14 @@
 import asyncio
+import json
 from langchain_mcp_adapters.client import MultiServerMCPClient
 
 
 
 async def main():
     client = MultiServerMCPClient({
-        "hybrid_search": {   # server name
-            "command": "python",
-            "args": [
-                r"prod_assistant/mcp_servers/product_search_saver.py"
-            ],  
-            "transport": "streamable-http",
+        "hybrid_search": {   # server name (start product_search_saver.py first)
+            "url": "http://localhost:8001/mcp",
+            "transport": "streamable_http",
         }
     })
 
@@ -21,6 +19,7 @@ async def main():
     # Pick tools by name
     retriever_tool = next(t for t in tools if t.name == "get_product_info")
     web_tool = next(t for t in tools if t.name == "web_search")
+    batch_tool = next(t for t in tools if t.name == "get_product_info_batch")
 
     query = "iPhone 17?"
     retriever_result = await retriever_tool.ainvoke({"query": query})
@@ -32,5 +31,11 @@ async def main():
         web_result = await web_tool.ainvoke({"query": query})
         print("Web Search Result:\n", web_result)
 
+    # --- Step 3: Several lookups (e.g. a comparison) in one batched call ---
+    queries = ["iPhone 16", "Samsung Galaxy S24"]
+    batch_result = json.loads(await batch_tool.ainvoke({"queries": queries}))
+    for q in queries:
+        print(f"\nBatch Result for {q!r}:\n", batch_result.get(q))
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,58 @@
+import asyncio
+from typing import Dict, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from prod_assistant.retriever.retrieval import Retriever
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+class InProcessTools:
+    """
+    The hybrid_search tools called directly in this process.
+
+    Exposes the same get_tools/get_tool/aclose/stats surface as MCPSessionPool,
+    but each call runs the product_search_saver tool function itself: no HTTP
+    hop, no JSON-RPC, and the retriever shares the caller's loaded models.
+    """
+
+    def __init__(self, retriever: Optional[Retriever] = None):
+        # Imported here so HTTP deployments never build the server-side state.
+        from prod_assistant.mcp_servers import product_search_saver as server
+
+        if retriever is not None:
+            server.use_retriever(retriever)
+        self.server = server
+        self._tools: Dict[str, BaseTool] = {
+            fn.__name__: StructuredTool.from_function(coroutine=fn)
+            for fn in (server.get_product_info, server.get_product_info_batch, server.web_search)
+        }
+        self._warm = False
+        self._warm_lock = asyncio.Lock()
+
+    async def get_tools(self) -> Dict[str, BaseTool]:
+        """Tools by name; the first call loads the vector store and compressor off the event loop."""
+        async with self._warm_lock:
+            if not self._warm:
+                try:
+                    await asyncio.to_thread(self.server.get_retriever().load_retriever)
+                    self._warm = True
+                except Exception as e:
+                    # get_product_info retries the load and reports the error per call.
+                    log.error("In-process retriever warm-up failed", error=str(e))
+        return self._tools
+
+    async def get_tool(self, name: str) -> Optional[BaseTool]:
+        return self._tools.get(name)
+
+    async def aclose(self):
+        pass
+
+    def stats(self) -> dict:
+        cache = self.server.web_cache
+        return {
+            "transport": "inprocess",
+            "tools": list(self._tools),
+            "retriever": self.server.retrieval_limiter.stats(),
+            "web_search_cache": cache.stats() if cache else None,
+        }
@@ -1,19 +1,58 @@
 import os
+import json
+from typing import List, Optional
 from mcp.server.fastmcp import FastMCP
 from prod_assistant.retriever.retrieval import Retriever
-from langchain_community.tools import DuckDuckGoSearchRun
+from prod_assistant.utils.config_loader import load_config
+from prod_assistant.utils.concurrency import get_limiter, limiter_settings
+from prod_assistant.cache.web_search_cache import WebSearchCache
 
 # Initialize MCP server
 mcp = FastMCP("hybrid_search")
 
-# Load retriever once
-retriever_obj = Retriever()
-retriever = retriever_obj.load_retriever()
+# Retriever is created on first use, or shared by the in-process transport via use_retriever()
+retriever_obj: Optional[Retriever] = None
 
-# LangChain DuckDuckGo tool
-duckduckgo = DuckDuckGoSearchRun()
+# LangChain DuckDuckGo tool, created on first web search (langchain_community is slow to import)
+duckduckgo = None
+
+# Concurrency limits so many agents can share one server without unbounded fan-out
+server_cfg = load_config().get("mcp_server", {})
+retrieval_limiter = get_limiter("retriever", **limiter_settings(server_cfg.get("retriever", {})))
+web_search_limiter = get_limiter("web_search", **limiter_settings(server_cfg.get("web_search", {})))
+
+# Web search results cache (TTL + LRU, optionally persisted to SQLite)
+cache_cfg = server_cfg.get("web_search_cache", {})
+web_cache = None
+if cache_cfg.get("enabled", True):
+    web_cache = WebSearchCache(
+        ttl_seconds=cache_cfg.get("ttl_seconds", 21600),
+        max_entries=cache_cfg.get("max_entries", 2000),
+        sqlite_path=cache_cfg.get("sqlite_path"),
+    )
 
 # ---------- Helpers ----------
+def get_duckduckgo():
+    """Return the shared DuckDuckGo tool, creating it on first use."""
+    global duckduckgo
+    if duckduckgo is None:
+        from langchain_community.tools import DuckDuckGoSearchRun
+
+        duckduckgo = DuckDuckGoSearchRun()
+    return duckduckgo
+
+def get_retriever() -> Retriever:
+    """Return the shared Retriever, creating it on first use."""
+    global retriever_obj
+    if retriever_obj is None:
+        retriever_obj = Retriever()
+    return retriever_obj
+
+def use_retriever(retriever: Retriever):
+    """Serve the tools from an existing Retriever (and its loaded models)."""
+    global retriever_obj
+    retriever_obj = retriever
+
 def format_docs(docs) -> str:
     """Format retriever docs into readable context."""
     if not docs:
@@ -35,7 +74,10 @@ def format_docs(docs) -> str:
 async def get_product_info(query: str) -> str:
     """Retrieve product information for a given query from local retriever."""
     try:
-        docs = retriever.invoke(query)
+        # ainvoke keeps the event loop free: AstraDB and the LLM filter are awaited,
+        # the embedding runs in the default thread pool.
+        retriever = get_retriever().load_retriever()
+        docs = await retrieval_limiter.call(lambda: retriever.ainvoke(query))
         context = format_docs(docs)
         if not context.strip():
             return "No local results found."
@@ -43,11 +85,28 @@ async def get_product_info(query: str) -> str:
     except Exception as e:
         return f"Error retrieving product info: {str(e)}"
 
+@mcp.tool()
+async def get_product_info_batch(queries: List[str]) -> str:
+    """Retrieve product information for several queries at once; returns a JSON object keyed by query."""
+    try:
+        results = await retrieval_limiter.call(lambda: get_retriever().abatch_retrieve(queries))
+        return json.dumps({
+            query: format_docs(docs) or "No local results found."
+            for query, docs in results.items()
+        })
+    except Exception as e:
+        return json.dumps({query: f"Error retrieving product info: {str(e)}" for query in queries})
+
 @mcp.tool()
 async def web_search(query: str) -> str:
     """Search the web using DuckDuckGo if retriever has no results."""
+    async def search():
+        return await web_search_limiter.call(lambda: get_duckduckgo().ainvoke(query))
+
     try:
-        return duckduckgo.run(query)
+        if web_cache is not None:
+            return await web_cache.get_or_fetch(query, search)
+        return await search()
     except Exception as e:
         return f"Error during web search: {str(e)}"
 
@@ -56,6 +115,8 @@ if __name__ == "__main__":
     # Run MCP on a different port than the main FastAPI app to avoid conflicts.
     # Never read platform PORT (typically 8000) to prevent collisions.
     port = int(os.getenv("MCP_PORT", os.getenv("MCP_SERVER_PORT", "8001")))
+    # Load models and the vector store before accepting connections.
+    get_retriever().load_retriever()
     try:
         mcp.run(transport="streamable-http", port=port)
     except TypeError:
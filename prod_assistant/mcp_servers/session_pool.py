@@ -0,0 +1,150 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+from langchain_core.tools import BaseTool, ToolException
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+class PooledTool:
+    """Handle to an MCP tool whose calls go through an MCPSessionPool."""
+
+    def __init__(self, pool: "MCPSessionPool", name: str):
+        self.pool = pool
+        self.name = name
+
+    async def ainvoke(self, args: Dict[str, Any]) -> Any:
+        return await self.pool.call(self.name, args)
+
+
+class MCPSessionPool:
+    """
+    One long-lived MCP session to a server, shared by every tool call.
+
+    An owner task opens `client.session(server_name)`, discovers the tools
+    once per connection, pings the server every `keepalive_seconds` and
+    reconnects (with backoff) when the session fails. Tool calls reuse the
+    open session, at most `max_concurrent_calls` at a time, and are retried
+    once on a fresh session if the connection broke underneath them.
+    """
+
+    def __init__(self, client: MultiServerMCPClient, server_name: str, max_concurrent_calls: int = 16,
+                 keepalive_seconds: float = 30, connect_timeout: float = 10, max_backoff_seconds: float = 30):
+        self.client = client
+        self.server_name = server_name
+        self.max_concurrent_calls = max_concurrent_calls
+        self.keepalive_seconds = keepalive_seconds
+        self.connect_timeout = connect_timeout
+        self.max_backoff_seconds = max_backoff_seconds
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._tools: Dict[str, BaseTool] = {}
+        self._generation = 0
+
+        self.connects = 0
+        self.failures = 0
+        self.calls = 0
+        self.in_flight = 0
+
+    # ---------- Connection owner ----------
+    def _ensure_started(self):
+        # The session's streams belong to the loop that opened them; restart the
+        # owner when called from a new loop (e.g. successive asyncio.run calls).
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._connected = asyncio.Event()
+            self._reconnect = asyncio.Event()
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_calls)
+            self._task = loop.create_task(self._run())
+
+    async def _run(self):
+        backoff = 1.0
+        while True:
+            try:
+                async with self.client.session(self.server_name) as session:
+                    tools = await load_mcp_tools(session)
+                    self._tools = {t.name: t for t in tools}
+                    self._generation += 1
+                    self.connects += 1
+                    self._reconnect.clear()
+                    self._connected.set()
+                    backoff = 1.0
+                    log.info("MCP session connected", server=self.server_name, tools=list(self._tools))
+                    await self._keepalive(session)
+                continue  # a failed call asked for a fresh session; reconnect right away
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failures += 1
+                log.warning("MCP session lost", server=self.server_name, error=str(e), retry_in=backoff)
+            finally:
+                self._connected.clear()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff_seconds)
+
+    async def _keepalive(self, session):
+        """Ping until a reconnect is requested or a ping fails."""
+        while True:
+            try:
+                await asyncio.wait_for(self._reconnect.wait(), timeout=self.keepalive_seconds)
+                return
+            except asyncio.TimeoutError:
+                await asyncio.wait_for(session.send_ping(), timeout=self.connect_timeout)
+
+    # ---------- Tool access ----------
+    async def get_tools(self) -> Dict[str, BaseTool]:
+        """Tools of the current session, waiting up to `connect_timeout` for a connection."""
+        self._ensure_started()
+        await asyncio.wait_for(self._connected.wait(), timeout=self.connect_timeout)
+        return self._tools
+
+    async def get_tool(self, name: str) -> Optional[PooledTool]:
+        tools = await self.get_tools()
+        return PooledTool(self, name) if name in tools else None
+
+    async def call(self, name: str, args: Dict[str, Any]) -> Any:
+        self._ensure_started()
+        async with self._semaphore:
+            self.in_flight += 1
+            try:
+                for attempt in (1, 2):
+                    tools = await self.get_tools()
+                    generation = self._generation
+                    try:
+                        self.calls += 1
+                        return await tools[name].ainvoke(args)
+                    except ToolException:
+                        raise  # the tool ran and reported an error; the session is fine
+                    except Exception as e:
+                        if attempt == 2:
+                            raise
+                        log.warning("MCP call failed, reconnecting", tool=name, error=str(e))
+                        if generation == self._generation:
+                            self._connected.clear()
+                            self._reconnect.set()
+            finally:
+                self.in_flight -= 1
+
+    async def aclose(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "server": self.server_name,
+            "connected": bool(self._task and not self._task.done() and self._connected.is_set()),
+            "tools": list(self._tools),
+            "connects": self.connects,
+            "failures": self.failures,
+            "calls": self.calls,
+            "in_flight": self.in_flight,
+        }
@@ -0,0 +1,308 @@
+import json
+import os
+import re
+import threading
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+from prod_assistant.retriever.numeric_index import NumericIndex, metadata_filter_mask
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_PARTS = re.compile(r"[a-z]+|\d+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase alphanumeric tokens. Mixed tokens such as "256gb" or product ids
+    like "itm6ac6485515ae4" are kept whole and also split into letter/digit runs,
+    so "256GB" matches "256 GB".
+    """
+    tokens = []
+    for token in _TOKEN.findall(text.lower()):
+        tokens.append(token)
+        parts = _PARTS.findall(token)
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index persisted under `path`.
+
+    Postings are stored as CSR arrays (term offsets, int32 document rows,
+    uint16 term frequencies) in `bm25.npz` and documents in `docs.jsonl`.
+    New documents are appended to the postings and to the documents file;
+    adding an existing id replaces that document, and replaced or deleted rows
+    are masked at query time until they exceed `compact_ratio` of all rows,
+    when the index is rewritten without them. Readers reload when `bm25.npz`
+    is rewritten by an ingestion run.
+    """
+
+    INDEX_FILE = "bm25.npz"
+    DOCS_FILE = "docs.jsonl"
+
+    def __init__(self, path: str = "data/bm25_index", k1: float = 1.5, b: float = 0.75,
+                 metadata_fields: Sequence[str] = ("product_id",), compact_ratio: float = 0.25):
+        self.path = Path(path)
+        self.k1 = k1
+        self.b = b
+        self.metadata_fields = tuple(metadata_fields)
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def count(self) -> int:
+        """Number of live (not deleted) documents."""
+        return len(self._rows)
+
+    def __contains__(self, doc_id) -> bool:
+        self._maybe_reload()
+        return str(doc_id) in self._rows
+
+    # ---------- Persistence ----------
+    def _docs_path(self, generation: int) -> Path:
+        # Compaction renumbers rows, so it writes a new documents file instead of touching the one
+        # readers of the current bm25.npz may still be loading.
+        return self.path / (self.DOCS_FILE if not generation else f"docs.{generation}.jsonl")
+
+    def _load(self):
+        self._records: List[dict] = []
+        self._rows: Dict[str, int] = {}  # live id -> row
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._doc_len = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._numeric: Optional[NumericIndex] = None
+        self._stamp = None
+        self._generation = 0
+        self._docs_bytes: Optional[int] = None  # size of the documents file the index covers
+
+        index_path = self.path / self.INDEX_FILE
+        if not index_path.exists():
+            return
+        self._stamp = index_path.stat().st_mtime_ns
+        with np.load(index_path) as data:
+            terms = data["terms"].tobytes().decode("utf-8").split("\n") if data["terms"].size else []
+            offsets, rows, tfs = data["offsets"], data["rows"], data["tfs"]
+            self._doc_len = data["doc_len"]
+            self._alive = data["alive"]
+            if "docs_bytes" in data.files:
+                self._generation = int(data["generation"])
+                self._docs_bytes = int(data["docs_bytes"])
+        self._postings = {
+            term: (rows[offsets[i]:offsets[i + 1]], tfs[offsets[i]:offsets[i + 1]]) for i, term in enumerate(terms)
+        }
+        try:
+            with open(self._docs_path(self._generation), encoding="utf-8") as f:
+                self._records = [json.loads(line) for _, line in zip(range(len(self._doc_len)), f)]
+        except FileNotFoundError:
+            if index_path.stat().st_mtime_ns == self._stamp:
+                raise
+            return self._load()  # compacted by a writer while loading
+        self._rows = {r["id"]: row for row, r in enumerate(self._records) if self._alive[row]}
+        log.info("BM25 index loaded", path=str(self.path), documents=self.count, terms=len(self._postings))
+
+    def _maybe_reload(self):
+        try:
+            stamp = (self.path / self.INDEX_FILE).stat().st_mtime_ns
+        except OSError:
+            return
+        if stamp != self._stamp:
+            with self._lock:
+                self._load()
+
+    @staticmethod
+    def _write_records(f, records: Sequence[dict]):
+        for record in records:
+            f.write((json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+
+    def _save(self, appended: int = 0, rewrite: bool = False):
+        """
+        Persist the index. Only the last `appended` documents are written to the
+        documents file unless `rewrite` is set (or the file predates this format),
+        in which case all documents go to a new generation of the file.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Documents first: readers only take as many rows as the index has.
+        previous = self._generation
+        if rewrite or self._docs_bytes is None:
+            if self._stamp is not None:
+                self._generation = previous + 1
+            with open(self._docs_path(self._generation), "wb") as f:
+                self._write_records(f, self._records)
+                self._docs_bytes = f.tell()
+        elif appended:
+            with open(self._docs_path(self._generation), "r+b") as f:
+                f.seek(self._docs_bytes)
+                f.truncate()  # drop documents of an interrupted earlier write
+                self._write_records(f, self._records[-appended:])
+                self._docs_bytes = f.tell()
+
+        terms = sorted(self._postings)
+        lengths = np.array([len(self._postings[t][0]) for t in terms], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+        rows = np.concatenate([self._postings[t][0] for t in terms]) if terms else np.zeros(0, dtype=np.int32)
+        tfs = np.concatenate([self._postings[t][1] for t in terms]) if terms else np.zeros(0, dtype=np.uint16)
+        index_tmp = self.path / (self.INDEX_FILE + ".tmp.npz")
+        np.savez(
+            index_tmp,
+            terms=np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8),
+            offsets=offsets,
+            rows=rows.astype(np.int32),
+            tfs=tfs.astype(np.uint16),
+            doc_len=self._doc_len,
+            alive=self._alive,
+            generation=np.int64(self._generation),
+            docs_bytes=np.int64(self._docs_bytes),
+        )
+        os.replace(index_tmp, self.path / self.INDEX_FILE)
+        self._stamp = (self.path / self.INDEX_FILE).stat().st_mtime_ns
+        if self._generation != previous:
+            self._docs_path(previous).unlink(missing_ok=True)
+
+    def _compact(self):
+        """Drop deleted and replaced rows, renumbering the live ones."""
+        live = np.flatnonzero(self._alive)
+        log.info("Compacting BM25 index", path=str(self.path), live=len(live), dropped=len(self._alive) - len(live))
+        new_row = np.full(len(self._alive), -1, dtype=np.int32)
+        new_row[live] = np.arange(len(live), dtype=np.int32)
+        postings = {}
+        for term, (rows, tfs) in self._postings.items():
+            keep = self._alive[rows]
+            if keep.any():
+                postings[term] = (new_row[rows[keep]], tfs[keep])
+        self._postings = postings
+        self._records = [self._records[row] for row in live]
+        self._rows = {record["id"]: row for row, record in enumerate(self._records)}
+        self._doc_len = self._doc_len[live]
+        self._alive = np.ones(len(live), dtype=bool)
+        self._numeric = None
+
+    def _needs_compaction(self) -> bool:
+        masked = len(self._alive) - self.count
+        return masked > 0 and masked >= self.compact_ratio * len(self._alive)
+
+    def compact(self):
+        """Rewrite the index without deleted or replaced rows."""
+        with self._lock:
+            self._maybe_reload()
+            self._compact()
+            self._save(rewrite=True)
+
+    # ---------- Writes ----------
+    def _index_text(self, doc: Document) -> str:
+        extra = [str(doc.metadata.get(field, "")) for field in self.metadata_fields]
+        return " ".join([doc.page_content, *extra])
+
+    def add_documents(self, documents: Sequence[Document], ids: Optional[Sequence[str]] = None) -> List[str]:
+        """Index documents incrementally. Re-using an existing id replaces that document."""
+        if not documents:
+            return []
+        with self._lock:
+            self._maybe_reload()
+            ids = [str(i) for i in ids] if ids else [doc.id or uuid.uuid4().hex for doc in documents]
+            start = len(self._records)
+            self._alive = np.concatenate([self._alive, np.ones(len(documents), dtype=bool)])
+
+            new_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+            lengths = []
+            for row, (doc_id, doc) in enumerate(zip(ids, documents), start):
+                if doc_id in self._rows:
+                    self._alive[self._rows[doc_id]] = False
+                self._rows[doc_id] = row
+                self._records.append({"id": doc_id, "text": doc.page_content, "metadata": doc.metadata})
+                counts = Counter(tokenize(self._index_text(doc)))
+                lengths.append(sum(counts.values()))
+                for term, tf in counts.items():
+                    rows, tfs = new_postings.setdefault(term, ([], []))
+                    rows.append(row)
+                    tfs.append(min(tf, np.iinfo(np.uint16).max))
+
+            self._doc_len = np.concatenate([self._doc_len, np.array(lengths, dtype=np.int32)])
+            self._numeric = None
+            for term, (rows, tfs) in new_postings.items():
+                added = (np.array(rows, dtype=np.int32), np.array(tfs, dtype=np.uint16))
+                current = self._postings.get(term)
+                self._postings[term] = added if current is None else (
+                    np.concatenate([current[0], added[0]]), np.concatenate([current[1], added[1]])
+                )
+            if self._needs_compaction():
+                self._compact()
+                self._save(rewrite=True)
+            else:
+                self._save(appended=len(documents))
+            return ids
+
+    def delete(self, ids: Sequence[str]) -> bool:
+        with self._lock:
+            self._maybe_reload()
+            rows = [self._rows.pop(i) for i in map(str, ids) if i in self._rows]
+            if rows:
+                self._alive[rows] = False
+                compacted = self._needs_compaction()
+                if compacted:
+                    self._compact()
+                self._save(rewrite=compacted)
+            return bool(rows)
+
+    # ---------- Search ----------
+    def search(self, query: str, k: int = 10, filter: Optional[dict] = None) -> List[Tuple[Document, float]]:
+        """
+        Top-k documents by BM25 score (only documents matching at least one query
+        term), optionally restricted by a metadata filter (see metadata_filter_mask).
+        """
+        self._maybe_reload()
+        terms = [t for t in dict.fromkeys(tokenize(query)) if t in self._postings]
+        live = self.count
+        if not terms or not live or k <= 0:
+            return []
+
+        doc_len = self._doc_len.astype(np.float32)
+        norm = self.k1 * (1 - self.b + self.b * doc_len / max(float(doc_len[self._alive].mean()), 1.0))
+        scores = np.zeros(len(doc_len), dtype=np.float32)
+        for term in terms:
+            rows, tfs = self._postings[term]
+            mask = self._alive[rows]
+            df = int(mask.sum())
+            if not df:
+                continue
+            idf = np.log(1 + (live - df + 0.5) / (df + 0.5))
+            tf = tfs.astype(np.float32)
+            scores[rows] += mask * idf * tf * (self.k1 + 1) / (tf + norm[rows])
+
+        if filter:
+            if self._numeric is None:
+                self._numeric = NumericIndex([record["metadata"] for record in self._records])
+            scores[~metadata_filter_mask(filter, self._numeric.metadatas, self._numeric)] = 0
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._document(int(row)), float(scores[row])) for row in top]
+
+    def _document(self, row: int) -> Document:
+        record = self._records[row]
+        return Document(id=record["id"], page_content=record["text"], metadata=dict(record["metadata"]))
+
+
+def bm25_index_from_config(config: dict) -> Optional[BM25Index]:
+    """BM25Index for the `lexical_index` config block, or None when disabled."""
+    index_cfg = config.get("lexical_index", {})
+    if not index_cfg.get("enabled", True):
+        return None
+    return BM25Index(
+        path=index_cfg.get("path", "data/bm25_index"),
+        k1=index_cfg.get("k1", 1.5),
+        b=index_cfg.get("b", 0.75),
+        metadata_fields=index_cfg.get("metadata_fields", ["product_id"]),
+        compact_ratio=index_cfg.get("compact_ratio", 0.25),
+    )
@@ -0,0 +1,96 @@
+import re
+from typing import Optional, Sequence
+
+from langchain.retrievers.document_compressors import EmbeddingsFilter, LLMChainFilter
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import Document
+from langchain_core.documents.compressor import BaseDocumentCompressor
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+COMPRESSOR_MODES = ("llm_filter", "batched_llm", "embedding", "none")
+
+BATCHED_FILTER_PROMPT = PromptTemplate.from_template(
+    """You are filtering search results for a shopping assistant.
+Question: {question}
+
+{documents}
+
+Which documents are relevant to the question? Reply with the relevant document numbers
+separated by commas (e.g. "1, 3"), or "none" if no document is relevant."""
+)
+
+# The leading id list of a filter reply, e.g. "1, 3", "Documents 2 and 4." or "Relevant: #1, #3";
+# numbers after it ("...document 2 mentions the 128GB model") are prose, not ids.
+_LEADING_IDS = re.compile(
+    r"^\W*(?:[a-z ]{0,30}:\s*)?(?:(?:documents?|docs?)\b\W*)?((?:#?\d+\b(?:\s*(?:,|and|&)\s*)?)+)",
+    re.IGNORECASE,
+)
+
+
+class BatchedLLMFilter(BaseDocumentCompressor):
+    """
+    Drops irrelevant documents with a single LLM call for the whole result set,
+    instead of LLMChainFilter's one call per document. Only the id list the
+    reply starts with is read; if the reply has none (or no valid id), every
+    document is kept.
+    """
+
+    llm: BaseLanguageModel
+    max_chars_per_doc: int = 1200
+
+    def _prompt_input(self, documents: Sequence[Document], query: str) -> dict:
+        listing = "\n\n".join(
+            f"Document {i}:\n{doc.page_content[:self.max_chars_per_doc]}" for i, doc in enumerate(documents, 1)
+        )
+        return {"question": query, "documents": listing}
+
+    def _select(self, documents: Sequence[Document], reply: str) -> Sequence[Document]:
+        reply = (reply or "").strip().lower()
+        if reply.strip("\"'. ").startswith("none"):
+            return []
+        match = _LEADING_IDS.match(reply)
+        numbers = {int(n) for n in re.findall(r"\d+", match.group(1))} if match else set()
+        numbers &= set(range(1, len(documents) + 1))
+        if not numbers:
+            return list(documents)
+        return [doc for i, doc in enumerate(documents, 1) if i in numbers]
+
+    def _chain(self):
+        return BATCHED_FILTER_PROMPT | self.llm | StrOutputParser()
+
+    def compress_documents(self, documents: Sequence[Document], query: str,
+                           callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        if not documents:
+            return []
+        reply = self._chain().invoke(self._prompt_input(documents, query), config={"callbacks": callbacks})
+        return self._select(documents, reply)
+
+    async def acompress_documents(self, documents: Sequence[Document], query: str,
+                                  callbacks: Optional[Callbacks] = None) -> Sequence[Document]:
+        if not documents:
+            return []
+        reply = await self._chain().ainvoke(self._prompt_input(documents, query), config={"callbacks": callbacks})
+        return self._select(documents, reply)
+
+
+def build_compressor(mode: str, llm_factory, embeddings, similarity_threshold: float = 0.35
+                     ) -> Optional[BaseDocumentCompressor]:
+    """
+    Compressor for `retriever.compressor`:
+    llm_filter  - LLMChainFilter, one LLM call per document
+    batched_llm - BatchedLLMFilter, one LLM call per query
+    embedding   - EmbeddingsFilter on the local embedding model, no LLM call
+    none        - no filtering (returns None)
+    `llm_factory` is only called for the LLM-based modes.
+    """
+    if mode == "llm_filter":
+        return LLMChainFilter.from_llm(llm_factory())
+    if mode == "batched_llm":
+        return BatchedLLMFilter(llm=llm_factory())
+    if mode == "embedding":
+        return EmbeddingsFilter(embeddings=embeddings, similarity_threshold=similarity_threshold)
+    if mode == "none":
+        return None
+    raise ValueError(f"Unsupported retriever compressor '{mode}', expected one of {COMPRESSOR_MODES}")
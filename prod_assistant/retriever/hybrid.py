@@ -0,0 +1,51 @@
+from typing import Dict, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from prod_assistant.retriever.bm25_index import BM25Index
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[Sequence[Document]], k: int = 60,
+                           limit: Optional[int] = None) -> List[Document]:
+    """
+    Merge ranked document lists: each document scores sum(1 / (k + rank)) over
+    the lists it appears in. Documents are matched by content, so results from
+    different stores fuse without shared ids; ties keep the earlier list's order.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for results in result_lists:
+        for rank, doc in enumerate(results, 1):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked[:limit]]
+
+
+class HybridRetriever(BaseRetriever):
+    """Dense retriever results fused with BM25 lexical matches by reciprocal rank fusion."""
+
+    dense: BaseRetriever
+    lexical: BM25Index
+    k: int = 4
+    lexical_k: int = 10
+    rrf_k: int = 60
+
+    def fuse(self, query: str, dense_docs: Sequence[Document], filter: Optional[dict] = None) -> List[Document]:
+        lexical_docs = [doc for doc, _ in self.lexical.search(query, self.lexical_k, filter=filter)]
+        return reciprocal_rank_fusion([dense_docs, lexical_docs], k=self.rrf_k, limit=self.k)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                filter: Optional[dict] = None) -> List[Document]:
+        kwargs = {"filter": filter} if filter else {}
+        dense_docs = self.dense.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self.fuse(query, dense_docs, filter)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       filter: Optional[dict] = None) -> List[Document]:
+        kwargs = {"filter": filter} if filter else {}
+        dense_docs = await self.dense.ainvoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return self.fuse(query, dense_docs, filter)
@@ -0,0 +1,442 @@
+import asyncio
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+from prod_assistant.retriever.mmr import mmr_select
+from prod_assistant.retriever.numeric_index import NumericIndex, metadata_filter_mask
+from prod_assistant.retriever.quantization import QUANTIZERS, VectorQuantizer, load_quantizer, make_quantizer
+
+try:
+    import hnswlib
+except ImportError:  # optional: exact flat search is used without it
+    hnswlib = None
+
+
+class LocalVectorStore(VectorStore):
+    """
+    On-disk vector store for running without AstraDB.
+
+    Normalized float32 vectors are appended to `vectors.f32` and memory-mapped
+    on load, documents and metadata live in `docs.jsonl`, and when hnswlib is
+    installed an HNSW index (`hnsw.bin`) answers nearest-neighbour queries;
+    otherwise search is an exact scan over the memory-mapped matrix.
+    `meta.json` is written last, so API workers pick up a re-ingested store
+    on their next query. Replaced and deleted rows stay masked until they
+    make up `compact_ratio` of the store; then the vectors, documents, index
+    and codes are rewritten without them.
+
+    With `storage` set to float16, int8 or pq, only compact codes
+    (`codes.bin`) are held in memory: the coarse scan runs on the codes and the
+    best `rerank_k` candidates are re-scored exactly from `vectors.f32`, of
+    which only those rows are paged in.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    DOCS_FILE = "docs.jsonl"
+    INDEX_FILE = "hnsw.bin"
+    META_FILE = "meta.json"
+    CODES_FILE = "codes.bin"
+    QUANTIZER_FILE = "quantizer.npz"
+    # Vectors sampled to fit the quantizer; it is refitted while the store is much larger than its sample.
+    TRAIN_SIZE = 20000
+
+    def __init__(self, embedding: Embeddings, path: str = "data/vector_store", index: str = "auto",
+                 hnsw_m: int = 16, ef_construction: int = 200, ef_search: int = 64,
+                 storage: str = "float32", rerank_k: int = 100, pq_m: int = 48, compact_ratio: float = 0.25):
+        if storage not in QUANTIZERS:
+            raise ValueError(f"Unsupported vector storage '{storage}', expected one of {QUANTIZERS}")
+        if storage != "float32" and index == "hnsw":
+            raise ValueError("Compact vector storage scans the codes; use index 'flat' or 'auto'")
+        if index == "auto":
+            index = "hnsw" if hnswlib is not None and storage == "float32" else "flat"
+        if index == "hnsw" and hnswlib is None:
+            raise ImportError("vector_store.index 'hnsw' requires the hnswlib package")
+        if index not in ("hnsw", "flat"):
+            raise ValueError(f"Unsupported local index '{index}', expected 'auto', 'hnsw' or 'flat'")
+
+        self._embedding = embedding
+        self.path = Path(path)
+        self.index_kind = index
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.storage = storage
+        self.rerank_k = rerank_k
+        self.pq_m = pq_m
+        self.compact_ratio = compact_ratio
+
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @property
+    def count(self) -> int:
+        """Number of live (not deleted) documents."""
+        return len(self._rows)
+
+    # ---------- Persistence ----------
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _load(self):
+        self.dim: Optional[int] = None
+        self._records: List[Dict[str, Any]] = []
+        self._rows: Dict[str, int] = {}  # live id -> row
+        self._alive = np.zeros(0, dtype=bool)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._hnsw = None
+        self._quantizer: Optional[VectorQuantizer] = None
+        self._codes: Optional[np.ndarray] = None
+        self._numeric: Optional[NumericIndex] = None
+        self._meta_mtime = None
+
+        meta_path = self._file(self.META_FILE)
+        if not meta_path.exists():
+            return
+        self._meta_mtime = meta_path.stat().st_mtime_ns
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        self.dim, count = meta["dim"], meta["count"]
+
+        with open(self._file(self.DOCS_FILE), encoding="utf-8") as f:
+            self._records = [json.loads(line) for _, line in zip(range(count), f)]
+        self._alive = np.array([not r.get("deleted") for r in self._records], dtype=bool)
+        self._rows = {r["id"]: row for row, r in enumerate(self._records) if self._alive[row]}
+        self._map_vectors()
+
+        if self.index_kind == "hnsw" and count:
+            index_path = self._file(self.INDEX_FILE)
+            if index_path.exists() and meta.get("index_count") == count:
+                self._hnsw = hnswlib.Index(space="ip", dim=self.dim)
+                self._hnsw.load_index(str(index_path), max_elements=count)
+                self._hnsw.set_ef(self.ef_search)
+            else:
+                # Missing or stale (e.g. the store was written with index: flat).
+                self._build_hnsw()
+        if self.storage != "float32" and count:
+            self._load_codes(meta)
+        log.info("Local vector store loaded", path=str(self.path), documents=self.count, index=self.index_kind,
+                 storage=self.storage)
+
+    def _map_vectors(self):
+        count = len(self._records)
+        if count:
+            self._vectors = np.memmap(self._file(self.VECTORS_FILE), dtype=np.float32, mode="r",
+                                      shape=(count, self.dim))
+        else:
+            self._vectors = np.zeros((0, self.dim or 0), dtype=np.float32)
+
+    def _build_hnsw(self):
+        count = len(self._records)
+        self._hnsw = hnswlib.Index(space="ip", dim=self.dim)
+        self._hnsw.init_index(max_elements=max(count, 1), M=self.hnsw_m, ef_construction=self.ef_construction)
+        if count:
+            self._hnsw.add_items(np.asarray(self._vectors), np.arange(count))
+            for row in np.flatnonzero(~self._alive):
+                self._hnsw.mark_deleted(int(row))
+        self._hnsw.set_ef(self.ef_search)
+
+    def _load_codes(self, meta: dict):
+        count = len(self._records)
+        quantizer = load_quantizer(self._file(self.QUANTIZER_FILE))
+        if (quantizer is not None and quantizer.kind == self.storage and meta.get("codes_count") == count
+                and getattr(quantizer, "m", self.pq_m) == self.pq_m):
+            self._quantizer = quantizer
+            self._codes = np.fromfile(self._file(self.CODES_FILE), dtype=quantizer.dtype,
+                                      count=count * quantizer.width(self.dim)).reshape(count, -1)
+        else:
+            # Missing or written with another storage setting.
+            self._build_codes()
+
+    def _build_codes(self):
+        """Fit the quantizer on a sample of live vectors and encode every row."""
+        live = np.flatnonzero(self._alive)
+        sample = live if len(live) <= self.TRAIN_SIZE else np.sort(
+            np.random.default_rng(0).choice(live, self.TRAIN_SIZE, replace=False))
+        self._quantizer = make_quantizer(self.storage, pq_m=self.pq_m).fit(np.asarray(self._vectors[sample]))
+        self._codes = self._encode_rows(0, len(self._records))
+
+    def _encode_rows(self, start: int, stop: int) -> np.ndarray:
+        width = self._quantizer.width(self.dim)
+        codes = np.empty((stop - start, width), dtype=self._quantizer.dtype)
+        for row in range(start, stop, self.TRAIN_SIZE):
+            end = min(row + self.TRAIN_SIZE, stop)
+            codes[row - start:end - start] = self._quantizer.encode(np.asarray(self._vectors[row:end]))
+        return codes
+
+    def _update_codes(self, start: int):
+        """Encode rows appended from `start`; refit when the quantizer saw too small a sample."""
+        if self._quantizer is None or self._quantizer.trained_on * 2 < min(self.count, self.TRAIN_SIZE):
+            self._build_codes()
+        else:
+            self._codes = np.concatenate([self._codes, self._encode_rows(start, len(self._records))])
+
+    def _maybe_reload(self):
+        """Reload when another process (e.g. ingestion) rewrote the store."""
+        try:
+            mtime = self._file(self.META_FILE).stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._meta_mtime:
+            with self._lock:
+                self._load()
+
+    def _replace(self, name: str, write: Callable[[str], None]):
+        tmp = str(self._file(name)) + ".tmp"
+        write(tmp)
+        os.replace(tmp, self._file(name))
+
+    def _save(self):
+        def write_docs(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                for record in self._records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+        self._replace(self.DOCS_FILE, write_docs)
+        if self._hnsw is not None:
+            self._replace(self.INDEX_FILE, self._hnsw.save_index)
+        if self._codes is not None:
+            self._replace(self.CODES_FILE, lambda tmp: self._codes.tofile(tmp))
+            self._replace(self.QUANTIZER_FILE, self._quantizer.save)
+        meta = {
+            "dim": self.dim,
+            "count": len(self._records),
+            "index_count": len(self._records) if self._hnsw is not None else None,
+            "storage": self.storage,
+            "codes_count": len(self._codes) if self._codes is not None else None,
+        }
+        self._replace(self.META_FILE, lambda tmp: Path(tmp).write_text(json.dumps(meta), encoding="utf-8"))
+        self._meta_mtime = self._file(self.META_FILE).stat().st_mtime_ns
+
+    def _compact(self):
+        """Drop deleted and replaced rows: rewrite vectors.f32 and rebuild the HNSW index."""
+        live = np.flatnonzero(self._alive)
+        log.info("Compacting local vector store", path=str(self.path), live=len(live),
+                 dropped=len(self._alive) - len(live))
+
+        def write_vectors(tmp):
+            with open(tmp, "wb") as f:
+                for start in range(0, len(live), self.TRAIN_SIZE):
+                    rows = live[start:start + self.TRAIN_SIZE]
+                    f.write(np.ascontiguousarray(self._vectors[rows], dtype=np.float32).tobytes())
+
+        self._replace(self.VECTORS_FILE, write_vectors)
+        self._records = [self._records[row] for row in live]
+        self._rows = {record["id"]: row for row, record in enumerate(self._records)}
+        self._alive = np.ones(len(live), dtype=bool)
+        self._numeric = None
+        self._map_vectors()
+        if self._codes is not None:
+            self._codes = self._codes[live]
+        if self._hnsw is not None:
+            self._build_hnsw()
+
+    def _maybe_compact(self):
+        masked = len(self._alive) - self.count
+        if masked > 0 and masked >= self.compact_ratio * len(self._alive):
+            self._compact()
+
+    # ---------- Writes ----------
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return (matrix / np.maximum(norms, 1e-12)).astype(np.float32)
+
+    def _mark_deleted(self, row: int):
+        record = self._records[row]
+        record["deleted"] = True
+        self._alive[row] = False
+        self._rows.pop(record["id"], None)
+        if self._hnsw is not None:
+            self._hnsw.mark_deleted(row)
+
+    def add_texts(self, texts: Iterable[str], metadatas: Optional[List[dict]] = None,
+                  ids: Optional[List[str]] = None, **kwargs: Any) -> List[str]:
+        """Embed and store texts. Re-using an existing id replaces that document."""
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        ids = [str(i) for i in ids] if ids else [uuid.uuid4().hex for _ in texts]
+        vectors = self._normalize(np.asarray(self._embedding.embed_documents(texts), dtype=np.float32))
+        self.add_vectors(vectors, texts, metadatas, ids)
+        return ids
+
+    def add_vectors(self, vectors: np.ndarray, texts: List[str], metadatas: List[dict], ids: List[str]):
+        """Store already-normalized vectors with their documents."""
+        with self._lock:
+            self._maybe_reload()
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match store dimension {self.dim}")
+            self.path.mkdir(parents=True, exist_ok=True)
+
+            start = len(self._records)
+            with open(self._file(self.VECTORS_FILE), "ab") as f:
+                f.truncate(start * self.dim * 4)  # drop bytes of an interrupted earlier write
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+            self._alive = np.concatenate([self._alive, np.ones(len(ids), dtype=bool)])
+            for row, (doc_id, text, metadata) in enumerate(zip(ids, texts, metadatas), start):
+                if doc_id in self._rows:
+                    self._mark_deleted(self._rows[doc_id])
+                self._records.append({"id": doc_id, "text": text, "metadata": metadata})
+                self._rows[doc_id] = row
+            self._numeric = None
+            self._map_vectors()
+
+            if self.storage != "float32":
+                self._update_codes(start)
+            if self.index_kind == "hnsw":
+                if self._hnsw is None:
+                    self._build_hnsw()
+                else:
+                    if len(self._records) > self._hnsw.get_max_elements():
+                        self._hnsw.resize_index(max(len(self._records), 2 * self._hnsw.get_max_elements()))
+                    self._hnsw.add_items(vectors, np.arange(start, len(self._records)))
+                    for row in np.flatnonzero(~self._alive[start:]) + start:
+                        self._hnsw.mark_deleted(int(row))
+            self._maybe_compact()
+            self._save()
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return False
+        with self._lock:
+            self._maybe_reload()
+            rows = [self._rows[i] for i in map(str, ids) if i in self._rows]
+            for row in rows:
+                self._mark_deleted(row)
+            if rows:
+                self._maybe_compact()
+                self._save()
+            return bool(rows)
+
+    @classmethod
+    def from_texts(cls, texts: List[str], embedding: Embeddings, metadatas: Optional[List[dict]] = None,
+                   ids: Optional[List[str]] = None, **kwargs: Any) -> "LocalVectorStore":
+        store = cls(embedding, **kwargs)
+        store.add_texts(texts, metadatas=metadatas, ids=ids)
+        return store
+
+    # ---------- Reads ----------
+    def _document(self, row: int) -> Document:
+        record = self._records[row]
+        return Document(id=record["id"], page_content=record["text"], metadata=dict(record["metadata"]))
+
+    def get_by_ids(self, ids) -> List[Document]:
+        self._maybe_reload()
+        return [self._document(self._rows[i]) for i in ids if i in self._rows]
+
+    def _candidate_mask(self, filter: Optional[dict]) -> np.ndarray:
+        if not filter:
+            return self._alive
+        if self._numeric is None:
+            self._numeric = NumericIndex([record["metadata"] for record in self._records])
+        return self._alive & metadata_filter_mask(filter, self._numeric.metadatas, self._numeric)
+
+    def _search(self, vector: np.ndarray, k: int, filter: Optional[dict] = None) -> List[Tuple[int, float]]:
+        """Top-k (row, cosine score) pairs for a normalized query vector."""
+        self._maybe_reload()
+        if not self._rows or k <= 0:
+            return []
+        if self._hnsw is not None and not filter:
+            labels, distances = self._hnsw.knn_query(vector, k=min(k, len(self._rows)))
+            return [(int(row), 1.0 - float(dist)) for row, dist in zip(labels[0], distances[0])]
+
+        if self._codes is not None:
+            return self._search_codes(vector, k, filter)
+
+        # Exact scan; metadata filters pre-select the rows to score.
+        candidates = np.flatnonzero(self._candidate_mask(filter))
+        if not len(candidates):
+            return []
+        scores = np.asarray(self._vectors[candidates] @ vector)
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(candidates[i]), float(scores[i])) for i in top]
+
+    def _search_codes(self, vector: np.ndarray, k: int, filter: Optional[dict] = None) -> List[Tuple[int, float]]:
+        """Coarse scan over the compact codes, then exact re-ranking of the best rerank_k rows."""
+        mask = self._candidate_mask(filter)
+        live = int(mask.sum())
+        if not live:
+            return []
+        scores = self._quantizer.scores(vector, self._codes)
+        scores[~mask] = -np.inf
+        shortlist = min(max(k, self.rerank_k), live)
+        # Sorted rows keep the reads from the memory-mapped file sequential.
+        rows = np.sort(np.argpartition(-scores, shortlist - 1)[:shortlist])
+        exact = np.asarray(self._vectors[rows]) @ vector
+        k = min(k, len(rows))
+        top = np.argpartition(-exact, k - 1)[:k]
+        top = top[np.argsort(-exact[top])]
+        return [(int(rows[i]), float(exact[i])) for i in top]
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        return self._normalize(np.asarray(self._embedding.embed_query(query), dtype=np.float32))
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4,
+                                               filter: Optional[dict] = None, **kwargs: Any
+                                               ) -> List[Tuple[Document, float]]:
+        vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        return [(self._document(row), score) for row, score in self._search(vector, k, filter)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                                     **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self._embed_query(query), k, filter)
+
+    def similarity_search_with_embedding_by_vector(self, embedding: List[float], k: int = 4,
+                                                   filter: Optional[dict] = None
+                                                   ) -> List[Tuple[Document, np.ndarray]]:
+        """Top-k documents with their stored (normalized) vectors, for client-side re-ranking."""
+        vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        return [(self._document(row), np.asarray(self._vectors[row])) for row, _ in self._search(vector, k, filter)]
+
+    async def asimilarity_search_with_embedding_by_vector(self, embedding: List[float], k: int = 4,
+                                                          filter: Optional[dict] = None
+                                                          ) -> List[Tuple[Document, np.ndarray]]:
+        return await asyncio.to_thread(self.similarity_search_with_embedding_by_vector, embedding, k, filter)
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, filter: Optional[dict] = None,
+                                    **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, filter)]
+
+    def similarity_search(self, query: str, k: int = 4, filter: Optional[dict] = None,
+                          **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self._embed_query(query), k, filter)
+
+    def max_marginal_relevance_search_by_vector(self, embedding: List[float], k: int = 4, fetch_k: int = 20,
+                                                lambda_mult: float = 0.5, filter: Optional[dict] = None,
+                                                **kwargs: Any) -> List[Document]:
+        vector = self._normalize(np.asarray(embedding, dtype=np.float32))
+        hits = self._search(vector, fetch_k, filter)
+        if not hits:
+            return []
+        rows = [row for row, _ in hits]
+        picked = mmr_select(vector, np.asarray(self._vectors[rows]), k, lambda_mult)
+        return [self._document(rows[i]) for i in picked]
+
+    def max_marginal_relevance_search(self, query: str, k: int = 4, fetch_k: int = 20, lambda_mult: float = 0.5,
+                                      filter: Optional[dict] = None, **kwargs: Any) -> List[Document]:
+        return self.max_marginal_relevance_search_by_vector(
+            self._embed_query(query), k=k, fetch_k=fetch_k, lambda_mult=lambda_mult, filter=filter
+        )
+
+    def _select_relevance_score_fn(self) -> Callable[[float], float]:
+        # Scores are cosine similarities of normalized vectors.
+        return lambda score: score
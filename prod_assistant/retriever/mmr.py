@@ -0,0 +1,143 @@
+import asyncio
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.vectorstores import VectorStore
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def mmr_select_batch(queries: np.ndarray, candidate_sets: Sequence[np.ndarray], k: int,
+                     lambda_mult: float = 0.5) -> List[List[int]]:
+    """
+    Maximal marginal relevance for several queries at once.
+
+    queries: (B, dim) query vectors; candidate_sets: B arrays of (n_b, dim)
+    candidate vectors. Returns the selected candidate indices per query, in
+    selection order. Candidates are padded into one (B, n, dim) tensor; query
+    relevance is one matrix product, and each of the k steps only multiplies
+    the newly selected vectors against the candidates while tracking every
+    candidate's max similarity to the selection, so cost grows linearly with
+    fetch_k instead of building the full pairwise matrix.
+    """
+    sizes = [len(c) for c in candidate_sets]
+    n = max(sizes, default=0)
+    if not n or k <= 0:
+        return [[] for _ in candidate_sets]
+
+    queries = _normalize(np.asarray(queries, dtype=np.float32))
+    batch = len(candidate_sets)
+    cand = np.zeros((batch, n, queries.shape[1]), dtype=np.float32)
+    valid = np.zeros((batch, n), dtype=bool)
+    for b, c in enumerate(candidate_sets):
+        if len(c):
+            cand[b, :len(c)] = _normalize(np.asarray(c, dtype=np.float32))
+            valid[b, :len(c)] = True
+
+    rows = np.arange(batch)
+    relevance = np.einsum("bnd,bd->bn", cand, queries)
+    available = valid.copy()
+
+    # First pick is always the most relevant candidate.
+    idx = np.argmax(np.where(valid, relevance, -np.inf), axis=1)
+    picks = [idx]
+    available[rows, idx] = False
+    max_sim = np.einsum("bnd,bd->bn", cand, cand[rows, idx])
+
+    for _ in range(1, min(k, n)):
+        scores = lambda_mult * relevance - (1 - lambda_mult) * max_sim
+        scores[~available] = -np.inf
+        idx = np.argmax(scores, axis=1)
+        picks.append(idx)
+        available[rows, idx] = False
+        np.maximum(max_sim, np.einsum("bnd,bd->bn", cand, cand[rows, idx]), out=max_sim)
+
+    picks = np.stack(picks, axis=1)
+    return [picks[b, :min(k, size)].tolist() for b, size in enumerate(sizes)]
+
+
+def mmr_select(query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = 0.5) -> List[int]:
+    """Maximal marginal relevance indices for one query (see mmr_select_batch)."""
+    return mmr_select_batch(np.asarray(query, dtype=np.float32).reshape(1, -1), [candidates], k, lambda_mult)[0]
+
+
+class MMRRetriever(BaseRetriever):
+    """
+    MMR retriever that re-ranks on the client: the store returns `fetch_k`
+    candidates with their vectors and mmr_select_batch picks `k` of them, so
+    the ranking does not depend on the vector store's own MMR implementation.
+    """
+
+    vectorstore: VectorStore
+    embeddings: Embeddings
+    k: int = 4
+    fetch_k: int = 25
+    lambda_mult: float = 0.5
+
+    def rank(self, vectors: Sequence[List[float]],
+             candidate_sets: Sequence[List[Tuple[Document, List[float]]]]) -> List[List[Document]]:
+        """Select the MMR documents for each (query vector, candidates) pair."""
+        picks = mmr_select_batch(
+            np.asarray(vectors, dtype=np.float32),
+            [np.asarray([vector for _, vector in candidates], dtype=np.float32) for candidates in candidate_sets],
+            self.k,
+            self.lambda_mult,
+        )
+        return [[candidates[i][0] for i in idx] for candidates, idx in zip(candidate_sets, picks)]
+
+    async def abatch_search(self, vectors: Sequence[List[float]],
+                            filters: Optional[Sequence[Optional[dict]]] = None) -> List[List[Document]]:
+        """
+        MMR documents for several query vectors: concurrent fetches, one batched
+        ranking. `filters` optionally gives a metadata pre-filter per vector.
+        """
+        filters = filters or [None] * len(vectors)
+        candidate_sets = await asyncio.gather(*(
+            self.vectorstore.asimilarity_search_with_embedding_by_vector(vector, k=self.fetch_k, filter=filter)
+            for vector, filter in zip(vectors, filters)
+        ))
+        return self.rank(vectors, candidate_sets)
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                filter: Optional[dict] = None) -> List[Document]:
+        vector = self.embeddings.embed_query(query)
+        candidates = self.vectorstore.similarity_search_with_embedding_by_vector(vector, k=self.fetch_k, filter=filter)
+        return self.rank([vector], [candidates])[0]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       filter: Optional[dict] = None) -> List[Document]:
+        vector = await asyncio.to_thread(self.embeddings.embed_query, query)
+        return (await self.abatch_search([vector], [filter]))[0]
+
+
+if __name__ == "__main__":
+    # Micro-benchmark: python -m prod_assistant.retriever.mmr
+    import timeit
+    from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+    rng = np.random.default_rng(0)
+    dim, k, lambda_mult, batch = 384, 4, 0.6, 8
+    print(f"dim={dim} k={k} lambda_mult={lambda_mult} (ms per query)")
+    print(f"{'fetch_k':>8} {'langchain':>10} {'mmr_select':>11} {'batch of ' + str(batch):>11}")
+    for fetch_k in (25, 100, 400, 1600):
+        queries = rng.standard_normal((batch, dim)).astype(np.float32)
+        sets = [rng.standard_normal((fetch_k, dim)).astype(np.float32) for _ in range(batch)]
+
+        expected = [maximal_marginal_relevance(q, c, lambda_mult=lambda_mult, k=k) for q, c in zip(queries, sets)]
+        assert [mmr_select(q, c, k, lambda_mult) for q, c in zip(queries, sets)] == expected
+        assert mmr_select_batch(queries, sets, k, lambda_mult) == expected
+
+        runs = 20
+        baseline = timeit.timeit(lambda: [maximal_marginal_relevance(q, c, lambda_mult=lambda_mult, k=k)
+                                          for q, c in zip(queries, sets)], number=runs)
+        single = timeit.timeit(lambda: [mmr_select(q, c, k, lambda_mult) for q, c in zip(queries, sets)], number=runs)
+        batched = timeit.timeit(lambda: mmr_select_batch(queries, sets, k, lambda_mult), number=runs)
+        scale = 1000 / (runs * batch)
+        print(f"{fetch_k:>8} {baseline * scale:>10.3f} {single * scale:>11.3f} {batched * scale:>11.3f}")
@@ -0,0 +1,76 @@
+import math
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+RANGE_OPERATORS = ("$gt", "$gte", "$lt", "$lte")
+
+
+class NumericIndex:
+    """
+    Columnar index over numeric metadata fields.
+
+    Each field is materialized on first use as its values sorted ascending plus
+    the matching row numbers, so a range filter is two np.searchsorted calls and
+    rows come back in value order for sorting. Rows without a numeric value
+    never match a range.
+    """
+
+    def __init__(self, metadatas: Sequence[dict]):
+        self.metadatas = metadatas
+        self.size = len(metadatas)
+        self._columns: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def column(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted values, rows) for a field."""
+        if field not in self._columns:
+            rows, values = [], []
+            for row, metadata in enumerate(self.metadatas):
+                value = metadata.get(field)
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                    rows.append(row)
+                    values.append(value)
+            values = np.asarray(values, dtype=np.float64)
+            order = np.argsort(values, kind="stable")
+            self._columns[field] = (values[order], np.asarray(rows, dtype=np.int64)[order])
+        return self._columns[field]
+
+    def range_rows(self, field: str, gt: Optional[float] = None, gte: Optional[float] = None,
+                   lt: Optional[float] = None, lte: Optional[float] = None) -> np.ndarray:
+        """Rows whose value lies in the range, in ascending value order."""
+        values, rows = self.column(field)
+        lo, hi = 0, len(values)
+        if gte is not None:
+            lo = max(lo, int(np.searchsorted(values, gte, side="left")))
+        if gt is not None:
+            lo = max(lo, int(np.searchsorted(values, gt, side="right")))
+        if lte is not None:
+            hi = min(hi, int(np.searchsorted(values, lte, side="right")))
+        if lt is not None:
+            hi = min(hi, int(np.searchsorted(values, lt, side="left")))
+        return rows[lo:hi] if lo < hi else rows[:0]
+
+    def range_mask(self, field: str, **bounds: float) -> np.ndarray:
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.range_rows(field, **bounds)] = True
+        return mask
+
+
+def metadata_filter_mask(filter: Optional[dict], metadatas: Sequence[dict],
+                         numeric_index: Optional[NumericIndex] = None) -> np.ndarray:
+    """
+    Boolean row mask for a metadata filter in the AstraDB style used across the
+    retriever: `{"brand": "apple", "price_value": {"$lte": 100000}}`. Plain values
+    match by equality; range operators are answered from the numeric index.
+    """
+    mask = np.ones(len(metadatas), dtype=bool)
+    for field, condition in (filter or {}).items():
+        if isinstance(condition, dict):
+            unknown = set(condition) - set(RANGE_OPERATORS)
+            if unknown:
+                raise ValueError(f"Unsupported filter operators for '{field}': {sorted(unknown)}")
+            numeric_index = numeric_index or NumericIndex(metadatas)
+            mask &= numeric_index.range_mask(field, **{op.lstrip("$"): value for op, value in condition.items()})
+        else:
+            mask &= np.fromiter((m.get(field) == condition for m in metadatas), dtype=bool, count=len(metadatas))
+    return mask
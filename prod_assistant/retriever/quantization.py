@@ -0,0 +1,278 @@
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+QUANTIZERS = ("float32", "float16", "int8", "pq")
+
+# Rows scored per step, so approximate scoring never materializes a float32 copy of all codes.
+_BLOCK = 4096
+
+
+class VectorQuantizer:
+    """
+    Compact codes for normalized vectors plus approximate inner products
+    against them. Subclasses fit on a sample, encode rows into fixed-width
+    codes and score a float32 query against a block of codes.
+    """
+
+    kind = "float32"
+    dtype = np.float32
+
+    def __init__(self):
+        self.trained_on = 0
+
+    def fit(self, vectors: np.ndarray) -> "VectorQuantizer":
+        self.trained_on = len(vectors)
+        return self
+
+    def width(self, dim: int) -> int:
+        """Code columns per vector."""
+        return dim
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=self.dtype)
+
+    def _score_block(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        return codes.astype(np.float32) @ query
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        """Approximate inner products of `query` with every row of `codes`."""
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _BLOCK):
+            out[start:start + _BLOCK] = self._score_block(query, codes[start:start + _BLOCK])
+        return out
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return self.width(dim) * np.dtype(self.dtype).itemsize
+
+    # ---------- Persistence ----------
+    def _state(self) -> Dict[str, np.ndarray]:
+        return {}
+
+    def _load_state(self, state: Dict[str, np.ndarray]):
+        pass
+
+    def save(self, path: str):
+        with open(path, "wb") as f:
+            np.savez(f, kind=np.array(self.kind), trained_on=np.array(self.trained_on), **self._state())
+
+
+class Float16Quantizer(VectorQuantizer):
+    """
+    Half-precision copy of each vector (2 bytes per dimension). Scoring casts
+    each block to float32: numpy has no BLAS float16 matmul and its float16
+    cast is scalar, so this scan is several times slower than float32 (a
+    float16 `codes @ query` is slower still).
+    """
+
+    kind = "float16"
+    dtype = np.float16
+
+
+class Int8Quantizer(VectorQuantizer):
+    """
+    Per-dimension scalar quantization to int8 (1 byte per dimension). The
+    range of each dimension is fitted on a sample; later values outside it are
+    clipped.
+    """
+
+    kind = "int8"
+    dtype = np.int8
+
+    def fit(self, vectors: np.ndarray) -> "Int8Quantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.low = vectors.min(axis=0)
+        self.scale = np.maximum(vectors.max(axis=0) - self.low, 1e-12) / 255.0
+        return super().fit(vectors)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        levels = np.rint((np.asarray(vectors, dtype=np.float32) - self.low) / self.scale) - 128
+        return np.clip(levels, -128, 127).astype(np.int8)
+
+    def _score_block(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        # x ~= low + (code + 128) * scale, so q.x = code @ (scale * q) + q.(low + 128 * scale)
+        weights = self.scale * query
+        return codes.astype(np.float32) @ weights + float(query @ self.low + 128 * weights.sum())
+
+    def _state(self):
+        return {"low": self.low, "scale": self.scale}
+
+    def _load_state(self, state):
+        self.low, self.scale = state["low"], state["scale"]
+
+
+class ProductQuantizer(VectorQuantizer):
+    """
+    Product quantization: the vector is split into `m` sub-vectors and each
+    is replaced by the id of its nearest of 256 k-means centroids (1 byte per
+    sub-vector). Queries are scored with a per-query lookup table of
+    sub-vector/centroid inner products.
+    """
+
+    kind = "pq"
+    dtype = np.uint8
+
+    def __init__(self, m: int = 48, iterations: int = 20, seed: int = 0):
+        super().__init__()
+        self.m = m
+        self.iterations = iterations
+        self.seed = seed
+
+    def width(self, dim: int) -> int:
+        return self.m
+
+    def _split(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.shape[1] % self.m:
+            raise ValueError(f"Dimension {vectors.shape[1]} is not divisible by pq_m={self.m}")
+        return vectors.reshape(len(vectors), self.m, -1)
+
+    def fit(self, vectors: np.ndarray) -> "ProductQuantizer":
+        parts = self._split(vectors)
+        k = min(256, len(parts))
+        rng = np.random.default_rng(self.seed)
+        self.centroids = np.stack([_kmeans(parts[:, j], k, self.iterations, rng) for j in range(self.m)])
+        return super().fit(vectors)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        parts = self._split(vectors)
+        codes = np.empty((len(parts), self.m), dtype=np.uint8)
+        for j in range(self.m):
+            codes[:, j] = _nearest(parts[:, j], self.centroids[j])
+        return codes
+
+    def scores(self, query: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        table = self._table(np.asarray(query, dtype=np.float32))
+        columns = np.arange(self.m)
+        out = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _BLOCK):
+            out[start:start + _BLOCK] = table[columns, codes[start:start + _BLOCK]].sum(axis=1)
+        return out
+
+    def _table(self, query: np.ndarray) -> np.ndarray:
+        """(m, k) inner products of each query sub-vector with that subspace's centroids."""
+        return np.einsum("mkd,md->mk", self.centroids, query.reshape(self.m, -1))
+
+    def _state(self):
+        return {"centroids": self.centroids, "m": np.array(self.m)}
+
+    def _load_state(self, state):
+        self.centroids, self.m = state["centroids"], int(state["m"])
+
+
+def _nearest(points: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the closest centroid (squared L2) for each point."""
+    sq_norms = np.einsum("kd,kd->k", centroids, centroids)
+    out = np.empty(len(points), dtype=np.int64)
+    for start in range(0, len(points), _BLOCK):
+        block = points[start:start + _BLOCK]
+        out[start:start + _BLOCK] = np.argmin(sq_norms - 2 * block @ centroids.T, axis=1)
+    return out
+
+
+def _kmeans(points: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = points[rng.choice(len(points), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(points, centroids)
+        counts = np.bincount(assign, minlength=k)
+        sums = np.stack([np.bincount(assign, weights=points[:, d], minlength=k) for d in range(points.shape[1])], 1)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        if not filled.all():  # re-seed empty clusters from random points
+            centroids[~filled] = points[rng.choice(len(points), int((~filled).sum()))]
+    return centroids.astype(np.float32)
+
+
+def make_quantizer(kind: str, pq_m: int = 48) -> VectorQuantizer:
+    if kind == "float32":
+        return VectorQuantizer()
+    if kind == "float16":
+        return Float16Quantizer()
+    if kind == "int8":
+        return Int8Quantizer()
+    if kind == "pq":
+        return ProductQuantizer(m=pq_m)
+    raise ValueError(f"Unsupported vector storage '{kind}', expected one of {QUANTIZERS}")
+
+
+def load_quantizer(path: str) -> Optional[VectorQuantizer]:
+    """Quantizer saved with VectorQuantizer.save, or None if the file is missing."""
+    if not Path(path).exists():
+        return None
+    with np.load(path) as data:
+        state = {key: data[key] for key in data.files}
+    quantizer = make_quantizer(str(state.pop("kind")), pq_m=int(state.get("m", 48)))
+    quantizer.trained_on = int(state.pop("trained_on"))
+    quantizer._load_state(state)
+    return quantizer
+
+
+if __name__ == "__main__":
+    # Recall / memory benchmark against exact float32 search:
+    # python -m prod_assistant.retriever.quantization [--store data/vector_store] [--n 50000]
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description="Compare compact vector storage with exact float32 search")
+    parser.add_argument("--store", default=None, help="LocalVectorStore directory to take vectors from")
+    parser.add_argument("--n", type=int, default=50000, help="synthetic vectors when --store is not given")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-k", type=int, default=100)
+    parser.add_argument("--pq-m", type=int, default=48)
+    parser.add_argument("--train-size", type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if args.store:
+        meta = json.loads((Path(args.store) / "meta.json").read_text(encoding="utf-8"))
+        vectors = np.fromfile(Path(args.store) / "vectors.f32", dtype=np.float32,
+                              count=meta["count"] * meta["dim"]).reshape(meta["count"], meta["dim"])
+    else:
+        # Low-rank data plus noise, closer to sentence embeddings than isotropic noise.
+        latent = rng.standard_normal((args.n, 64)).astype(np.float32) * np.linspace(2, 0.2, 64, dtype=np.float32)
+        vectors = latent @ rng.standard_normal((64, args.dim)).astype(np.float32)
+        vectors += 0.3 * rng.standard_normal((args.n, args.dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries = vectors[rng.choice(len(vectors), args.queries)] + 0.05 * rng.standard_normal(
+        (args.queries, vectors.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    def top(scores, k):
+        idx = np.argpartition(-scores, k - 1)[:k]
+        return idx[np.argsort(-scores[idx])]
+
+    k = min(args.k, len(vectors))
+    rerank_k = min(max(args.rerank_k, k), len(vectors))
+    truth = [set(top(vectors @ q, k).tolist()) for q in queries]
+    start = time.perf_counter()
+    for q in queries:
+        top(vectors @ q, k)
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print(f"{len(vectors)} vectors, dim={vectors.shape[1]}, k={k}, rerank_k={rerank_k}")
+    print(f"{'storage':>8} {'bytes/vec':>10} {'recall coarse':>14} {'recall rerank':>14} {'ms/query':>9}")
+    print(f"{'exact':>8} {vectors.shape[1] * 4:>10} {1.0:>14.4f} {1.0:>14.4f} {exact_ms:>9.2f}")
+    for kind in QUANTIZERS[1:]:
+        quantizer = make_quantizer(kind, pq_m=args.pq_m)
+        sample = vectors[rng.choice(len(vectors), min(args.train_size, len(vectors)), replace=False)]
+        quantizer.fit(sample)
+        codes = quantizer.encode(vectors)
+
+        coarse_hits = rerank_hits = 0
+        start = time.perf_counter()
+        for q, expected in zip(queries, truth):
+            candidates = np.sort(top(quantizer.scores(q, codes), rerank_k))
+            reranked = candidates[top(vectors[candidates] @ q, k)]
+            rerank_hits += len(expected & set(reranked.tolist()))
+        elapsed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        for q, expected in zip(queries, truth):
+            coarse_hits += len(expected & set(top(quantizer.scores(q, codes), k).tolist()))
+
+        total = k * len(queries)
+        print(f"{kind:>8} {codes.nbytes / len(codes):>10.0f} {coarse_hits / total:>14.4f} "
+              f"{rerank_hits / total:>14.4f} {elapsed_ms:>9.2f}")
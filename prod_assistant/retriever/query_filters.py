@@ -0,0 +1,170 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+# Numeric metadata written at ingestion time next to the display strings.
+PRICE_FIELD = "price_value"
+RATING_FIELD = "rating_value"
+REVIEWS_FIELD = "review_count"
+
+_MULTIPLIERS = {"k": 1e3, "thousand": 1e3, "l": 1e5, "lac": 1e5, "lacs": 1e5, "lakh": 1e5, "lakhs": 1e5}
+
+_NUMBER = r"(\d[\d,]*(?:\.\d+)?)"
+_CURRENCY = r"(?:₹|rs\.?|inr|rupees)"
+_MULT = r"(k|thousand|lakhs?|lacs?|l)?"
+# Numbers followed by a unit ("5000 mah", "120 hz") are specs, not prices.
+_UNIT = r"(?!\s*(?:mah|gb|tb|mp|hz|w|mm|cm|inch|inches|hours?|days?|months?|years?)\b|\s*%)"
+_PRICE = rf"({_CURRENCY})?\s*{_NUMBER}\s*{_MULT}\b{_UNIT}\s*({_CURRENCY})?"
+
+_PRICE_BETWEEN = re.compile(rf"(?:between|from)\s+{_PRICE}\s*(?:and|to|-)\s*{_PRICE}")
+_PRICE_MAX = re.compile(
+    rf"(?:under|below|less than|lesser than|cheaper than|within|up ?to|max(?:imum)?|not more than|<=?)\s*{_PRICE}"
+)
+_PRICE_MIN = re.compile(rf"(?:above|over|more than|greater than|at least|min(?:imum)?|starting(?: at| from)?|>=?)\s*{_PRICE}")
+
+_RATING_MIN = (
+    re.compile(r"(?:rated|ratings?)\s*(?:of\s*)?(?:above|over|at least|more than|>=?)?\s*(\d(?:\.\d)?)\s*\+?(?:\s*stars?)?"),
+    re.compile(r"(?:(?:above|over|at least|more than|min(?:imum)?|>=?)\s*)?(\d(?:\.\d)?)\s*\+?\s*(?:stars?|star rating)"
+               r"(?:\s*(?:and|or|&)\s*(?:above|up|more|higher))?"),
+)
+_REVIEWS_MIN = re.compile(
+    rf"(?:at least|over|more than|above|min(?:imum)?)\s*{_NUMBER}\s*{_MULT}\b\s*(?:customer\s+)?(?:reviews|ratings)"
+)
+
+_SORTS = (
+    (re.compile(r"\b(?:cheapest|lowest price|least expensive|low to high)\b"), PRICE_FIELD, False),
+    (re.compile(r"\b(?:most expensive|highest price|costliest|high to low)\b"), PRICE_FIELD, True),
+    (re.compile(r"\b(?:best|highest|top)[ -]rated\b"), RATING_FIELD, True),
+    (re.compile(r"\b(?:most reviewed|most popular)\b"), REVIEWS_FIELD, True),
+)
+
+
+def parse_number(value) -> Optional[float]:
+    """First number in a display value such as "₹89,900", "4.6" or "1,234 Reviews"."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value) if value == value else None
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", str(value or ""))
+    return float(match.group(0).replace(",", "")) if match else None
+
+
+def numeric_metadata(price, rating, total_reviews) -> dict:
+    """Numeric price/rating/review fields for a product; unparseable values are left out."""
+    fields = {PRICE_FIELD: parse_number(price), RATING_FIELD: parse_number(rating)}
+    reviews = parse_number(total_reviews)
+    fields[REVIEWS_FIELD] = int(reviews) if reviews is not None else None
+    return {key: value for key, value in fields.items() if value is not None}
+
+
+def _amount(number: str, multiplier: Optional[str]) -> float:
+    return float(number.replace(",", "")) * _MULTIPLIERS.get(multiplier or "", 1)
+
+
+def _price(match: re.Match, offset: int = 0) -> Optional[float]:
+    """Amount from a _PRICE group set; bare small numbers ("under 6 inches") are not prices."""
+    before, number, multiplier, after = match.group(offset + 1, offset + 2, offset + 3, offset + 4)
+    amount = _amount(number, multiplier)
+    if before or after or multiplier or amount >= 100:
+        return amount
+    return None
+
+
+@dataclass
+class QueryConstraints:
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    min_rating: Optional[float] = None
+    min_reviews: Optional[int] = None
+    sort_by: Optional[str] = None
+    descending: bool = False
+
+    def to_filter(self) -> Optional[dict]:
+        """Metadata range filter for the vector store / BM25 index, or None."""
+        ranges = {
+            PRICE_FIELD: {"$gte": self.min_price, "$lte": self.max_price},
+            RATING_FIELD: {"$gte": self.min_rating},
+            REVIEWS_FIELD: {"$gte": self.min_reviews},
+        }
+        filter = {}
+        for field, bounds in ranges.items():
+            bounds = {op: value for op, value in bounds.items() if value is not None}
+            if bounds:
+                filter[field] = bounds
+        return filter or None
+
+    def order(self, docs: List[Document]) -> List[Document]:
+        """Sort documents for "cheapest" / "top rated" queries; documents without the field go last."""
+        if not self.sort_by:
+            return docs
+        present = [d for d in docs if isinstance(d.metadata.get(self.sort_by), (int, float))]
+        missing = [d for d in docs if not isinstance(d.metadata.get(self.sort_by), (int, float))]
+        return sorted(present, key=lambda d: d.metadata[self.sort_by], reverse=self.descending) + missing
+
+
+def parse_query_constraints(query: str) -> QueryConstraints:
+    """
+    Pull price, rating, review-count and sort constraints out of a shopping query,
+    e.g. "iphone under 1,00,000 INR rated 4.5+" -> max_price=100000, min_rating=4.5.
+    Understands ₹/rs/inr, Indian digit grouping and k / lakh multipliers.
+    """
+    text = query.lower()
+    constraints = QueryConstraints()
+
+    # Ratings and review counts first, then blank them so "above 4 stars" is not read as a price.
+    for pattern in _RATING_MIN:
+        for match in pattern.finditer(text):
+            value = float(match.group(1))
+            if value <= 5:
+                constraints.min_rating = max(constraints.min_rating or 0, value)
+                text = text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+    for match in _REVIEWS_MIN.finditer(text):
+        constraints.min_reviews = int(_amount(match.group(1), match.group(2)))
+        text = text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+
+    for match in _PRICE_BETWEEN.finditer(text):
+        low, high = _price(match), _price(match, 4)
+        if low is not None and high is not None:
+            constraints.min_price, constraints.max_price = min(low, high), max(low, high)
+            text = text[:match.start()] + " " * (match.end() - match.start()) + text[match.end():]
+    for match in _PRICE_MAX.finditer(text):
+        amount = _price(match)
+        if amount is not None:
+            constraints.max_price = amount
+    for match in _PRICE_MIN.finditer(text):
+        amount = _price(match)
+        if amount is not None:
+            constraints.min_price = amount
+
+    for pattern, field, descending in _SORTS:
+        if pattern.search(text):
+            constraints.sort_by, constraints.descending = field, descending
+            break
+    return constraints
+
+
+class FilteredRetriever(BaseRetriever):
+    """
+    Parses price/rating/review constraints from the query and passes them as a
+    metadata pre-filter to the wrapped retriever, so similarity search only
+    ranks products that satisfy them; results are then ordered for sort queries.
+    """
+
+    base: BaseRetriever
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        constraints = parse_query_constraints(query)
+        filter = constraints.to_filter()
+        kwargs = {"filter": filter} if filter else {}
+        docs = self.base.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return constraints.order(docs)
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        constraints = parse_query_constraints(query)
+        filter = constraints.to_filter()
+        kwargs = {"filter": filter} if filter else {}
+        docs = await self.base.ainvoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        return constraints.order(docs)
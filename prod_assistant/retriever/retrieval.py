@@ -1,31 +1,49 @@
 import os
+import asyncio
 from pathlib import Path
-from langchain_astradb import AstraDBVectorStore
+from typing import Dict, List
+from langchain_core.documents import Document
 from dotenv import load_dotenv
-from langchain.retrievers.document_compressors import LLMChainFilter
 from langchain.retrievers import ContextualCompressionRetriever
+from prod_assistant.retriever.compressors import build_compressor
+from prod_assistant.retriever.mmr import MMRRetriever
+from prod_assistant.retriever.bm25_index import bm25_index_from_config
+from prod_assistant.retriever.hybrid import HybridRetriever
+from prod_assistant.retriever.query_filters import FilteredRetriever, parse_query_constraints
+from prod_assistant.retriever.vector_store import create_vector_store, vector_store_backend
 from prod_assistant.utils.config_loader import load_config
 from prod_assistant.utils.model_loader import ModelLoader
-from prod_assistant.evaluation.ragas_eval import evaluate_context_precision, evaluate_response_relevancy
 
 project_root = Path(__file__).resolve().parents[1]
 
 class Retriever:
-    def __init__(self):
-        """_summary___
+    def __init__(self, embeddings=None, llm=None):
+        """
+        embeddings / llm: already-loaded models to reuse instead of loading new copies.
         """
         self.model_loader=ModelLoader()
         self.config=load_config()
         self._load_env_variables()
         self.vstore = None
         self.retriever_instance = None
+        self.embeddings = embeddings
+        self.llm = llm
+        self.search_kwargs = None
+        self.mmr_retriever = None
+        self.lexical_retriever = None
+        self.search_retriever = None
+        self.query_filters = False
+        self.compressor = None
     
     def _load_env_variables(self):
         """_summary_
         """
         load_dotenv(project_root / ".env")
          
-        required_vars = [ "ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
+        # The local vector store needs no AstraDB credentials.
+        required_vars = []
+        if vector_store_backend(self.config) == "astra":
+            required_vars = [ "ASTRA_DB_API_ENDPOINT", "ASTRA_DB_APPLICATION_TOKEN", "ASTRA_DB_KEYSPACE"]
         
         missing_vars = [var for var in required_vars if os.getenv(var) is None]
         
@@ -41,36 +59,74 @@ class Retriever:
         """_summary_
         """
         if not self.vstore:
-            collection_name = self.config["astra_db"]["collection_name"]
+            self.embeddings = self.embeddings or self.model_loader.load_embeddings()
             
-            self.vstore =AstraDBVectorStore(
-                embedding= self.model_loader.load_embeddings(),
-                collection_name=collection_name,
+            self.vstore = create_vector_store(
+                self.config,
+                self.embeddings,
                 api_endpoint=self.db_api_endpoint,
                 token=self.db_application_token,
                 namespace=self.db_keyspace,
                 )
         if not self.retriever_instance:
-            top_k = self.config["retriever"]["top_k"] if "retriever" in self.config else 3
-            
-            mmr_retriever=self.vstore.as_retriever(
-                search_type="mmr",
-                search_kwargs={"k": top_k,
-                                "fetch_k": 25,
-                                "lambda_mult": 0.6,
-                                "score_threshold": 0.3
-                               })
-            print("Retriever loaded successfully.")
+            retriever_cfg = self.config.get("retriever", {})
+            top_k = retriever_cfg.get("top_k", 3)
             
-            llm = self.model_loader.load_llm()
+            self.search_kwargs = {"k": top_k,
+                                  "fetch_k": retriever_cfg.get("fetch_k", 25),
+                                  "lambda_mult": retriever_cfg.get("lambda_mult", 0.6),
+                                  "score_threshold": 0.3
+                                 }
+            # client: fetch candidates with vectors and re-rank locally (mmr.py)
+            # store: the vector store's own MMR search
+            if retriever_cfg.get("mmr", "client") == "client":
+                self.mmr_retriever = MMRRetriever(
+                    vectorstore=self.vstore,
+                    embeddings=self.embeddings,
+                    k=top_k,
+                    fetch_k=self.search_kwargs["fetch_k"],
+                    lambda_mult=self.search_kwargs["lambda_mult"],
+                )
+            else:
+                self.mmr_retriever = self.vstore.as_retriever(
+                    search_type="mmr",
+                    search_kwargs=self.search_kwargs)
             
-            compressor=LLMChainFilter.from_llm(llm)
+            # Fuse with BM25 matches on exact model names / product ids (see hybrid.py)
+            self.search_retriever = self.mmr_retriever
+            lexical_index = bm25_index_from_config(self.config)
+            if lexical_index is not None:
+                lexical_cfg = self.config.get("lexical_index", {})
+                self.lexical_retriever = HybridRetriever(
+                    dense=self.mmr_retriever,
+                    lexical=lexical_index,
+                    k=top_k,
+                    lexical_k=lexical_cfg.get("top_k", 10),
+                    rrf_k=lexical_cfg.get("rrf_k", 60),
+                )
+                self.search_retriever = self.lexical_retriever
+            # Price / rating / review constraints from the query pre-filter the search (see query_filters.py)
+            self.query_filters = retriever_cfg.get("query_filters", True)
+            if self.query_filters:
+                self.search_retriever = FilteredRetriever(base=self.search_retriever)
+            print("Retriever loaded successfully.")
             
-            self.retriever_instance = ContextualCompressionRetriever(
-                base_compressor=compressor, 
-                base_retriever=mmr_retriever
+            # llm_filter | batched_llm | embedding | none (see compressors.py)
+            self.compressor = build_compressor(
+                retriever_cfg.get("compressor", "batched_llm"),
+                llm_factory=lambda: self.llm or self.model_loader.load_llm(),
+                embeddings=self.embeddings,
+                similarity_threshold=retriever_cfg.get("embedding_threshold", 0.35),
             )
             
+            if self.compressor is None:
+                self.retriever_instance = self.search_retriever
+            else:
+                self.retriever_instance = ContextualCompressionRetriever(
+                    base_compressor=self.compressor, 
+                    base_retriever=self.search_retriever
+                )
+            
         return self.retriever_instance
             
     def call_retriever(self,query):
@@ -79,6 +135,40 @@ class Retriever:
         retriever=self.load_retriever()
         output=retriever.invoke(query)
         return output
+
+    async def abatch_retrieve(self, queries: List[str]) -> Dict[str, List[Document]]:
+        """
+        Retrieve documents for several queries: one batched embed_documents call,
+        concurrent (pre-filtered) candidate searches ranked by one batched MMR
+        pass and fused with BM25 matches, then the LLM filtering runs concurrently. Returns
+        documents keyed by query.
+        """
+        self.load_retriever()
+        unique = list(dict.fromkeys(queries))
+        vectors = await asyncio.to_thread(self.embeddings.embed_documents, unique)
+
+        constraints = [parse_query_constraints(q) if self.query_filters else None for q in unique]
+        filters = [c.to_filter() if c else None for c in constraints]
+
+        if isinstance(self.mmr_retriever, MMRRetriever):
+            doc_sets = await self.mmr_retriever.abatch_search(vectors, filters)
+        else:
+            doc_sets = await asyncio.gather(*(
+                self.vstore.amax_marginal_relevance_search_by_vector(
+                    v, **self.search_kwargs, **({"filter": f} if f else {})
+                ) for v, f in zip(vectors, filters)
+            ))
+        if self.lexical_retriever is not None:
+            doc_sets = [self.lexical_retriever.fuse(q, docs, f) for q, docs, f in zip(unique, doc_sets, filters)]
+        doc_sets = [c.order(docs) if c else docs for c, docs in zip(constraints, doc_sets)]
+
+        async def compress(query, docs):
+            if self.compressor is None:
+                return docs
+            return await self.compressor.acompress_documents(docs, query)
+
+        results = await asyncio.gather(*(compress(q, d) for q, d in zip(unique, doc_sets)))
+        return dict(zip(unique, results))
     
 if __name__=='__main__':
     user_query = "Can you suggest good budget iPhone under 1,00,00 INR?"
@@ -107,6 +197,9 @@ if __name__=='__main__':
     #this is not an actual output this have been written to test the pipeline
     response="iphone 16 plus, iphone 16, iphone 15 are best phones under 1,00,000 INR."
     
+    # Evaluation pulls in ragas, so it is only imported for this manual check.
+    from prod_assistant.evaluation.ragas_eval import evaluate_context_precision, evaluate_response_relevancy
+
     context_score = evaluate_context_precision(user_query,response,retrieved_contexts)
     relevancy_score = evaluate_response_relevancy(user_query,response,retrieved_contexts)
     
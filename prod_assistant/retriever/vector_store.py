@@ -0,0 +1,46 @@
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+VECTOR_STORE_BACKENDS = ("astra", "local")
+
+
+def vector_store_backend(config: dict) -> str:
+    backend = config.get("vector_store", {}).get("backend", "astra")
+    if backend not in VECTOR_STORE_BACKENDS:
+        raise ValueError(f"Unsupported vector_store backend '{backend}', expected one of {VECTOR_STORE_BACKENDS}")
+    return backend
+
+
+def create_vector_store(config: dict, embeddings: Embeddings, api_endpoint: str = None,
+                        token: str = None, namespace: str = None) -> VectorStore:
+    """
+    Vector store for `vector_store.backend`:
+    astra - AstraDBVectorStore (needs the ASTRA_DB_* credentials)
+    local - LocalVectorStore on disk under `vector_store.local_path`
+    """
+    if vector_store_backend(config) == "local":
+        from prod_assistant.retriever.local_store import LocalVectorStore
+
+        store_cfg = config.get("vector_store", {})
+        return LocalVectorStore(
+            embeddings,
+            path=store_cfg.get("local_path", "data/vector_store"),
+            index=store_cfg.get("index", "auto"),
+            hnsw_m=store_cfg.get("hnsw_m", 16),
+            ef_construction=store_cfg.get("hnsw_ef_construction", 200),
+            ef_search=store_cfg.get("hnsw_ef_search", 64),
+            storage=store_cfg.get("storage", "float32"),
+            rerank_k=store_cfg.get("rerank_k", 100),
+            pq_m=store_cfg.get("pq_m", 48),
+            compact_ratio=store_cfg.get("compact_ratio", 0.25),
+        )
+
+    from langchain_astradb import AstraDBVectorStore
+
+    return AstraDBVectorStore(
+        embedding=embeddings,
+        collection_name=config["astra_db"]["collection_name"],
+        api_endpoint=api_endpoint,
+        token=token,
+        namespace=namespace,
+    )
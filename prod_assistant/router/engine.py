@@ -0,0 +1,123 @@
+import asyncio
+import time
+from typing import Optional
+
+from prod_assistant.workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+class EngineNotReadyError(RuntimeError):
+    """Raised when the shared AgenticRAG engine is still warming up or failed to start."""
+
+
+class RAGEngine:
+    """
+    Process-wide holder for a single AgenticRAG instance.
+
+    The engine is warmed in a background task when the app starts, so the
+    server can answer /health while models and MCP tools are loading, and
+    every /get request afterwards reuses the same retriever, LLM client and
+    compiled graph. A failed warm-up is retried `retry_attempts` times with
+    exponential backoff; after that the engine reports "failed" until a
+    request arrives `retry_cooldown` seconds later, which starts a new round.
+    """
+
+    def __init__(self, ready_timeout: float = 30.0, retry_attempts: int = 3, retry_backoff: float = 2.0,
+                 retry_max_backoff: float = 30.0, retry_cooldown: float = 60.0):
+        self.ready_timeout = ready_timeout
+        self.retry_attempts = retry_attempts
+        self.retry_backoff = retry_backoff
+        self.retry_max_backoff = retry_max_backoff
+        self.retry_cooldown = retry_cooldown
+        self.agent: Optional[AgenticRAG] = None
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.warmup_seconds: Optional[float] = None
+        self._failed_at: Optional[float] = None
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self):
+        """Schedule the warm-up in the background and return immediately."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self):
+        self.state = "warming"
+        started = time.perf_counter()
+        for attempt in range(self.retry_attempts + 1):
+            self.attempts += 1
+            agent = None
+            try:
+                # Model loading is blocking; keep the event loop free for /health.
+                agent = await asyncio.to_thread(AgenticRAG, load_tools=False)
+                await agent.async_init()
+            except Exception as e:
+                self.error = str(e)
+                if agent is not None:
+                    await agent.aclose()
+                if attempt == self.retry_attempts:
+                    break
+                delay = min(self.retry_backoff * 2 ** attempt, self.retry_max_backoff)
+                self.state = "retrying"
+                log.warning("RAG engine warm-up failed, retrying", error=str(e), attempt=self.attempts,
+                            retry_in_seconds=delay)
+                await asyncio.sleep(delay)
+                continue
+            self.agent = agent
+            self.state = "ready"
+            self.error = None
+            self.warmup_seconds = round(time.perf_counter() - started, 3)
+            log.info("RAG engine ready", warmup_seconds=self.warmup_seconds, attempts=self.attempts)
+            self._ready.set()
+            return
+
+        self.state = "failed"
+        self._failed_at = time.monotonic()
+        log.error("RAG engine warm-up failed", error=self.error, attempts=self.attempts)
+        self._ready.set()
+
+    def _restart_after_cooldown(self):
+        """Start a new warm-up round once a failed engine has cooled down."""
+        if self.state == "failed" and time.monotonic() - self._failed_at >= self.retry_cooldown:
+            log.info("Retrying RAG engine warm-up after cool-down", cooldown_seconds=self.retry_cooldown)
+            self._ready.clear()
+            self._task = asyncio.create_task(self._warm_up())
+
+    async def get(self) -> AgenticRAG:
+        """Return the shared agent, waiting up to `ready_timeout` for warm-up to finish."""
+        self._restart_after_cooldown()
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout=self.ready_timeout)
+            except asyncio.TimeoutError:
+                raise EngineNotReadyError("Assistant is still warming up, please retry shortly.")
+        if self.agent is None:
+            raise EngineNotReadyError(f"Assistant failed to start: {self.error}")
+        return self.agent
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.agent is not None:
+            await self.agent.aclose()
+        self.agent = None
+        self.state = "stopped"
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "ready": self.is_ready,
+            "warmup_seconds": self.warmup_seconds,
+            "attempts": self.attempts,
+            "error": self.error,
+        }
@@ -1,14 +1,54 @@
 
+import json
+import uuid
+from contextlib import asynccontextmanager
+
 import uvicorn
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Request, Response, Form, HTTPException
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from langchain_core.messages import HumanMessage
-from workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+from prod_assistant.router.engine import RAGEngine, EngineNotReadyError
+from prod_assistant.utils.config_loader import load_config
+from prod_assistant.utils.concurrency import ProviderUnavailableError
+from prod_assistant.utils.model_loader import preload_models
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+# Each browser session gets its own conversation thread.
+SESSION_COOKIE = "shopbuddy_session"
+
+# Load the embedding model at import time so a forking server (gunicorn --preload)
+# loads it once in the master and the workers share the weights copy-on-write.
+if load_config().get("models", {}).get("preload", False):
+    log.info("Preloaded models", models=preload_models())
+
+
+def _session_id(request: Request) -> str:
+    return request.cookies.get(SESSION_COOKIE) or uuid.uuid4().hex
+
+
+def _set_session_cookie(response: Response, session_id: str):
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the AgenticRAG engine once per worker and share it across requests.
+    engine_cfg = load_config().get("engine", {})
+    app.state.engine = RAGEngine(
+        ready_timeout=engine_cfg.get("ready_timeout_seconds", 30),
+        retry_attempts=engine_cfg.get("retry_attempts", 3),
+        retry_backoff=engine_cfg.get("retry_backoff_seconds", 2),
+        retry_max_backoff=engine_cfg.get("retry_max_backoff_seconds", 30),
+        retry_cooldown=engine_cfg.get("retry_cooldown_seconds", 60),
+    )
+    app.state.engine.start()
+    yield
+    await app.state.engine.stop()
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
@@ -31,8 +71,18 @@ def status():
     }
 
 @app.get("/health")
-def health():
-    return {"ok": True}
+def health(request: Request):
+    engine = request.app.state.engine
+    return JSONResponse(
+        {"ok": engine.is_ready, "engine": engine.status()},
+        status_code=200 if engine.is_ready else 503,
+    )
+
+
+@app.get("/stats")
+async def stats(request: Request):
+    engine = request.app.state.engine
+    return await engine.agent.stats() if engine.is_ready else {"engine": engine.status()}
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -41,7 +91,50 @@ async def index(request: Request):
 
 
 @app.post("/get")
-async def chat(msg: str = Form(...)):
-    rag_agent = AgenticRAG()
-    answer = await rag_agent.run(msg)
-    return answer
\ No newline at end of file
+async def chat(request: Request, response: Response, msg: str = Form(...)):
+    try:
+        rag_agent = await request.app.state.engine.get()
+    except EngineNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    session_id = _session_id(request)
+    try:
+        answer = await rag_agent.run(msg, thread_id=session_id)
+    except ProviderUnavailableError as e:
+        # LLM provider queue is full or timed out; tell the client to back off.
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    _set_session_cookie(response, session_id)
+    return answer
+
+
+def _sse(event: dict) -> str:
+    """Encode one event as a Server-Sent Events frame."""
+    return f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+@app.post("/stream")
+async def chat_stream(request: Request, msg: str = Form(...)):
+    """Stream node transitions and answer tokens as Server-Sent Events."""
+    try:
+        rag_agent = await request.app.state.engine.get()
+    except EngineNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    session_id = _session_id(request)
+
+    async def event_source():
+        try:
+            async for event in rag_agent.stream(msg, thread_id=session_id):
+                yield _sse(event)
+        except ProviderUnavailableError as e:
+            log.warning("Streaming chat rejected by provider limiter", error=str(e))
+            yield _sse({"type": "error", "message": "The assistant is busy right now. Please try again in a few seconds."})
+        except Exception as e:
+            log.error("Streaming chat failed", error=str(e))
+            yield _sse({"type": "error", "message": "Something went wrong while answering. Please try again."})
+
+    response = StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    _set_session_cookie(response, session_id)
+    return response
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+T = TypeVar("T")
+
+
+class ProviderUnavailableError(RuntimeError):
+    """Base class for calls rejected or abandoned by a ProviderLimiter."""
+
+
+class ProviderBusyError(ProviderUnavailableError):
+    """The provider's wait queue is full or the caller waited too long for a slot."""
+
+
+class ProviderTimeoutError(ProviderUnavailableError):
+    """The provider accepted the call but did not answer within the request timeout."""
+
+
+class ProviderLimiter:
+    """
+    Concurrency limit plus bounded wait queue for one upstream provider.
+
+    At most `max_concurrency` calls run at once; up to `max_queue` more wait
+    for a slot for at most `queue_timeout` seconds. Anything beyond that is
+    rejected immediately with ProviderBusyError so callers get backpressure
+    instead of an ever-growing backlog.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 8, max_queue: int = 32,
+                 queue_timeout: float = 10.0, request_timeout: float = 60.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    async def call(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` once a slot is free, enforcing the queue and request limits."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            log.warning("Provider queue full", provider=self.name, waiting=self.waiting)
+            raise ProviderBusyError(f"{self.name} is busy, please retry shortly.")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            log.warning("Provider queue wait timed out", provider=self.name, timeout=self.queue_timeout)
+            raise ProviderBusyError(f"{self.name} is busy, please retry shortly.")
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            result = await asyncio.wait_for(fn(), timeout=self.request_timeout)
+            self.completed += 1
+            return result
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            log.warning("Provider call timed out", provider=self.name, timeout=self.request_timeout)
+            raise ProviderTimeoutError(f"{self.name} did not respond within {self.request_timeout}s.")
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+        }
+
+
+_LIMITERS: Dict[str, ProviderLimiter] = {}
+
+
+def get_limiter(name: str, **settings) -> ProviderLimiter:
+    """Return the process-wide limiter for `name`, creating it from `settings` on first use."""
+    if name not in _LIMITERS:
+        _LIMITERS[name] = ProviderLimiter(name, **settings)
+    return _LIMITERS[name]
+
+
+def limiter_settings(config: dict) -> dict:
+    """ProviderLimiter keyword arguments from a config block."""
+    return {
+        "max_concurrency": config.get("max_concurrency", 8),
+        "max_queue": config.get("max_queue", 32),
+        "queue_timeout": config.get("queue_timeout_seconds", 10),
+        "request_timeout": config.get("request_timeout_seconds", 60),
+    }
@@ -6,13 +6,48 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 load_dotenv(PROJECT_ROOT / ".env")
 from prod_assistant.utils.config_loader import load_config
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_google_genai import  ChatGoogleGenerativeAI
-# from langchain_openai import ChatOpenAI
-from langchain_groq import ChatGroq
 from prod_assistant.logger import GLOBAL_LOGGER as log
 from prod_assistant.exception.custom_exception import ProductAssistantException
+from prod_assistant.cache.embedding_cache import CachedEmbeddings, get_embedding_cache
 import asyncio
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Tuple
+
+
+# Process-wide model registry: one instance per (kind, provider, model, settings) key.
+_MODELS: Dict[Tuple, Any] = {}
+_MODEL_LOCKS: Dict[Tuple, threading.Lock] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def shared_model(key: Tuple, factory: Callable[[], Any]) -> Any:
+    """
+    Return the process-wide model for `key`, building it with `factory` on
+    first use. Concurrent callers for the same key wait for a single load;
+    different keys load independently.
+    """
+    with _REGISTRY_LOCK:
+        if key in _MODELS:
+            return _MODELS[key]
+        key_lock = _MODEL_LOCKS.setdefault(key, threading.Lock())
+    with key_lock:
+        if key not in _MODELS:
+            model = factory()
+            with _REGISTRY_LOCK:
+                _MODELS[key] = model
+            log.info("Model registered", kind=key[0], provider=key[1], model=key[2])
+        return _MODELS[key]
+
+
+def loaded_models() -> Dict[str, int]:
+    """Instances held by the registry per kind:provider:model, for /stats."""
+    with _REGISTRY_LOCK:
+        return dict(Counter(":".join(str(part) for part in key[:3]) for key in _MODELS))
+
+
+def _frozen(settings: dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in settings.items()))
 
 
 class ApiKeyManager:
@@ -48,13 +83,17 @@ class ModelLoader:
 
     
 
-    def load_embeddings(self):
+    def load_embeddings(self, cached: bool = True):
         """
-        Load and return embedding model from Google Generative AI.
+        Return the shared embedding model (loaded once per process, see shared_model).
+        cached: wrap it in the shared embedding cache (`embedding_cache` config);
+        bulk ingestion passes False so catalog documents do not evict hot queries.
         """
         try:
-            model_name = self.config["embedding_model"]["model_name"]
-            log.info("Loading embedding model", model=model_name)
+            embedding_cfg = self.config["embedding_model"]
+            model_name = embedding_cfg["model_name"]
+            backend = embedding_cfg.get("backend", "torch")
+            log.info("Loading embedding model", model=model_name, backend=backend)
 
             # Patch: Ensure an event loop exists for gRPC aio
             try:
@@ -62,15 +101,52 @@ class ModelLoader:
             except RuntimeError:
                 asyncio.set_event_loop(asyncio.new_event_loop())
 
-            return HuggingFaceEmbeddings(model_name=model_name)
+            onnx_cfg = embedding_cfg.get("onnx", {})
+            if backend == "onnx" and onnx_cfg.get("quantize", False):
+                cache_backend = "onnx-int8"
+            else:
+                cache_backend = backend
+            key = ("embeddings", embedding_cfg.get("provider", "huggingface"), model_name, backend,
+                   _frozen(onnx_cfg) if backend == "onnx" else ())
+            embeddings = shared_model(key, lambda: self._build_embeddings(model_name, backend, onnx_cfg))
+
+            cache_cfg = self.config.get("embedding_cache", {})
+            if cached and cache_cfg.get("enabled", True):
+                cache = get_embedding_cache(
+                    max_entries=cache_cfg.get("max_entries", 10000),
+                    sqlite_path=cache_cfg.get("sqlite_path"),
+                )
+                # Backends produce slightly different vectors, so they never share entries.
+                return CachedEmbeddings(embeddings, cache, f"{model_name}:{cache_backend}",
+                                        lowercase=cache_cfg.get("lowercase", False))
+            return embeddings
         except Exception as e:
             log.error("Error loading embedding model", error=str(e))
             raise ProductAssistantException("Failed to load embedding model", sys)
 
 
-    def load_llm(self):
+    def _build_embeddings(self, model_name: str, backend: str, onnx_cfg: dict):
+        if backend == "onnx":
+            # Imported here so the torch backend never needs onnxruntime.
+            from prod_assistant.utils.onnx_embeddings import OnnxEmbeddings
+
+            return OnnxEmbeddings(
+                model_name,
+                model_dir=onnx_cfg.get("model_dir"),
+                quantize=onnx_cfg.get("quantize", False),
+                threads=onnx_cfg.get("threads", 0),
+                batch_size=onnx_cfg.get("batch_size", 32),
+                max_length=onnx_cfg.get("max_length", 256),
+            )
+        if backend == "torch":
+            from langchain_huggingface import HuggingFaceEmbeddings
+
+            return HuggingFaceEmbeddings(model_name=model_name)
+        raise ValueError(f"Unsupported embedding backend '{backend}', expected 'torch' or 'onnx'")
+
+    def llm_settings(self):
         """
-        Load and return the configured LLM model.
+        Return (provider_key, config block) for the LLM selected by LLM_PROVIDER.
         """
         llm_block = self.config["llm"]
         provider_key = os.getenv("LLM_PROVIDER", "groq")
@@ -79,15 +155,32 @@ class ModelLoader:
             log.error("LLM provider not found in config", provider=provider_key)
             raise ValueError(f"LLM provider '{provider_key}' not found in config")
 
-        llm_config = llm_block[provider_key]
+        return provider_key, llm_block[provider_key]
+
+    def load_llm(self):
+        """
+        Return the shared client for the configured LLM (one per provider, model and settings).
+        """
+        _, llm_config = self.llm_settings()
         provider = llm_config.get("provider")
         model_name = llm_config.get("model_name")
         temperature = llm_config.get("temperature", 0.2)
         max_tokens = llm_config.get("max_output_tokens", 2048)
 
+        if provider not in ("google", "groq", "openai"):
+            log.error("Unsupported LLM provider", provider=provider)
+            raise ValueError(f"Unsupported LLM provider: {provider}")
+
+        key = ("llm", provider, model_name, temperature, max_tokens)
+        return shared_model(key, lambda: self._build_llm(provider, model_name, temperature, max_tokens))
+
+    def _build_llm(self, provider: str, model_name: str, temperature: float, max_tokens: int):
         log.info("Loading LLM", provider=provider, model=model_name)
 
+        # Provider integrations are imported on use so a worker only pays for the one it runs.
         if provider == "google":
+            from langchain_google_genai import ChatGoogleGenerativeAI
+
             return ChatGoogleGenerativeAI(
                 model=model_name,
                 google_api_key=self.api_key_mgr.get("GOOGLE_API_KEY"),
@@ -96,22 +189,39 @@ class ModelLoader:
             )
 
         elif provider == "groq":
+            from langchain_groq import ChatGroq
+
             return ChatGroq(
                 model=model_name,
                 api_key=self.api_key_mgr.get("GROQ_API_KEY"), #type: ignore
                 temperature=temperature,
             )
 
-        elif provider == "openai":
+        else:
+            from langchain_openai import ChatOpenAI
+
             return ChatOpenAI(
                 model=model_name,
                 api_key=self.api_key_mgr.get("OPENAI_API_KEY"),
                 temperature=temperature
             )
 
-        else:
-            log.error("Unsupported LLM provider", provider=provider)
-            raise ValueError(f"Unsupported LLM provider: {provider}")
+
+def preload_models(config: dict | None = None) -> Dict[str, int]:
+    """
+    Load the shared models before the server forks its workers (`models.preload`).
+
+    Only the embedding model is preloaded: its weights are then shared
+    copy-on-write by forked workers. LLM clients hold network connections and
+    are created per worker. ONNX Runtime sessions own thread pools that do not
+    survive fork, so the onnx backend is left to load in each worker.
+    """
+    config = config or load_config()
+    if config.get("embedding_model", {}).get("backend", "torch") == "onnx":
+        log.warning("Skipping embedding preload for the onnx backend (ONNX Runtime sessions are not fork-safe)")
+        return loaded_models()
+    ModelLoader().load_embeddings(cached=False)
+    return loaded_models()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,209 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+def resolve_model_dir(model_name: str, model_dir: Optional[str] = None) -> Path:
+    """Local directory with the ONNX export and tokenizer.json (downloaded from the Hub if not given)."""
+    if model_dir:
+        return Path(model_dir)
+    from huggingface_hub import snapshot_download
+
+    return Path(snapshot_download(model_name, allow_patterns=["onnx/model.onnx", "*.json"]))
+
+
+def find_onnx_model(model_dir: Path) -> Path:
+    for candidate in (model_dir / "model.onnx", model_dir / "onnx" / "model.onnx"):
+        if candidate.exists():
+            return candidate
+    raise FileNotFoundError(
+        f"No model.onnx under {model_dir}; export one with `optimum-cli export onnx --model <model_name> <dir>`"
+    )
+
+
+def quantized_model(model_path: Path) -> Path:
+    """Dynamic int8 weight quantization, done once and stored next to the fp32 model."""
+    target = model_path.with_name(model_path.stem + "_int8.onnx")
+    if not target.exists():
+        import onnx
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        log.info("Quantizing embedding model to int8", source=str(model_path), target=str(target))
+        # Workers starting together must not share files: the output goes to a unique temp file
+        # that os.replace publishes only once complete, and the model is passed as a ModelProto
+        # because quantize_dynamic writes a fixed "<model>-inferred.onnx" next to a path input.
+        with tempfile.NamedTemporaryFile(dir=target.parent, prefix=target.stem + ".", suffix=".tmp.onnx",
+                                         delete=False) as f:
+            tmp = f.name
+        try:
+            quantize_dynamic(onnx.load(str(model_path)), tmp, weight_type=QuantType.QInt8)
+            os.replace(tmp, target)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return target
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence-transformer embeddings served by ONNX Runtime on CPU.
+
+    Runs the exported transformer, then the same mean pooling and L2
+    normalization as the sentence-transformers pipeline. Texts are sorted by
+    token length and each batch is padded only to its own longest text, so a
+    short query never pays for a long review. `quantize` switches to a
+    dynamically int8-quantized copy of the model; `threads` sets ONNX
+    Runtime's intra-op thread count (0 = one per core).
+    """
+
+    def __init__(self, model_name: str, model_dir: Optional[str] = None, quantize: bool = False, threads: int = 0,
+                 batch_size: int = 32, max_length: int = 256, normalize: bool = True):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        directory = resolve_model_dir(model_name, model_dir)
+        model_path = find_onnx_model(directory)
+        if quantize:
+            model_path = quantized_model(model_path)
+
+        tokenizer_path = directory / "tokenizer.json"
+        if not tokenizer_path.exists():
+            tokenizer_path = model_path.parent / "tokenizer.json"
+        self.tokenizer = Tokenizer.from_file(str(tokenizer_path))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length)
+        self.pad_id = self.tokenizer.token_to_id("[PAD]") or 0
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.inter_op_num_threads = 1
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        outputs = [o.name for o in self.session.get_outputs()]
+        self.output_name = "last_hidden_state" if "last_hidden_state" in outputs else outputs[0]
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.batch_size = batch_size
+        self.normalize = normalize
+        log.info("ONNX embedding model loaded", model=model_name, path=str(model_path), threads=threads or "auto")
+
+    def _run(self, encodings) -> np.ndarray:
+        length = max(len(e.ids) for e in encodings)
+        input_ids = np.full((len(encodings), length), self.pad_id, dtype=np.int64)
+        attention_mask = np.zeros((len(encodings), length), dtype=np.int64)
+        for i, encoding in enumerate(encodings):
+            input_ids[i, :len(encoding.ids)] = encoding.ids
+            attention_mask[i, :len(encoding.ids)] = 1
+
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run([self.output_name], feeds)[0]
+
+        weights = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        if self.normalize:
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def embed_array(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), dim) float32 embeddings."""
+        encodings = self.tokenizer.encode_batch(list(texts))
+        order = np.argsort([len(e.ids) for e in encodings], kind="stable")
+        result = None
+        for start in range(0, len(order), self.batch_size):
+            rows = order[start:start + self.batch_size]
+            vectors = self._run([encodings[i] for i in rows])
+            if result is None:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[rows] = vectors
+        return result
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return self.embed_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_array([text])[0].tolist()
+
+
+def _sample_texts(count: int) -> List[str]:
+    csv_path = Path("data") / "product_reviews.csv"
+    texts = []
+    if csv_path.exists():
+        import pandas as pd
+
+        df = pd.read_csv(csv_path)
+        texts = [f"{row.product_title} | {row.top_reviews}" for row in df.itertuples()]
+    texts += [f"best budget phone number {i} with good camera and long battery life" for i in range(count)]
+    return texts[:count]
+
+
+if __name__ == "__main__":
+    # Parity check + throughput benchmark against the PyTorch backend:
+    # python -m prod_assistant.utils.onnx_embeddings [--model-dir DIR] [--texts 256] [--threads 0]
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compare ONNX embedding backends with sentence-transformers")
+    parser.add_argument("--model", default="sentence-transformers/all-MiniLM-L6-v2")
+    parser.add_argument("--model-dir", default=None)
+    parser.add_argument("--texts", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--min-cosine", type=float, default=0.999, help="fp32 ONNX vs PyTorch")
+    parser.add_argument("--min-cosine-int8", type=float, default=0.98, help="int8 ONNX vs PyTorch")
+    args = parser.parse_args()
+
+    texts = _sample_texts(args.texts)
+    queries = [f"phone under {10 + i}k with good camera" for i in range(args.queries)]
+    backends = {}
+    try:
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        backends["torch"] = HuggingFaceEmbeddings(model_name=args.model)
+    except Exception as e:
+        print(f"PyTorch backend unavailable ({e}); parity check skipped")
+    for name, quantize in (("onnx", False), ("onnx-int8", True)):
+        backends[name] = OnnxEmbeddings(args.model, model_dir=args.model_dir, quantize=quantize,
+                                        threads=args.threads, batch_size=args.batch_size)
+
+    reference = None
+    failed = False
+    print(f"{'backend':>10} {'docs/s':>9} {'query ms':>9} {'min cos':>8} {'mean cos':>9}")
+    for name, embeddings in backends.items():
+        embeddings.embed_documents(texts[:8])  # warm-up
+        start = time.perf_counter()
+        vectors = np.asarray(embeddings.embed_documents(texts), dtype=np.float32)
+        throughput = len(texts) / (time.perf_counter() - start)
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            embeddings.embed_query(query)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        min_cos = mean_cos = float("nan")
+        if name == "torch":
+            reference = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        elif reference is not None:
+            cosine = np.sum(reference * vectors / np.linalg.norm(vectors, axis=1, keepdims=True), axis=1)
+            min_cos, mean_cos = float(cosine.min()), float(cosine.mean())
+            threshold = args.min_cosine_int8 if name == "onnx-int8" else args.min_cosine
+            failed |= min_cos < threshold
+        print(f"{name:>10} {throughput:>9.1f} {np.median(latencies):>9.2f} {min_cos:>8.4f} {mean_cos:>9.4f}")
+
+    if failed:
+        print("Parity check FAILED")
+        sys.exit(1)
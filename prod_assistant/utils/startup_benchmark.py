@@ -0,0 +1,125 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from prod_assistant.utils.config_loader import load_config
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+DEFAULT_IMPORT_BUDGET = {
+    "prod_assistant.router.main": 4.0,
+    "prod_assistant.mcp_servers.product_search_saver": 4.0,
+    "prod_assistant.etl.data_ingestion": 4.0,
+}
+DEFAULT_LAZY_MODULES = [
+    "ragas", "langchain_google_genai", "langchain_groq", "langchain_openai", "langchain_huggingface",
+    "langchain_community", "sentence_transformers", "torch", "onnxruntime",
+]
+
+# Run in a fresh interpreter so nothing is already cached in sys.modules.
+_IMPORT_SCRIPT = """
+import importlib, json, sys, time
+lazy = json.loads(sys.argv[2])
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - started
+loaded = [m for m in lazy if m in sys.modules]
+print(json.dumps({"seconds": seconds, "loaded": loaded}))
+"""
+
+_ANSWER_SCRIPT = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from prod_assistant.workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+imported = time.perf_counter()
+
+async def main():
+    agent = AgenticRAG(load_tools=False)
+    await agent.async_init()
+    ready = time.perf_counter()
+    try:
+        answer = await agent.run(sys.argv[1])
+    finally:
+        await agent.aclose()
+    return ready, answer
+
+ready, answer = asyncio.run(main())
+done = time.perf_counter()
+print(json.dumps({"import": imported - started, "ready": ready - started, "answer": done - started,
+                  "preview": answer[:80]}))
+"""
+
+
+def _run_child(script: str, *args: str) -> dict:
+    result = subprocess.run([sys.executable, "-c", script, *args], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "child failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_import(module: str, lazy_modules: Sequence[str], runs: int = 3) -> Tuple[float, List[str]]:
+    """Median cold import time of `module` and the lazy modules it pulled in."""
+    samples = [_run_child(_IMPORT_SCRIPT, module, json.dumps(list(lazy_modules))) for _ in range(runs)]
+    return statistics.median(s["seconds"] for s in samples), samples[0]["loaded"]
+
+
+def measure_first_answer(query: str) -> dict:
+    """Wall time from process start to the first answer (needs LLM keys and the vector store)."""
+    started = time.perf_counter()
+    result = _run_child(_ANSWER_SCRIPT, query)
+    result["wall"] = time.perf_counter() - started
+    return result
+
+
+if __name__ == "__main__":
+    # Cold-start budget check: python -m prod_assistant.utils.startup_benchmark [--skip-answer]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure import time and time to first answer against startup_budget")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per module (median is reported)")
+    parser.add_argument("--skip-answer", action="store_true", help="only check imports (no LLM / vector store)")
+    parser.add_argument("--query", default="What is the price of iPhone 16?")
+    args = parser.parse_args()
+
+    budget = load_config().get("startup_budget", {})
+    import_budget = budget.get("import_seconds", DEFAULT_IMPORT_BUDGET)
+    lazy_modules = budget.get("lazy_modules", DEFAULT_LAZY_MODULES)
+    failures = []
+
+    print(f"{'module':<50} {'import s':>9} {'budget':>7}  eager heavy imports")
+    for module, limit in import_budget.items():
+        try:
+            seconds, loaded = measure_import(module, lazy_modules, args.runs)
+        except Exception as e:
+            print(f"{module:<50} {'error':>9} {limit:>7.2f}  {e}")
+            failures.append(f"{module}: import failed ({e})")
+            continue
+        print(f"{module:<50} {seconds:>9.3f} {limit:>7.2f}  {', '.join(loaded) or '-'}")
+        if seconds > limit:
+            failures.append(f"{module}: import took {seconds:.3f}s (budget {limit}s)")
+        if loaded:
+            failures.append(f"{module}: imports {', '.join(loaded)} at module level")
+
+    if not args.skip_answer:
+        limit = budget.get("first_answer_seconds", 45)
+        try:
+            result = measure_first_answer(args.query)
+            print(f"\nfirst answer: import {result['import']:.2f}s, ready {result['ready']:.2f}s, "
+                  f"answer {result['answer']:.2f}s, wall {result['wall']:.2f}s (budget {limit}s)")
+            print(f"  {result['preview']!r}")
+            if result["wall"] > limit:
+                failures.append(f"first answer took {result['wall']:.2f}s (budget {limit}s)")
+        except Exception as e:
+            failures.append(f"first answer failed ({e})")
+
+    if failures:
+        print("\nStartup budget exceeded:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nStartup budget OK")
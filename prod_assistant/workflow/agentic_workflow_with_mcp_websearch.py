@@ -1,69 +1,206 @@
-from typing import Annotated, Sequence, TypedDict, Literal
-from langchain_core.messages import BaseMessage, HumanMessage
+from typing import Annotated, AsyncIterator, Sequence, TypedDict, Literal
+from langchain_core.messages import AIMessageChunk, BaseMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.message import add_messages
-from langgraph.checkpoint.memory import MemorySaver
 
 from prod_assistant.prompt_library.prompts import PROMPT_REGISTRY, PromptType
 from prod_assistant.retriever.retrieval import Retriever
-from prod_assistant.utils.model_loader import ModelLoader
-from prod_assistant.evaluation.ragas_eval import evaluate_context_precision, evaluate_response_relevancy
+from prod_assistant.utils.model_loader import ModelLoader, loaded_models
+from prod_assistant.utils.config_loader import load_config
+from prod_assistant.utils.concurrency import ProviderUnavailableError, get_limiter, limiter_settings
+from prod_assistant.workflow.intent_router import Intent, IntentRouter, RETRIEVAL_INTENTS, split_comparison
+from prod_assistant.workflow.relevance_grader import LocalRelevanceGrader
+from prod_assistant.workflow.micro_batcher import MicroBatcher, parse_numbered_lines
+from prod_assistant.workflow.checkpointer import (
+    MemoryConversationStore, create_conversation_store, store_options, trim_history,
+)
+from prod_assistant.cache.semantic_cache import SemanticCache
+from prod_assistant.cache.embedding_cache import CachedEmbeddings
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from prod_assistant.mcp_servers.session_pool import MCPSessionPool
+from prod_assistant.mcp_servers.inprocess import InProcessTools
 import asyncio
+import json
+import numpy as np
 
 class AgenticRAG:
     """Agentic RAG pipeline using LangGraph + MCP (Retriever + WebSearch)."""
 
     class AgentState(TypedDict):
         messages: Annotated[Sequence[BaseMessage], add_messages]
+        question: str
+        grade: str
+        intent: str
+
+    # Fallback routing used only when the embedding intent router is disabled.
+    PRODUCT_KEYWORDS = ["price", "review", "product", "phone", "laptop", "budget", "iphone", "samsung", "oneplus"]
+
+    # Markers the MCP tools / nodes return when local retrieval produced nothing useful.
+    WEAK_RETRIEVAL_MARKERS = ("No local results found.", "No relevant product data found.", "Error", "not found in MCP client")
+    DOC_SEPARATOR = "\n\n---\n\n"
+
+    # Nodes whose LLM tokens are user-facing answers and get forwarded by stream().
+    ANSWER_NODES = ("Assistant", "Generator")
 
     # ---------- Initialization ----------
-    def __init__(self):
-        self.retriever_obj = Retriever()
+    def __init__(self, load_tools: bool = True):
         self.model_loader = ModelLoader()
         self.llm = self.model_loader.load_llm()
-        self.checkpointer = MemorySaver()
-
-        # Initialize MCP client
-        self.mcp_client = MultiServerMCPClient(
-            {
-                "hybrid_search": {
-                    "transport": "streamable-http",
-                    "url": "http://localhost:8001/mcp"
-                }
-            }
+        self.config = load_config()
+
+        # Per-provider concurrency limit shared by every LLM call in this worker
+        provider_key, llm_cfg = self.model_loader.llm_settings()
+        self.llm_limiter = get_limiter(f"llm:{provider_key}", **limiter_settings(llm_cfg))
+
+        # Per-thread conversation history; async_init() swaps in SQLite when configured
+        self.conversation_cfg = self.config.get("conversation", {})
+        self.conversations = MemoryConversationStore(**store_options(self.conversation_cfg))
+        self.checkpointer = self.conversations.saver
+
+        router_cfg = self.config.get("intent_router", {})
+        cache_cfg = self.config.get("semantic_cache", {})
+        grader_cfg = self.config.get("grader", {})
+        grader_mode = grader_cfg.get("mode", "hybrid")
+        self.embeddings = None
+        if router_cfg.get("enabled", True) or cache_cfg.get("enabled", True) or grader_mode != "llm":
+            self.embeddings = self.model_loader.load_embeddings()
+
+        # Retriever shares the already-loaded models (used directly by the in-process transport)
+        self.retriever_obj = Retriever(embeddings=self.embeddings, llm=self.llm)
+
+        # Embedding-based intent router (reuses the MiniLM embedding model)
+        self.intent_router = None
+        if router_cfg.get("enabled", True):
+            self.intent_router = IntentRouter(
+                self.embeddings,
+                min_confidence=router_cfg.get("min_confidence", 0.35),
+                min_margin=router_cfg.get("min_margin", 0.05),
+            )
+
+        # Semantic answer cache in front of the graph
+        self.answer_cache = None
+        if cache_cfg.get("enabled", True):
+            self.answer_cache = SemanticCache(
+                similarity_threshold=cache_cfg.get("similarity_threshold", 0.95),
+                ttl_seconds=cache_cfg.get("ttl_seconds", 3600),
+                max_entries=cache_cfg.get("max_entries", 1000),
+                invalidation_file=cache_cfg.get("invalidation_file", "data/.catalog_version"),
+                match_key_tokens=cache_cfg.get("match_key_tokens", True),
+            )
+
+        # Local relevance grading; the LLM grader only runs for ambiguous scores
+        self.relevance_grader = LocalRelevanceGrader(
+            self.embeddings,
+            mode=grader_mode,
+            accept_above=grader_cfg.get("accept_above", 0.55),
+            reject_below=grader_cfg.get("reject_below", 0.25),
+            separator=self.DOC_SEPARATOR,
         )
 
+        # Speculative fallback: start rewrite + web search alongside grading when retrieval looks weak
+        workflow_cfg = self.config.get("workflow", {})
+        self.speculative_fallback = workflow_cfg.get("speculative_fallback", True)
+        self.weak_min_docs = workflow_cfg.get("weak_min_docs", 2)
+
+        # Micro-batching: concurrent grader / rewriter prompts share one LLM request
+        batch_cfg = workflow_cfg.get("micro_batch", {})
+        self.micro_batch_mode = batch_cfg.get("mode", "prompt")
+        self.grade_batcher = self.rewrite_batcher = None
+        if batch_cfg.get("enabled", True):
+            batch_args = {
+                "window_ms": batch_cfg.get("window_ms", 5),
+                "max_batch_size": batch_cfg.get("max_batch_size", 8),
+            }
+            self.grade_batcher = MicroBatcher("grader", self._grade_batch, **batch_args)
+            self.rewrite_batcher = MicroBatcher("rewriter", self._rewrite_batch, **batch_args)
+
+        # MCP tools: "http" talks to the hybrid_search server through one long-lived
+        # pooled session, "inprocess" calls the same tool functions directly.
+        mcp_cfg = self.config.get("mcp", {})
+        transport = mcp_cfg.get("transport", "http")
+        if transport not in ("http", "inprocess"):
+            raise ValueError(f"Unsupported mcp.transport: {transport}")
+        self.mcp_client = None
+        if transport == "inprocess":
+            self.mcp_pool = InProcessTools(self.retriever_obj)
+        else:
+            self.mcp_client = MultiServerMCPClient(
+                {
+                    "hybrid_search": {
+                        "transport": "streamable_http",
+                        "url": mcp_cfg.get("url", "http://localhost:8001/mcp")
+                    }
+                }
+            )
+            self.mcp_pool = MCPSessionPool(
+                self.mcp_client,
+                "hybrid_search",
+                max_concurrent_calls=mcp_cfg.get("max_concurrent_calls", 16),
+                keepalive_seconds=mcp_cfg.get("keepalive_seconds", 30),
+                connect_timeout=mcp_cfg.get("connect_timeout_seconds", 5),
+            )
+
         # Build workflow
         self.workflow = self._build_workflow()
         self.app = self.workflow.compile(checkpointer=self.checkpointer)
 
-        # Load MCP tools asynchronously
-        asyncio.run(self._safe_async_init())
+        # Connect to the MCP server asynchronously. Callers that already run
+        # inside an event loop (e.g. the FastAPI lifespan) pass load_tools=False
+        # and await async_init() themselves.
+        if load_tools:
+            asyncio.run(self._safe_async_init())
 
     async def async_init(self):
-        """Load MCP tools asynchronously."""
-        self.mcp_tools = await self.mcp_client.get_tools()
+        """Async setup for callers inside an event loop: conversation store + MCP tools."""
+        if self.conversation_cfg.get("backend", "memory") != "memory":
+            self.conversations = await create_conversation_store(self.conversation_cfg)
+            self.checkpointer = self.conversations.saver
+            self.app = self.workflow.compile(checkpointer=self.checkpointer)
+        await self._safe_async_init()
+
+    async def aclose(self):
+        """Release resources opened by async_init()."""
+        await self.mcp_pool.aclose()
+        await self.conversations.close()
 
     async def _safe_async_init(self):
         """Safe async init wrapper (prevents event loop crash)."""
         try:
-            self.mcp_tools = await self.mcp_client.get_tools()
-            print("MCP tools loaded successfully:", [t.name for t in self.mcp_tools])
+            tools = await self.mcp_pool.get_tools()
+            print("MCP tools loaded successfully:", list(tools))
+        except Exception as e:
+            # The pool keeps reconnecting in the background.
+            print(f"Warning: Failed to load MCP tools — {e!r}")
+
+    async def _get_tool(self, name: str):
+        """Return a pooled MCP tool by name, or None if the server is unreachable or lacks it."""
+        try:
+            return await self.mcp_pool.get_tool(name)
         except Exception as e:
-            print(f"Warning: Failed to load MCP tools — {e}")
-            self.mcp_tools = []
+            print(f"Warning: MCP server unavailable — {e!r}")
+            return None
+
+    async def _call_llm(self, chain, inputs: dict, config: RunnableConfig | None = None) -> str:
+        """Invoke an LLM chain under the provider's concurrency and timeout limits."""
+        return await self.llm_limiter.call(lambda: chain.ainvoke(inputs, config=config))
 
     # ---------- Nodes ----------
-    def _ai_assistant(self, state: AgentState):
+    async def _ai_assistant(self, state: AgentState, config: RunnableConfig):
         print("--- CALL ASSISTANT ---")
         messages = state["messages"]
         last_message = messages[-1].content
 
-        if any(word in last_message.lower() for word in ["price", "review", "product","phone","laptop","budget","iphone","samsung","oneplus"]):
-            return {"messages": [HumanMessage(content="TOOL: retriever")]}
+        intent = await asyncio.to_thread(self._classify_intent, last_message)
+        if intent in RETRIEVAL_INTENTS:
+            return {"messages": [HumanMessage(content="TOOL: retriever")], "intent": intent.value}
+
+        canned = IntentRouter.canned_reply(intent, last_message)
+        if canned:
+            # Greetings and off-topic queries get a templated reply without an LLM round trip.
+            return {"messages": self._end_turn(messages, canned), "intent": intent.value}
         else:
             prompt = ChatPromptTemplate.from_template(
                 """You are ShopBuddy, an AI-powered shopping assistant. Answer the user directly.Your behavior rules:
@@ -85,14 +222,42 @@ class AgenticRAG:
                 \n\nQuestion: {question}\nAnswer:"""
             )
             chain = prompt | self.llm | StrOutputParser()
-            response = chain.invoke({"question": last_message}) or "I'm not sure about that."
-            return {"messages": [HumanMessage(content=response)]}
+            # Pass the node config through so stream() receives the LLM tokens.
+            response = await self._call_llm(chain, {"question": last_message}, config) or "I'm not sure about that."
+            return {"messages": self._end_turn(messages, response), "intent": ""}
+
+    def _end_turn(self, messages: list, reply: str) -> list:
+        """The turn's final reply plus RemoveMessage markers keeping the stored thread within the history caps."""
+        message = HumanMessage(content=reply)
+        removed = trim_history(
+            list(messages) + [message],
+            max_messages=self.conversation_cfg.get("max_messages", 20),
+            max_tokens=self.conversation_cfg.get("max_tokens", 4000),
+        )
+        return removed + [message]
+
+    def _classify_intent(self, query: str) -> Intent | None:
+        """Classify the query with the intent router, or the keyword list if it is disabled."""
+        if self.intent_router is None:
+            if any(word in query.lower() for word in self.PRODUCT_KEYWORDS):
+                return Intent.PRODUCT_LOOKUP
+            return None
+
+        decision = self.intent_router.classify(query)
+        print(f"Intent: {decision.intent} (score={decision.score:.2f}, margin={decision.margin:.2f})")
+        return decision.intent
 
     async def _vector_retriever(self, state: AgentState):
         print("--- RETRIEVER (MCP) ---")
-        query = state["messages"][-1].content
+        query = state["question"]
 
-        tool = next((t for t in self.mcp_tools if t.name == "get_product_info"), None)
+        # Comparisons look up every product in one batched MCP call.
+        if state.get("intent") == Intent.COMPARISON.value:
+            queries = split_comparison(query)
+            if len(queries) > 1:
+                return {"messages": [HumanMessage(content=await self._retrieve_batch(queries))]}
+
+        tool = await self._get_tool("get_product_info")
         if not tool:
             return {"messages": [HumanMessage(content="Retriever tool not found in MCP client.")]}
 
@@ -104,37 +269,139 @@ class AgenticRAG:
 
         return {"messages": [HumanMessage(content=context)]}
 
-    async def _web_search(self, state: AgentState):
-        print("--- WEB SEARCH (MCP) ---")
-        query = state["messages"][-1].content
-        tool = next((t for t in self.mcp_tools if t.name == "web_search"), None)
+    async def _retrieve_batch(self, queries: list) -> str:
+        """Look up several queries with get_product_info_batch and merge the product chunks."""
+        tool = await self._get_tool("get_product_info_batch")
+        if not tool:
+            return "Retriever tool not found in MCP client."
+        try:
+            results = json.loads(await tool.ainvoke({"queries": queries}))
+        except Exception as e:
+            return f"Error invoking retriever: {e}"
+
+        chunks = []
+        for query in queries:
+            context = results.get(query, "")
+            if not context or any(marker in context for marker in self.WEAK_RETRIEVAL_MARKERS):
+                continue
+            chunks.extend(c for c in context.split(self.DOC_SEPARATOR) if c not in chunks)
+        return self.DOC_SEPARATOR.join(chunks) or "No local results found."
+
+    async def _search_web(self, query: str) -> str:
+        tool = await self._get_tool("web_search")
         if not tool:
-            return {"messages": [HumanMessage(content="Web search tool not found in MCP client.")]}
+            return "Web search tool not found in MCP client."
         try:
             result = await tool.ainvoke({"query": query})
-            context = result if result else "No data from web"
+            return result if result else "No data from web"
         except Exception as e:
-            context = f"Error invoking web search: {e}"
+            return f"Error invoking web search: {e}"
+
+    async def _web_search(self, state: AgentState):
+        print("--- WEB SEARCH (MCP) ---")
+        query = state["messages"][-1].content
+        context = await self._search_web(query)
         return {"messages": [HumanMessage(content=context)]}
 
+    def _is_weak_retrieval(self, docs: str) -> bool:
+        """Cheap check for retrieval results that will most likely be graded irrelevant."""
+        if not docs.strip() or any(marker in docs for marker in self.WEAK_RETRIEVAL_MARKERS):
+            return True
+        return len(docs.split(self.DOC_SEPARATOR)) < self.weak_min_docs
+
+    async def _speculative_fallback(self, question: str) -> str:
+        """Rewrite the question and search the web; runs concurrently with grading."""
+        print("--- SPECULATIVE REWRITE + WEB SEARCH ---")
+        new_q = await self._rewrite_query(question)
+        return await self._search_web(new_q)
 
-    def _grade_documents(self, state: AgentState) -> Literal["generator", "rewriter"]:
+    async def _grade_documents(self, state: AgentState):
         print("--- GRADER ---")
-        question = state["messages"][0].content
+        question = state["question"]
         docs = state["messages"][-1].content
 
+        fallback = None
+        if self.speculative_fallback and self._is_weak_retrieval(docs):
+            fallback = asyncio.create_task(self._speculative_fallback(question))
+
+        try:
+            grade = await self._grade(question, docs)
+        except BaseException:
+            if fallback:
+                fallback.cancel()
+            raise
+
+        if grade == "yes":
+            if fallback:
+                fallback.cancel()
+            return {"grade": "yes"}
+        if fallback:
+            # The web context is already (being) fetched; hand it straight to the Generator.
+            web_context = await fallback
+            return {"grade": "web", "messages": [HumanMessage(content=web_context)]}
+        return {"grade": "no"}
+
+    async def _grade(self, question: str, docs: str) -> str:
+        """Grade locally when the embedding score is decisive, otherwise ask the LLM."""
+        grade = await asyncio.to_thread(self.relevance_grader.decide, question, docs)
+        if grade is not None:
+            print(f"Local grade: {grade}")
+            return grade
+
+        if self.grade_batcher:
+            score = await self.grade_batcher.submit({"question": question, "docs": docs})
+        else:
+            score = await self._call_llm(self._grade_chain(), {"question": question, "docs": docs})
+        return "yes" if "yes" in (score or "").lower() else "no"
+
+    def _grade_chain(self):
         prompt = PromptTemplate(
             template="""You are a grader. Question: {question}\nDocs: {docs}\n
             Are docs relevant to the question? Answer yes or no.""",
             input_variables=["question", "docs"],
         )
-        chain = prompt | self.llm | StrOutputParser()
-        score = chain.invoke({"question": question, "docs": docs}) or ""
-        return "generator" if "yes" in score.lower() else "rewriter"
+        return prompt | self.llm | StrOutputParser()
 
-    def _generate(self, state: AgentState):
+    async def _grade_batch(self, items: list) -> list:
+        listing = "\n\n".join(
+            f"Item {i}:\nQuestion: {item['question']}\nDocs: {item['docs']}" for i, item in enumerate(items, 1)
+        )
+        prompt = PromptTemplate.from_template(
+            """You are a grader. For each of the {count} items below, decide whether the docs are relevant to the question.\n
+            {items}\n
+            Reply with exactly one line per item in the form "<item number>: yes" or "<item number>: no"."""
+        )
+        return await self._run_batch(items, self._grade_chain(), prompt, {"items": listing, "count": len(items)})
+
+    async def _run_batch(self, items: list, single_chain, multi_prompt, multi_input: dict) -> list:
+        """
+        Answer a micro-batch with one multi-item prompt ("prompt" mode) or with
+        llm.abatch ("abatch" mode). Items missing from the multi-item reply are
+        retried individually.
+        """
+        if len(items) == 1 or self.micro_batch_mode == "abatch":
+            return await self._call_llm_batch(single_chain, items)
+
+        reply = await self._call_llm(multi_prompt | self.llm | StrOutputParser(), multi_input)
+        answers = parse_numbered_lines(reply, len(items))
+        missing = [i for i, answer in enumerate(answers) if answer is None]
+        if missing:
+            print(f"Micro-batch reply missed {len(missing)}/{len(items)} items, retrying them individually")
+            retried = await self._call_llm_batch(single_chain, [items[i] for i in missing])
+            for i, answer in zip(missing, retried):
+                answers[i] = answer
+        return answers
+
+    async def _call_llm_batch(self, chain, items: list) -> list:
+        """Send one call per item concurrently (abatch semantics); each call takes a provider slot."""
+        return await asyncio.gather(*(self._call_llm(chain, item) for item in items), return_exceptions=True)
+
+    def _route_after_grade(self, state: AgentState) -> Literal["generator", "rewriter"]:
+        return "generator" if state.get("grade") in ("yes", "web") else "rewriter"
+
+    async def _generate(self, state: AgentState, config: RunnableConfig):
         print("--- GENERATE ---")
-        question = state["messages"][0].content
+        question = state["question"]
         docs = state["messages"][-1].content
 
         prompt = ChatPromptTemplate.from_template(
@@ -143,27 +410,45 @@ class AgenticRAG:
         chain = prompt | self.llm | StrOutputParser()
 
         try:
-            response = chain.invoke({"context": docs, "question": question}) or "No response generated."
+            response = await self._call_llm(chain, {"context": docs, "question": question}, config) or "No response generated."
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
             response = f"Error generating response: {e}"
 
-        return {"messages": [HumanMessage(content=response)]}
-
-    def _rewrite(self, state: AgentState):
-        print("--- REWRITE ---")
-        question = state["messages"][0].content
+        return {"messages": self._end_turn(state["messages"], response)}
 
+    def _rewrite_chain(self):
         prompt = ChatPromptTemplate.from_template(
             "Rewrite this user query to make it more clear and specific for a search engine. "
             "Do NOT answer the query. Only rewrite it.\n\nQuery: {question}\nRewritten Query:"
         )
-        chain = prompt | self.llm | StrOutputParser()
+        return prompt | self.llm | StrOutputParser()
 
+    async def _rewrite_batch(self, items: list) -> list:
+        listing = "\n".join(f"{i}: {item['question']}" for i, item in enumerate(items, 1))
+        prompt = ChatPromptTemplate.from_template(
+            "Rewrite each of the following {count} user queries to make it more clear and specific for a search engine. "
+            "Do NOT answer the queries. Only rewrite them.\n\nQueries:\n{items}\n\n"
+            "Reply with exactly one line per query in the form \"<query number>: <rewritten query>\"."
+        )
+        return await self._run_batch(items, self._rewrite_chain(), prompt, {"items": listing, "count": len(items)})
+
+    async def _rewrite_query(self, question: str) -> str:
         try:
-            new_q = chain.invoke({"question": question}).strip()
+            if self.rewrite_batcher:
+                new_q = await self.rewrite_batcher.submit({"question": question})
+            else:
+                new_q = await self._call_llm(self._rewrite_chain(), {"question": question})
+            return new_q.strip()
+        except ProviderUnavailableError:
+            raise
         except Exception as e:
-            new_q = f"Error rewriting query: {e}"
+            return f"Error rewriting query: {e}"
 
+    async def _rewrite(self, state: AgentState):
+        print("--- REWRITE ---")
+        new_q = await self._rewrite_query(state["question"])
         return {"messages": [HumanMessage(content=new_q)]}
 
     # ---------- Build Workflow ----------
@@ -171,6 +456,7 @@ class AgenticRAG:
         workflow = StateGraph(self.AgentState)
         workflow.add_node("Assistant", self._ai_assistant)
         workflow.add_node("Retriever", self._vector_retriever)
+        workflow.add_node("Grader", self._grade_documents)
         workflow.add_node("Generator", self._generate)
         workflow.add_node("Rewriter", self._rewrite)
         workflow.add_node("WebSearch", self._web_search)
@@ -182,9 +468,10 @@ class AgenticRAG:
             lambda state: "Retriever" if "TOOL" in state["messages"][-1].content else END,
             {"Retriever": "Retriever", END: END},
         )
+        workflow.add_edge("Retriever", "Grader")
         workflow.add_conditional_edges(
-            "Retriever",
-            self._grade_documents,
+            "Grader",
+            self._route_after_grade,
             {"generator": "Generator", "rewriter": "Rewriter"},
         )
         workflow.add_edge("Generator", END)
@@ -193,17 +480,98 @@ class AgenticRAG:
 
         return workflow
 
+    # ---------- Semantic Cache ----------
+    def _embed_query(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    async def _cached_answer(self, query: str):
+        """Return (query_vector, cached_answer); both are None when the cache is disabled."""
+        if self.answer_cache is None:
+            return None, None
+        vector = await asyncio.to_thread(self._embed_query, query)
+        return vector, self.answer_cache.lookup(vector, query)
+
+    def _remember_answer(self, vector, query: str, answer: str):
+        if vector is not None and answer and not answer.startswith("Error"):
+            self.answer_cache.put(vector, query, answer)
+
+    async def stats(self) -> dict:
+        return {
+            "semantic_cache": self.answer_cache.stats() if self.answer_cache else None,
+            "embedding_cache": self.embeddings.cache.stats() if isinstance(self.embeddings, CachedEmbeddings) else None,
+            "grader": self.relevance_grader.stats(),
+            "llm_limiter": self.llm_limiter.stats(),
+            "mcp": self.mcp_pool.stats(),
+            "micro_batch": {
+                "mode": self.micro_batch_mode,
+                "grader": self.grade_batcher.stats(),
+                "rewriter": self.rewrite_batcher.stats(),
+            } if self.grade_batcher else None,
+            "conversations": await self.conversations.stats(),
+            "models": loaded_models(),
+        }
+
     # ---------- Public Run ----------
     async def run(self, query: str, thread_id: str = "default_thread") -> str:
         """Run the workflow for a given query and return the final answer."""
-        result = await self.app.ainvoke(
-            {"messages": [HumanMessage(content=query)]},
-            config={"configurable": {"thread_id": thread_id}}
-        )
-        return result["messages"][-1].content
+        vector, cached = await self._cached_answer(query)
+        if cached is not None:
+            return cached
+
+        async with self.conversations.thread_lock(thread_id):
+            result = await self.app.ainvoke(
+                {"messages": [HumanMessage(content=query)], "question": query},
+                config={"configurable": {"thread_id": thread_id}}
+            )
+            await self.conversations.after_turn(thread_id)
+        answer = result["messages"][-1].content
+        self._remember_answer(vector, query, answer)
+        return answer
+
+    async def stream(self, query: str, thread_id: str = "default_thread") -> AsyncIterator[dict]:
+        """
+        Run the workflow and yield events as they happen:
+        {"type": "node", "node": ...} when a node starts,
+        {"type": "token", "content": ...} for answer tokens from Assistant/Generator,
+        {"type": "done", "answer": ...} with the final answer.
+        """
+        vector, cached = await self._cached_answer(query)
+        if cached is not None:
+            yield {"type": "done", "answer": cached, "cached": True}
+            return
+
+        config = {"configurable": {"thread_id": thread_id}}
+        async with self.conversations.thread_lock(thread_id):
+            async for mode, chunk in self.app.astream(
+                {"messages": [HumanMessage(content=query)], "question": query},
+                config=config,
+                stream_mode=["tasks", "messages"],
+            ):
+                if mode == "tasks":
+                    # Task payloads carry "input" when a node starts and "result" when it ends.
+                    if "input" in chunk:
+                        yield {"type": "node", "node": chunk["name"]}
+                    elif chunk["name"] == "Grader" and ("grade", "web") in chunk.get("result", []):
+                        # The Grader already ran the web search speculatively.
+                        yield {"type": "node", "node": "WebSearch", "speculative": True}
+                elif mode == "messages":
+                    message, metadata = chunk
+                    if (
+                        isinstance(message, AIMessageChunk)
+                        and message.content
+                        and metadata.get("langgraph_node") in self.ANSWER_NODES
+                    ):
+                        yield {"type": "token", "content": message.content}
+
+            final_state = await self.app.aget_state(config)
+            answer = final_state.values["messages"][-1].content
+            await self.conversations.after_turn(thread_id)
+        self._remember_answer(vector, query, answer)
+        yield {"type": "done", "answer": answer}
 
 # ---------- Standalone Test ----------
 if __name__ == "__main__":
     rag_agent = AgenticRAG()
-    answer = rag_agent.run("What is the price of iPhone 16?")
+    answer = asyncio.run(rag_agent.run("What is the price of iPhone 16?"))
     print("\nFinal Answer:\n", answer)
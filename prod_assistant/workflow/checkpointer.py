@@ -0,0 +1,258 @@
+import asyncio
+import time
+import weakref
+from typing import Dict, List
+
+from langchain_core.messages import BaseMessage, RemoveMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.checkpoint.memory import MemorySaver
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+def trim_history(messages: List[BaseMessage], max_messages: int, max_tokens: int) -> List[RemoveMessage]:
+    """
+    Return RemoveMessage markers for the oldest messages so that the thread
+    keeps at most `max_messages` messages and roughly `max_tokens` tokens.
+    The newest message is never removed. Pass the messages including the
+    turn's final reply so the stored history stays within the caps.
+    """
+    keep = list(messages)
+    drop = []
+    while len(keep) > 1 and (
+        len(keep) > max_messages or count_tokens_approximately(keep) > max_tokens
+    ):
+        drop.append(keep.pop(0))
+    return [RemoveMessage(id=m.id) for m in drop if m.id]
+
+
+class ConversationStore:
+    """
+    LangGraph checkpointer plus per-thread housekeeping.
+
+    Every `prune_every_turns` turns only the latest `keep_checkpoints`
+    checkpoints of the thread are kept, and threads idle for longer than
+    `idle_ttl_seconds` (or beyond `max_threads`, least recently used first)
+    are deleted. Callers hold `thread_lock(thread_id)` around a turn and its
+    `after_turn`, so a prune never runs while the same thread is mid-turn.
+    """
+
+    def __init__(self, saver, idle_ttl_seconds: float = 1800, max_threads: int = 5000,
+                 keep_checkpoints: int = 1, sweep_interval_seconds: float = 60, prune_every_turns: int = 5):
+        self.saver = saver
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.max_threads = max_threads
+        self.keep_checkpoints = keep_checkpoints
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self.prune_every_turns = max(1, prune_every_turns)
+        self._last_sweep = time.monotonic()
+        self._turns: Dict[str, int] = {}
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self.evicted_threads = 0
+
+    def thread_lock(self, thread_id: str) -> asyncio.Lock:
+        """Lock serializing the turns (and pruning) of one thread in this worker."""
+        lock = self._locks.get(thread_id)
+        if lock is None:
+            lock = self._locks[thread_id] = asyncio.Lock()
+        return lock
+
+    async def after_turn(self, thread_id: str):
+        """Record activity for the thread, prune its old checkpoints and sweep idle threads."""
+        await self._touch(thread_id)
+        turns = self._turns.get(thread_id, 0) + 1
+        if turns >= self.prune_every_turns:
+            await self._prune(thread_id)
+            turns = 0
+        self._turns[thread_id] = turns
+        if time.monotonic() - self._last_sweep >= self.sweep_interval_seconds:
+            self._last_sweep = time.monotonic()
+            await self.evict_idle()
+
+    async def evict_idle(self):
+        for thread_id in await self._idle_threads():
+            lock = self.thread_lock(thread_id)
+            if lock.locked():
+                continue  # mid-turn, so not idle after all
+            async with lock:
+                await self.saver.adelete_thread(thread_id)
+                await self._forget(thread_id)
+            self._turns.pop(thread_id, None)
+            self.evicted_threads += 1
+        log.info("Conversation threads swept", evicted_total=self.evicted_threads)
+
+    async def close(self):
+        """Release backend resources (e.g. the SQLite connection thread)."""
+
+    # Backend-specific bookkeeping
+    async def _touch(self, thread_id: str):
+        raise NotImplementedError
+
+    async def _forget(self, thread_id: str):
+        raise NotImplementedError
+
+    async def _idle_threads(self) -> List[str]:
+        raise NotImplementedError
+
+    async def _prune(self, thread_id: str):
+        raise NotImplementedError
+
+    async def active_threads(self) -> int:
+        raise NotImplementedError
+
+    async def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "active_threads": await self.active_threads(),
+            "evicted_threads": self.evicted_threads,
+        }
+
+
+class MemoryConversationStore(ConversationStore):
+    """Per-worker in-memory conversations backed by LangGraph's MemorySaver."""
+
+    def __init__(self, **kwargs):
+        super().__init__(MemorySaver(), **kwargs)
+        self._last_seen: Dict[str, float] = {}
+
+    async def _touch(self, thread_id: str):
+        self._last_seen.pop(thread_id, None)
+        self._last_seen[thread_id] = time.time()  # dict keeps LRU order
+
+    async def _forget(self, thread_id: str):
+        self._last_seen.pop(thread_id, None)
+
+    async def _idle_threads(self) -> List[str]:
+        cutoff = time.time() - self.idle_ttl_seconds
+        ordered = list(self._last_seen.items())
+        overflow = max(0, len(ordered) - self.max_threads)
+        return [tid for i, (tid, seen) in enumerate(ordered) if i < overflow or seen < cutoff]
+
+    async def active_threads(self) -> int:
+        return len(self._last_seen)
+
+    async def _prune(self, thread_id: str):
+        # MemorySaver keeps every step's checkpoint and channel blobs. Keep the newest
+        # checkpoints of each namespace: delete the thread and put them back through the
+        # public checkpointer API (alist yields newest first).
+        saver = self.saver
+        config = {"configurable": {"thread_id": thread_id}}
+        latest: Dict[str, list] = {}
+        stale = 0
+        async for saved in saver.alist(config):
+            kept = latest.setdefault(saved.config["configurable"]["checkpoint_ns"], [])
+            if len(kept) < self.keep_checkpoints:
+                kept.append(saved)
+            else:
+                stale += 1
+        if not stale:
+            return
+
+        await saver.adelete_thread(thread_id)
+        for ns, kept in latest.items():
+            kept_ids = {saved.config["configurable"]["checkpoint_id"] for saved in kept}
+            for saved in reversed(kept):
+                put_config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ns}}
+                parent = (saved.parent_config or {}).get("configurable", {}).get("checkpoint_id")
+                if parent in kept_ids:
+                    put_config["configurable"]["checkpoint_id"] = parent
+                put_config = await saver.aput(put_config, saved.checkpoint, saved.metadata,
+                                              saved.checkpoint["channel_versions"])
+                writes: Dict[str, list] = {}
+                for task_id, channel, value in saved.pending_writes or []:
+                    writes.setdefault(task_id, []).append((channel, value))
+                for task_id, task_writes in writes.items():
+                    await saver.aput_writes(put_config, task_writes, task_id)
+
+
+class SqliteConversationStore(ConversationStore):
+    """Conversations in a SQLite file, shared by every uvicorn worker on the node."""
+
+    def __init__(self, saver, **kwargs):
+        super().__init__(saver, **kwargs)
+        self.conn = saver.conn
+
+    @classmethod
+    async def create(cls, path: str, busy_timeout_ms: int = 5000, **kwargs) -> "SqliteConversationStore":
+        try:
+            import aiosqlite
+            from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+        except ImportError as e:
+            raise ImportError(
+                "conversation.backend 'sqlite' requires the langgraph-checkpoint-sqlite package"
+            ) from e
+
+        conn = await aiosqlite.connect(path)
+        # Several uvicorn workers share the file: WAL lets readers run during a write,
+        # and busy_timeout makes a writer wait for the lock instead of failing at once.
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        await conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_activity (thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+        )
+        await conn.commit()
+        return cls(saver, **kwargs)
+
+    async def close(self):
+        await self.conn.close()
+
+    async def _touch(self, thread_id: str):
+        await self.conn.execute(
+            "INSERT INTO thread_activity (thread_id, last_seen) VALUES (?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET last_seen = excluded.last_seen",
+            (thread_id, time.time()),
+        )
+        await self.conn.commit()
+
+    async def _forget(self, thread_id: str):
+        await self.conn.execute("DELETE FROM thread_activity WHERE thread_id = ?", (thread_id,))
+        await self.conn.commit()
+
+    async def _idle_threads(self) -> List[str]:
+        cutoff = time.time() - self.idle_ttl_seconds
+        async with self.conn.execute(
+            "SELECT thread_id FROM thread_activity WHERE last_seen < ? OR thread_id IN ("
+            "SELECT thread_id FROM thread_activity ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+            (cutoff, self.max_threads),
+        ) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+    async def active_threads(self) -> int:
+        async with self.conn.execute("SELECT COUNT(*) FROM thread_activity") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def _prune(self, thread_id: str):
+        async with self.saver.lock:
+            for table in ("checkpoints", "writes"):
+                await self.conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_id NOT IN ("
+                    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT ?)",
+                    (thread_id, thread_id, self.keep_checkpoints),
+                )
+            await self.conn.commit()
+
+
+def store_options(config: dict) -> dict:
+    """ConversationStore keyword arguments from the `conversation` config block."""
+    return {
+        "idle_ttl_seconds": config.get("idle_ttl_seconds", 1800),
+        "max_threads": config.get("max_threads", 5000),
+        "sweep_interval_seconds": config.get("sweep_interval_seconds", 60),
+        "prune_every_turns": config.get("prune_every_turns", 5),
+    }
+
+
+async def create_conversation_store(config: dict) -> ConversationStore:
+    """Build the conversation store described by the `conversation` config block."""
+    backend = config.get("backend", "memory")
+    if backend == "sqlite":
+        path = config.get("sqlite_path", "data/checkpoints.sqlite")
+        return await SqliteConversationStore.create(
+            path, busy_timeout_ms=config.get("busy_timeout_ms", 5000), **store_options(config)
+        )
+    if backend != "memory":
+        raise ValueError(f"Unsupported conversation backend: {backend}")
+    return MemoryConversationStore(**store_options(config))
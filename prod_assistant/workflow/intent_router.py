@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+class Intent(str, Enum):
+    PRODUCT_LOOKUP = "product_lookup"
+    COMPARISON = "comparison"
+    CHIT_CHAT = "chit_chat"
+    OFF_TOPIC = "off_topic"
+
+
+# Seed utterances per intent; their mean embedding is the intent centroid.
+INTENT_EXAMPLES: Dict[Intent, List[str]] = {
+    Intent.PRODUCT_LOOKUP: [
+        "What is the price of iPhone 16?",
+        "Suggest a good budget phone under 20000",
+        "Best laptop for students under 60000 INR",
+        "Show me reviews of Samsung Galaxy S24",
+        "Is the OnePlus 12 worth buying?",
+        "Recommend noise cancelling headphones",
+        "Which smartwatch has the best battery life?",
+        "Any offers on Redmi Note 13 Pro?",
+    ],
+    Intent.COMPARISON: [
+        "iPhone 16 vs Samsung Galaxy S24",
+        "Compare OnePlus 12 and Google Pixel 8",
+        "Which is better, MacBook Air M2 or M3?",
+        "Difference between iPhone 15 and iPhone 16",
+        "Should I buy Vivo V30 or Oppo Reno 11?",
+        "Samsung S23 or S24, which one has the better camera?",
+    ],
+    Intent.CHIT_CHAT: [
+        "hi",
+        "hello there",
+        "hey, good morning",
+        "how are you?",
+        "thank you so much",
+        "thanks, that helps",
+        "what can you do?",
+        "who are you?",
+        "bye, see you later",
+    ],
+    Intent.OFF_TOPIC: [
+        "What is the capital of France?",
+        "Solve 2x + 5 = 15",
+        "Write a Python function to reverse a string",
+        "Who won the last election?",
+        "What's the weather like today?",
+        "Tell me a joke about cats",
+        "Explain the theory of relativity",
+    ],
+}
+
+# Replies for intents that never need retrieval or an LLM call.
+CANNED_REPLIES: Dict[Intent, str] = {
+    Intent.CHIT_CHAT: (
+        "Hi, I'm ShopBuddy, your shopping assistant. I can look up product prices, "
+        "summarize reviews and compare options for you. What are you shopping for today?"
+    ),
+    Intent.OFF_TOPIC: (
+        "I'm best at helping with shopping, like product prices, reviews and comparisons. "
+        "Is there a product you'd like me to look up?"
+    ),
+}
+
+# Chit-chat replies by sub-type, checked in order; the greeting above is the default.
+CHIT_CHAT_REPLIES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\b(?:thanks?|thank you|thx|ty|appreciate)\b", re.IGNORECASE),
+     "You're welcome! Let me know if there's another product you'd like me to look up."),
+    (re.compile(r"\b(?:bye|goodbye|see you|good night|take care)\b", re.IGNORECASE),
+     "Goodbye, and happy shopping! Come back any time you need help choosing a product."),
+    (re.compile(r"\b(?:what can you do|who are you|what are you|help me|how do you work)\b", re.IGNORECASE),
+     "I'm ShopBuddy, your shopping assistant. Ask me for product prices, review summaries "
+     "or a comparison between products, for example \"iPhone 16 vs Galaxy S24\"."),
+]
+
+# Words that mark a query as a product question whatever its nearest centroid.
+_PRODUCT_HINT = re.compile(
+    r"\b(?:price[sd]?|cost|costs|cheap(?:er|est)?|budget|buy|buying|deal|deals|offers?|discount|reviews?|"
+    r"rating|specs?|vs|versus|compare|phones?|mobiles?|laptops?|headphones?|earbuds|smartwatch|"
+    r"iphone|samsung|galaxy|oneplus|pixel|redmi|xiaomi|vivo|oppo|realme|macbook)\b|₹|\brs\.?\s*\d",
+    re.IGNORECASE,
+)
+
+RETRIEVAL_INTENTS = (Intent.PRODUCT_LOOKUP, Intent.COMPARISON)
+
+_COMPARISON_PREFIX = re.compile(r"^\s*(?:compare|difference between|which is better,?|should i buy)\s+", re.IGNORECASE)
+_COMPARISON_TAIL = re.compile(r"\?|,\s*(?:which|what|how|who)\b", re.IGNORECASE)
+_COMPARISON_SPLIT = re.compile(r"\s+(?:vs\.?|versus|or|and|compared to|with)\s+|\s*,\s*", re.IGNORECASE)
+
+
+def split_comparison(query: str, max_items: int = 4) -> List[str]:
+    """
+    Split a comparison query into one lookup per product, e.g.
+    "Compare OnePlus 12 and Google Pixel 8" -> ["OnePlus 12", "Google Pixel 8"].
+    Returns [query] when fewer than two products are found.
+    """
+    body = _COMPARISON_TAIL.split(_COMPARISON_PREFIX.sub("", query))[0]
+    parts = [p.strip(" .!") for p in _COMPARISON_SPLIT.split(body)]
+    parts = list(dict.fromkeys(p for p in parts if p))[:max_items]
+    return parts if len(parts) > 1 else [query]
+
+
+@dataclass
+class IntentDecision:
+    intent: Optional[Intent]
+    score: float
+    vector: np.ndarray
+    margin: float = 0.0  # top-1 minus top-2 centroid score
+
+
+class IntentRouter:
+    """
+    Nearest-centroid intent classifier over the already-loaded sentence embeddings.
+
+    Centroids are computed once at startup, so routing a query costs one
+    query embedding plus a (n_intents x dim) matrix-vector product.
+
+    Only product lookups cost a retrieval, so misrouting one to a canned reply
+    is the expensive mistake: a chit-chat / off-topic winner needs a lead of
+    `min_margin` over a retrieval runner-up, queries with product words go to
+    retrieval even below `min_confidence`, and a narrow win between two
+    non-retrieval intents returns intent=None (answered by the LLM).
+    """
+
+    def __init__(self, embeddings, min_confidence: float = 0.35, min_margin: float = 0.05):
+        self.embeddings = embeddings
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+        self.intents: List[Intent] = list(INTENT_EXAMPLES)
+
+        examples = [text for intent in self.intents for text in INTENT_EXAMPLES[intent]]
+        vectors = self._normalize(np.asarray(embeddings.embed_documents(examples), dtype=np.float32))
+
+        centroids, start = [], 0
+        for intent in self.intents:
+            count = len(INTENT_EXAMPLES[intent])
+            centroids.append(vectors[start:start + count].mean(axis=0))
+            start += count
+        self.centroids = self._normalize(np.stack(centroids))
+        log.info("Intent router ready", intents=[i.value for i in self.intents])
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def embed(self, query: str) -> np.ndarray:
+        return self._normalize(np.asarray(self.embeddings.embed_query(query), dtype=np.float32))
+
+    def classify_vector(self, vector: np.ndarray, query: Optional[str] = None) -> IntentDecision:
+        """Classify an already-normalized query vector; `query` enables the product-word check."""
+        scores = self.centroids @ vector
+        order = np.argsort(-scores)
+        best, runner_up = self.intents[order[0]], self.intents[order[1]]
+        score = float(scores[order[0]])
+        margin = score - float(scores[order[1]])
+
+        intent = best if score >= self.min_confidence else None
+        if intent not in RETRIEVAL_INTENTS:
+            if query is not None and _PRODUCT_HINT.search(query):
+                intent = Intent.PRODUCT_LOOKUP
+            elif intent is not None and margin < self.min_margin:
+                intent = runner_up if runner_up in RETRIEVAL_INTENTS else None
+        return IntentDecision(intent=intent, score=score, vector=vector, margin=margin)
+
+    def classify(self, query: str) -> IntentDecision:
+        """Return the closest intent, or intent=None when no centroid is close or clear enough."""
+        return self.classify_vector(self.embed(query), query)
+
+    @staticmethod
+    def canned_reply(intent: Optional[Intent], query: str = "") -> Optional[str]:
+        """Templated reply for chit-chat / off-topic intents, picked by chit-chat sub-type."""
+        if intent == Intent.CHIT_CHAT:
+            for pattern, reply in CHIT_CHAT_REPLIES:
+                if pattern.search(query):
+                    return reply
+        return CANNED_REPLIES.get(intent) if intent else None
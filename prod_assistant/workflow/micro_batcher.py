@@ -0,0 +1,99 @@
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+from prod_assistant.logger import GLOBAL_LOGGER as log
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent requests into batches.
+
+    Callers `await submit(item)`; items arriving within `window_ms` of the
+    first pending item (or until `max_batch_size` is reached) are handed to
+    `flush_fn` together, and each caller receives its own result. `flush_fn`
+    must return one result per input, in order.
+    """
+
+    def __init__(self, name: str, flush_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+                 window_ms: float = 5, max_batch_size: int = 8):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # The loop only keeps weak references to tasks; hold in-flight flushes until they finish.
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._schedule_flush)
+        return await future
+
+    def _schedule_flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._flush(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch: List[Tuple[Any, asyncio.Future]]):
+        # Drop callers that gave up while waiting (e.g. a cancelled speculative task).
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        try:
+            results = await self.flush_fn([item for item, _ in batch])
+        except Exception as e:
+            log.error("Micro-batch flush failed", batcher=self.name, size=len(batch), error=str(e))
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():  # caller was cancelled
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
+
+
+_NUMBERED_LINE = re.compile(r"^\s*(?:item\s*)?(\d+)\s*[:.)-]\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def parse_numbered_lines(text: str, count: int) -> List[Optional[str]]:
+    """
+    Split a multi-item LLM reply of the form "1: ...", "2: ..." into `count`
+    answers. Items the model skipped come back as None.
+    """
+    answers: List[Optional[str]] = [None] * count
+    for number, answer in _NUMBERED_LINE.findall(text or ""):
+        index = int(number) - 1
+        if 0 <= index < count and answers[index] is None:
+            answers[index] = answer
+    return answers
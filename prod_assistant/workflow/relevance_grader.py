@@ -0,0 +1,71 @@
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class LocalRelevanceGrader:
+    """
+    Embedding-based yes/no relevance check for retrieved context.
+
+    The question is compared with every retrieved product chunk using the
+    MiniLM embeddings already loaded by the workflow; the best cosine score
+    decides the grade. In "hybrid" mode scores between `reject_below` and
+    `accept_above` return None so the caller can fall back to the LLM grader.
+    In "local" mode the ambiguous band is split at its midpoint instead.
+    """
+
+    MODES = ("llm", "local", "hybrid")
+
+    def __init__(self, embeddings, mode: str = "hybrid", accept_above: float = 0.55,
+                 reject_below: float = 0.25, separator: str = "\n\n---\n\n"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unsupported grader mode '{mode}', expected one of {self.MODES}")
+        self.embeddings = embeddings
+        self.mode = mode
+        self.accept_above = accept_above
+        self.reject_below = reject_below
+        self.separator = separator
+
+        self._lock = threading.Lock()
+        self.counts = {"local_yes": 0, "local_no": 0, "llm": 0}
+
+    def score(self, question: str, docs: str) -> float:
+        chunks = [c for c in docs.split(self.separator) if c.strip()]
+        if not chunks:
+            return 0.0
+        vectors = np.asarray(self.embeddings.embed_documents([question] + chunks), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return float(np.max(vectors[1:] @ vectors[0]))
+
+    def decide(self, question: str, docs: str) -> Optional[str]:
+        """Return "yes"/"no" when the local score is decisive, else None (ask the LLM)."""
+        if self.mode == "llm":
+            self._count("llm")
+            return None
+
+        score = self.score(question, docs)
+        if score >= self.accept_above:
+            grade = "yes"
+        elif score < self.reject_below:
+            grade = "no"
+        elif self.mode == "local":
+            grade = "yes" if score >= (self.accept_above + self.reject_below) / 2 else "no"
+        else:
+            self._count("llm")
+            return None
+
+        self._count(f"local_{grade}")
+        return grade
+
+    def _count(self, key: str):
+        with self._lock:
+            self.counts[key] += 1
+
+    def stats(self) -> dict:
+        total = sum(self.counts.values())
+        return {
+            "mode": self.mode,
+            **self.counts,
+            "llm_rate": round(self.counts["llm"] / total, 4) if total else 0.0,
+        }
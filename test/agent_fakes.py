@@ -0,0 +1,136 @@
+"""Fakes for building an AgenticRAG without model downloads, API keys or an MCP server."""
+import re
+import zlib
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import StructuredTool
+from pydantic import Field
+
+
+class HashEmbeddings(Embeddings):
+    """Bag-of-words embeddings: texts sharing words are similar, no model needed."""
+
+    dim = 256
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % self.dim] += 1
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+class RuleChatModel(BaseChatModel):
+    """
+    Chat model answering the workflow's prompts by rule: the grader prompt gets
+    `grade`, the rewriter `rewrite`, anything else `answer`. Streams word by word.
+    """
+
+    grade: str = "yes"
+    rewrite: str = "rewritten query"
+    answer: str = "The iPhone 16 costs 79,900 rupees."
+    calls: List[str] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "rule"
+
+    def _reply(self, messages) -> str:
+        text = messages[-1].content
+        if "You are a grader" in text:
+            self.calls.append("grade")
+            return self.grade
+        if "Rewrite this user query" in text:
+            self.calls.append("rewrite")
+            return self.rewrite
+        self.calls.append("answer")
+        return self.answer
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=self._reply(messages)))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for token in re.findall(r"\S+\s*", self._reply(messages)):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class FakeModelLoader:
+    llm: BaseChatModel = None
+    embeddings = HashEmbeddings()
+
+    def load_llm(self):
+        return FakeModelLoader.llm
+
+    def load_embeddings(self):
+        return FakeModelLoader.embeddings
+
+    def llm_settings(self):
+        return "fake", {}
+
+
+class FakeRetriever:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class FakeToolPool:
+    """MCPSessionPool stand-in serving the given tools."""
+
+    def __init__(self, tools: Dict[str, StructuredTool]):
+        self.tools = tools
+
+    async def get_tools(self):
+        return self.tools
+
+    async def get_tool(self, name):
+        return self.tools.get(name)
+
+    async def aclose(self):
+        pass
+
+    def stats(self):
+        return {"fake": True}
+
+
+def _answer(reply, argument):
+    return reply(argument) if callable(reply) else reply
+
+
+def make_tools(product=None, web=None, batch=None) -> Dict[str, StructuredTool]:
+    """MCP-like tools; each reply is a string or a function of the tool's argument."""
+
+    async def get_product_info(query: str) -> str:
+        """Product information."""
+        return _answer(product, query)
+
+    async def get_product_info_batch(queries: List[str]) -> str:
+        """Product information for several queries."""
+        return _answer(batch, queries)
+
+    async def web_search(query: str) -> str:
+        """Web search."""
+        return _answer(web, query)
+
+    replies = {get_product_info: product, get_product_info_batch: batch, web_search: web}
+    return {fn.__name__: StructuredTool.from_function(coroutine=fn) for fn, reply in replies.items()
+            if reply is not None}
+
+
+PRODUCT_CONTEXT = "\n\n---\n\n".join([
+    "Title: Apple iPhone 16\nPrice: 79,900\nRating: 4.6\nReviews:\nGreat camera",
+    "Title: Apple iPhone 16 Plus\nPrice: 89,900\nRating: 4.5\nReviews:\nBig battery",
+])
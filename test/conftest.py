@@ -0,0 +1,45 @@
+import copy
+
+import pytest
+
+from prod_assistant.utils.config_loader import load_config
+from test.agent_fakes import FakeModelLoader, FakeRetriever, FakeToolPool, RuleChatModel
+
+
+def _merge(base: dict, overrides: dict) -> dict:
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        else:
+            base[key] = value
+    return base
+
+
+@pytest.fixture
+def make_agent(monkeypatch):
+    """
+    Build an AgenticRAG on fakes: RuleChatModel (or the given llm), hash embeddings
+    and a FakeToolPool. `config` is merged over config.yaml; by default the grader
+    always asks the LLM and micro-batching and the semantic cache are off.
+    """
+    from prod_assistant.workflow import agentic_workflow_with_mcp_websearch as wf
+
+    def make(llm=None, tools=None, config=None, load_tools=False, retriever=None):
+        merged = _merge(copy.deepcopy(load_config()), {
+            "grader": {"mode": "llm"},
+            "semantic_cache": {"enabled": False},
+            "workflow": {"micro_batch": {"enabled": False}},
+            "conversation": {"backend": "memory"},
+        })
+        _merge(merged, config or {})
+        monkeypatch.setattr(wf, "load_config", lambda: merged)
+        monkeypatch.setattr(wf, "ModelLoader", FakeModelLoader)
+        monkeypatch.setattr(wf, "Retriever", (lambda **kwargs: retriever) if retriever else FakeRetriever)
+        FakeModelLoader.llm = llm or RuleChatModel()
+
+        agent = wf.AgenticRAG(load_tools=load_tools)
+        if tools is not None:
+            agent.mcp_pool = FakeToolPool(tools)
+        return agent
+
+    return make
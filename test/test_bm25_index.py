@@ -0,0 +1,116 @@
+from langchain_core.documents import Document
+
+from prod_assistant.retriever.bm25_index import BM25Index, tokenize
+
+
+def _doc(text, **metadata):
+    return Document(page_content=text, metadata=metadata)
+
+
+def test_tokenize_splits_mixed_tokens():
+    assert tokenize("iPhone 16 256GB") == ["iphone", "16", "256gb", "256", "gb"]
+    assert tokenize("Hello, world!") == ["hello", "world"]
+
+
+def test_search_ranks_matching_documents(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add_documents([
+        _doc("Apple iPhone 16 256 GB black", product_id="p1"),
+        _doc("Samsung Galaxy S24 great camera", product_id="p2"),
+        _doc("Apple MacBook Air laptop", product_id="p3"),
+    ], ids=["p1", "p2", "p3"])
+    hits = index.search("iphone 256gb")
+    assert [doc.id for doc, _ in hits] == ["p1"]
+    assert [doc.id for doc, _ in index.search("apple")] in (["p1", "p3"], ["p3", "p1"])
+    assert index.search("nokia") == []
+    # product ids in metadata_fields are searchable too (the whole id ranks first)
+    assert index.search("p2")[0][0].id == "p2"
+
+
+def test_replace_delete_and_reload(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add_documents([_doc("old pixel phone"), _doc("galaxy phone")], ids=["a", "b"])
+    index.add_documents([_doc("new iphone phone")], ids=["a"])
+    assert index.count == 2
+    assert index.search("pixel") == []
+    assert [doc.id for doc, _ in index.search("iphone")] == ["a"]
+
+    assert index.delete(["b"])
+    assert not index.delete(["b"])
+    assert "b" not in index and "a" in index
+
+    reloaded = BM25Index(str(tmp_path))
+    assert reloaded.count == 1
+    assert [doc.id for doc, _ in reloaded.search("phone")] == ["a"]
+    assert reloaded.search("galaxy") == []
+
+
+def test_reader_picks_up_writes_from_another_instance(tmp_path):
+    reader = BM25Index(str(tmp_path))
+    writer = BM25Index(str(tmp_path))
+    writer.add_documents([_doc("oneplus nord")], ids=["x"])
+    assert [doc.id for doc, _ in reader.search("nord")] == ["x"]
+
+
+def test_search_with_filter(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add_documents([
+        _doc("budget phone", price_value=9000.0),
+        _doc("premium phone", price_value=90000.0),
+    ], ids=["cheap", "pricey"])
+    hits = index.search("phone", filter={"price_value": {"$lte": 10000}})
+    assert [doc.id for doc, _ in hits] == ["cheap"]
+
+
+def _phones(n, prefix="p"):
+    return [_doc(f"phone model {prefix}{i}") for i in range(n)], [f"{prefix}{i}" for i in range(n)]
+
+
+def test_masked_rows_are_compacted_past_ratio(tmp_path):
+    index = BM25Index(str(tmp_path), compact_ratio=0.5)
+    index.add_documents(*_phones(4))
+    index.delete(["p0"])
+    assert len(index._records) == 4  # 1 of 4 masked, below the ratio
+
+    index.add_documents([_doc("phone model p1 refreshed")], ids=["p1"])
+    assert len(index._records) == 5
+    index.delete(["p2"])  # 3 of 5 masked
+    assert len(index._records) == index.count == 2
+    assert index._alive.all()
+    assert sorted(doc.id for doc, _ in index.search("phone")) == ["p1", "p3"]
+    assert [doc.id for doc, _ in index.search("refreshed")] == ["p1"]
+
+    reloaded = BM25Index(str(tmp_path))
+    assert sorted(doc.id for doc, _ in reloaded.search("phone")) == ["p1", "p3"]
+    assert len(list(tmp_path.glob("docs*.jsonl"))) == 1
+
+
+def test_reader_reloads_after_compaction(tmp_path):
+    writer = BM25Index(str(tmp_path))
+    writer.add_documents(*_phones(4))
+    reader = BM25Index(str(tmp_path))
+    assert reader.count == 4
+
+    writer.delete(["p0", "p1"])
+    writer.add_documents([_doc("galaxy tab")], ids=["t"])
+    assert len(writer._records) == 3
+    assert sorted(doc.id for doc, _ in reader.search("phone")) == ["p2", "p3"]
+    assert [doc.id for doc, _ in reader.search("galaxy")] == ["t"]
+
+
+def test_new_documents_are_appended(tmp_path):
+    index = BM25Index(str(tmp_path))
+    index.add_documents(*_phones(3))
+    (docs_file,) = tmp_path.glob("docs*.jsonl")
+    before = docs_file.read_bytes()
+    index.add_documents(*_phones(2, prefix="q"))
+    after = docs_file.read_bytes()
+    assert after.startswith(before) and after.count(b"\n") == 5
+
+    # Bytes of an interrupted write past what bm25.npz covers are dropped on the next append.
+    with open(docs_file, "ab") as f:
+        f.write(b'{"id": "partial"')
+    index.add_documents(*_phones(1, prefix="r"))
+    reloaded = BM25Index(str(tmp_path))
+    assert reloaded.count == 6 and "r0" in reloaded
+    assert docs_file.read_bytes().count(b"\n") == 6
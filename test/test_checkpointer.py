@@ -0,0 +1,227 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Annotated, TypedDict
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import add_messages
+
+from prod_assistant.workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+from prod_assistant.workflow.checkpointer import (
+    MemoryConversationStore, SqliteConversationStore, create_conversation_store, trim_history,
+)
+
+
+def _messages(n, size=10):
+    return [HumanMessage(content="x" * size, id=f"m{i}") for i in range(n)]
+
+
+def test_trim_history_message_cap():
+    removed = trim_history(_messages(8), max_messages=5, max_tokens=10_000)
+    assert [m.id for m in removed] == ["m0", "m1", "m2"]
+
+
+def test_trim_history_token_cap():
+    removed = trim_history(_messages(4, size=400), max_messages=20, max_tokens=150)
+    assert [m.id for m in removed] == ["m0", "m1", "m2"]
+
+
+def test_trim_history_keeps_newest_message():
+    removed = trim_history(_messages(3, size=4000), max_messages=0, max_tokens=10)
+    assert [m.id for m in removed] == ["m0", "m1"]
+    assert trim_history(_messages(3), max_messages=5, max_tokens=10_000) == []
+
+
+def test_end_turn_keeps_stored_history_within_max_messages():
+    agent = SimpleNamespace(conversation_cfg={"max_messages": 6, "max_tokens": 100_000})
+    thread = []
+    for turn in range(5):
+        # Retrieval turn: question, tool marker, context, rewrite, web context, then the answer.
+        for i, content in enumerate(["question", "TOOL: retriever", "context", "rewrite", "web"]):
+            thread = add_messages(thread, [HumanMessage(content=f"{content} {turn}", id=f"t{turn}-{i}")])
+        thread = add_messages(thread, AgenticRAG._end_turn(agent, thread, f"answer {turn}"))
+        assert len(thread) <= 6
+    assert thread[-1].content == "answer 4"
+
+
+class State(TypedDict):
+    messages: Annotated[list, add_messages]
+
+
+def _graph(checkpointer):
+    def first(state):
+        return {"messages": [AIMessage(content="thinking")]}
+
+    def second(state):
+        return {"messages": [AIMessage(content=f"answer {len(state['messages'])}")]}
+
+    graph = StateGraph(State)
+    graph.add_node("first", first)
+    graph.add_node("second", second)
+    graph.add_edge(START, "first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+async def _turn(app, store, thread_id, text):
+    config = {"configurable": {"thread_id": thread_id}}
+    await app.ainvoke({"messages": [HumanMessage(content=text)]}, config=config)
+    await store.after_turn(thread_id)
+    return config
+
+
+async def _checkpoint_count(store, thread_id):
+    return len([c async for c in store.saver.alist({"configurable": {"thread_id": thread_id}})])
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    async def make(**kwargs):
+        kwargs.setdefault("sweep_interval_seconds", 3600)
+        kwargs.setdefault("prune_every_turns", 1)
+        if request.param == "memory":
+            return MemoryConversationStore(**kwargs)
+        return await SqliteConversationStore.create(str(tmp_path / "checkpoints.sqlite"), **kwargs)
+
+    return make
+
+
+def test_prune_keeps_latest_checkpoint_and_state(make_store):
+    async def main():
+        store = await make_store()
+        app = _graph(store.saver)
+        config = await _turn(app, store, "u1", "hi")
+        before = (await app.aget_state(config)).values["messages"]
+        assert await _checkpoint_count(store, "u1") == 1
+
+        config = await _turn(app, store, "u1", "again")
+        messages = (await app.aget_state(config)).values["messages"]
+        assert [m.content for m in messages[:3]] == [m.content for m in before]
+        assert [m.content for m in messages[3:]] == ["again", "thinking", "answer 5"]
+        assert await _checkpoint_count(store, "u1") == 1
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_prune_runs_every_n_turns(make_store):
+    async def main():
+        store = await make_store(prune_every_turns=3)
+        app = _graph(store.saver)
+        counts = []
+        for turn in range(4):
+            await _turn(app, store, "u1", f"turn {turn}")
+            counts.append(await _checkpoint_count(store, "u1"))
+        # Every graph step adds a checkpoint; they pile up until the third turn prunes them.
+        assert 1 < counts[0] < counts[1]
+        assert counts[2] == 1 and counts[3] > 1
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_turn_and_prune_are_serialized_per_thread(make_store):
+    async def main():
+        store = await make_store()
+        app = _graph(store.saver)
+        events = []
+
+        async def locked_turn(thread_id, text):
+            async with store.thread_lock(thread_id):
+                events.append(("start", text))
+                await _turn(app, store, thread_id, text)
+                events.append(("end", text))
+
+        await asyncio.gather(locked_turn("u1", "one"), locked_turn("u1", "two"), locked_turn("u2", "other"))
+        u1 = [e for e in events if e[1] != "other"]
+        assert u1 == [("start", "one"), ("end", "one"), ("start", "two"), ("end", "two")]
+        config = {"configurable": {"thread_id": "u1"}}
+        contents = [m.content for m in (await app.aget_state(config)).values["messages"]]
+        assert contents.count("one") == 1 and contents.count("two") == 1
+        assert store.thread_lock("u1") is store.thread_lock("u1")
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_sweep_skips_thread_mid_turn(make_store):
+    async def main():
+        store = await make_store(idle_ttl_seconds=0.05)
+        app = _graph(store.saver)
+        await _turn(app, store, "busy", "hi")
+        await asyncio.sleep(0.1)
+        async with store.thread_lock("busy"):
+            await store.evict_idle()
+        assert store.evicted_threads == 0 and await _checkpoint_count(store, "busy") == 1
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_sqlite_store_uses_wal_and_busy_timeout(tmp_path):
+    async def main():
+        store = await SqliteConversationStore.create(str(tmp_path / "c.sqlite"), busy_timeout_ms=1234)
+        async with store.conn.execute("PRAGMA journal_mode") as cursor:
+            assert (await cursor.fetchone())[0] == "wal"
+        async with store.conn.execute("PRAGMA busy_timeout") as cursor:
+            assert (await cursor.fetchone())[0] == 1234
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_idle_threads_are_evicted(make_store):
+    async def main():
+        store = await make_store(idle_ttl_seconds=0.05)
+        app = _graph(store.saver)
+        await _turn(app, store, "old", "hi")
+        await asyncio.sleep(0.1)
+        await _turn(app, store, "new", "hi")
+        await store.evict_idle()
+
+        assert await _checkpoint_count(store, "old") == 0
+        assert await _checkpoint_count(store, "new") == 1
+        assert (await store.stats())["active_threads"] == 1
+        assert store.evicted_threads == 1
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_threads_beyond_max_are_evicted_lru_first(make_store):
+    async def main():
+        store = await make_store(max_threads=2)
+        app = _graph(store.saver)
+        for thread_id in ("a", "b", "c"):
+            await _turn(app, store, thread_id, "hi")
+            await asyncio.sleep(0.01)
+        await _turn(app, store, "a", "back")  # b is now least recently used
+        await store.evict_idle()
+
+        assert [await _checkpoint_count(store, t) for t in ("a", "b", "c")] == [1, 0, 1]
+        assert (await store.stats())["active_threads"] == 2
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_sweep_runs_after_turn_when_due(make_store):
+    async def main():
+        store = await make_store(idle_ttl_seconds=0.05, sweep_interval_seconds=0)
+        app = _graph(store.saver)
+        await _turn(app, store, "old", "hi")
+        await asyncio.sleep(0.1)
+        await _turn(app, store, "new", "hi")
+        assert store.evicted_threads == 1
+        await store.close()
+
+    asyncio.run(main())
+
+
+def test_create_conversation_store():
+    store = asyncio.run(create_conversation_store({"backend": "memory", "max_threads": 3}))
+    assert isinstance(store, MemoryConversationStore) and store.max_threads == 3
+    with pytest.raises(ValueError, match="Unsupported conversation backend"):
+        asyncio.run(create_conversation_store({"backend": "redis"}))
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.language_models.fake import FakeListLLM
+
+from prod_assistant.retriever.compressors import BatchedLLMFilter, build_compressor
+
+DOCS = [Document(page_content=f"doc {i}") for i in range(1, 5)]
+
+
+def _select(reply):
+    return [doc.page_content for doc in BatchedLLMFilter(llm=FakeListLLM(responses=[""]))._select(DOCS, reply)]
+
+
+@pytest.mark.parametrize("reply, expected", [
+    ("1, 3", ["doc 1", "doc 3"]),
+    ("2", ["doc 2"]),
+    ("Documents 2 and 4.", ["doc 2", "doc 4"]),
+    ("Relevant documents: #1, #3", ["doc 1", "doc 3"]),
+    # Numbers in the explanation after the id list are not ids.
+    ("1, 3. Document 2 mentions the 128GB iPhone 16 too.", ["doc 1", "doc 3"]),
+    ("4 - it is the only one under 20000", ["doc 4"]),
+])
+def test_reads_only_the_leading_id_list(reply, expected):
+    assert _select(reply) == expected
+
+
+@pytest.mark.parametrize("reply", ["none", "None.", '"none"', "None of them are relevant"])
+def test_none_drops_everything(reply):
+    assert _select(reply) == []
+
+
+@pytest.mark.parametrize("reply", [
+    "",
+    "The iPhone 16 with 128GB is relevant",  # no leading id list
+    "7, 9",  # no valid id
+])
+def test_unparseable_reply_keeps_every_document(reply):
+    assert _select(reply) == [doc.page_content for doc in DOCS]
+
+
+def test_compress_documents_uses_one_llm_call():
+    llm = FakeListLLM(responses=["2, 3"])
+    compressor = BatchedLLMFilter(llm=llm)
+    kept = asyncio.run(compressor.acompress_documents(DOCS, "phones under 20000"))
+    assert [doc.page_content for doc in kept] == ["doc 2", "doc 3"]
+    assert compressor.compress_documents([], "q") == []
+
+
+def test_build_compressor_modes():
+    assert build_compressor("none", None, None) is None
+    assert isinstance(build_compressor("batched_llm", lambda: FakeListLLM(responses=["1"]), None), BatchedLLMFilter)
+    with pytest.raises(ValueError):
+        build_compressor("rerank", None, None)
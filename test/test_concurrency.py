@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from prod_assistant.router.engine import RAGEngine
+from prod_assistant.utils.concurrency import (
+    ProviderBusyError, ProviderLimiter, ProviderTimeoutError, ProviderUnavailableError, get_limiter,
+)
+
+
+def test_calls_beyond_concurrency_wait_for_a_slot():
+    async def main():
+        limiter = ProviderLimiter("llm", max_concurrency=2, max_queue=4)
+        running, peak = 0, 0
+
+        async def work():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "ok"
+
+        results = await asyncio.gather(*(limiter.call(work) for _ in range(5)))
+        assert results == ["ok"] * 5 and peak == 2
+        assert limiter.stats()["completed"] == 5 and limiter.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_full_queue_rejects_immediately():
+    async def main():
+        limiter = ProviderLimiter("llm", max_concurrency=1, max_queue=1, queue_timeout=5)
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        running = asyncio.create_task(limiter.call(blocked))
+        await asyncio.sleep(0.01)
+        queued = asyncio.create_task(limiter.call(blocked))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ProviderBusyError):
+            await limiter.call(blocked)
+        assert limiter.stats()["rejected"] == 1 and limiter.stats()["waiting"] == 1
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert limiter.stats()["completed"] == 2
+
+    asyncio.run(main())
+
+
+def test_queue_wait_timeout_is_busy_and_request_timeout_is_timeout():
+    async def main():
+        limiter = ProviderLimiter("llm", max_concurrency=1, max_queue=4, queue_timeout=0.01, request_timeout=0.05)
+
+        async def slow():
+            await asyncio.sleep(1)
+
+        running = asyncio.create_task(limiter.call(slow))
+        await asyncio.sleep(0.005)
+        with pytest.raises(ProviderBusyError):
+            await limiter.call(slow)  # no slot within queue_timeout
+        with pytest.raises(ProviderTimeoutError):
+            await running  # took longer than request_timeout
+        stats = limiter.stats()
+        assert stats["rejected"] == 1 and stats["timeouts"] == 1 and stats["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_both_errors_are_provider_unavailable():
+    assert issubclass(ProviderBusyError, ProviderUnavailableError)
+    assert issubclass(ProviderTimeoutError, ProviderUnavailableError)
+
+
+def test_get_limiter_is_shared_per_name():
+    assert get_limiter("test:shared", max_concurrency=3) is get_limiter("test:shared", max_concurrency=9)
+    assert get_limiter("test:shared").max_concurrency == 3
+
+
+class BusyAgent:
+    async def run(self, query, thread_id):
+        raise ProviderBusyError("llm:groq is busy, please retry shortly.")
+
+    async def stream(self, query, thread_id):
+        raise ProviderTimeoutError("llm:groq did not respond within 60s.")
+        yield  # pragma: no cover
+
+
+def _client():
+    from prod_assistant.router.main import app
+
+    engine = RAGEngine()
+    engine.agent, engine.state = BusyAgent(), "ready"
+    engine._ready.set()
+    app.state.engine = engine
+    return TestClient(app)
+
+
+def test_provider_unavailable_maps_to_503_with_retry_after():
+    response = _client().post("/get", data={"msg": "price of iphone 16"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert "busy" in response.json()["detail"]
+
+
+def test_provider_unavailable_while_streaming_sends_busy_frame():
+    response = _client().post("/stream", data={"msg": "price of iphone 16"})
+    assert response.status_code == 200
+    assert '"type": "error"' in response.text and "busy" in response.text
@@ -0,0 +1,94 @@
+import sqlite3
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from prod_assistant.cache.embedding_cache import CachedEmbeddings, EmbeddingCache, normalize_text
+
+
+class CountingEmbeddings(Embeddings):
+    """Embeds a text as [len(text), first char code, 1]; records every batch sent to it."""
+
+    def __init__(self):
+        self.document_calls = []
+        self.query_calls = []
+
+    @staticmethod
+    def _vector(text):
+        return [float(len(text)), float(ord(text[0])), 1.0]
+
+    def embed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        return [self._vector(t) for t in texts]
+
+    def embed_query(self, text):
+        self.query_calls.append(text)
+        return self._vector(text)
+
+
+def test_normalize_text():
+    assert normalize_text("  iPhone\n 16  Pro ") == "iPhone 16 Pro"
+    assert normalize_text("  iPhone\n 16 ", lowercase=True) == "iphone 16"
+
+
+def test_only_unique_misses_reach_the_model():
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, EmbeddingCache(), "mini")
+
+    first = embeddings.embed_documents(["alpha", "beta", "alpha"])
+    second = embeddings.embed_documents(["beta", " beta ", "gamma"])
+
+    assert model.document_calls == [["alpha", "beta"], ["gamma"]]
+    assert first == [[5.0, 97.0, 1.0], [4.0, 98.0, 1.0], [5.0, 97.0, 1.0]]
+    assert second[:2] == [[4.0, 98.0, 1.0]] * 2
+    stats = embeddings.cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 4)
+
+
+def test_query_and_document_keys_are_separate():
+    model = CountingEmbeddings()
+    embeddings = CachedEmbeddings(model, EmbeddingCache(), "mini")
+
+    embeddings.embed_documents(["phone"])
+    assert embeddings.embed_query("phone") == [5.0, 112.0, 1.0]
+    embeddings.embed_query("phone")
+    assert model.query_calls == ["phone"]
+
+
+def test_models_do_not_share_entries():
+    cache = EmbeddingCache()
+    model_a, model_b = CountingEmbeddings(), CountingEmbeddings()
+    CachedEmbeddings(model_a, cache, "model-a").embed_query("phone")
+    CachedEmbeddings(model_b, cache, "model-b").embed_query("phone")
+    assert model_a.query_calls == model_b.query_calls == ["phone"]
+
+
+def test_lru_eviction():
+    cache = EmbeddingCache(max_entries=2)
+    vector = np.ones(3, dtype=np.float32)
+    cache.put_many([("a", vector), ("b", vector)])
+    cache.get_many(["a"])  # b is now least recently used
+    cache.put_many([("c", vector)])
+
+    assert [v is not None for v in cache.get_many(["a", "b", "c"])] == [True, False, True]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 2
+
+
+def test_sqlite_write_through_and_reload(tmp_path):
+    path = str(tmp_path / "embeddings.sqlite")
+    model = CountingEmbeddings()
+    cache = EmbeddingCache(max_entries=2, sqlite_path=path)
+    CachedEmbeddings(model, cache, "mini").embed_documents(["alpha", "beta", "gamma"])  # alpha is evicted
+
+    with sqlite3.connect(path) as db:  # written through before close
+        assert db.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0] == 2
+    cache.close()
+
+    reopened = EmbeddingCache(max_entries=2, sqlite_path=path)
+    embeddings = CachedEmbeddings(model, reopened, "mini")
+    assert embeddings.embed_documents(["beta", "gamma"]) == [[4.0, 98.0, 1.0], [5.0, 103.0, 1.0]]
+    assert model.document_calls == [["alpha", "beta", "gamma"]]
+    assert reopened.stats()["persistent"] is True
+    embeddings.embed_documents(["alpha"])
+    assert model.document_calls[-1] == ["alpha"]
+    reopened.close()
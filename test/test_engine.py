@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from prod_assistant.router import engine as engine_module
+from prod_assistant.router.engine import EngineNotReadyError, RAGEngine
+
+
+class FlakyAgent:
+    """Stand-in for AgenticRAG whose construction fails the first `failures` times."""
+
+    failures = 0
+    created = 0
+    closed = 0
+
+    def __init__(self, load_tools=True):
+        FlakyAgent.created += 1
+        if FlakyAgent.created <= FlakyAgent.failures:
+            raise RuntimeError(f"model load failed #{FlakyAgent.created}")
+
+    async def async_init(self):
+        pass
+
+    async def aclose(self):
+        FlakyAgent.closed += 1
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    monkeypatch.setattr(engine_module, "AgenticRAG", FlakyAgent)
+    FlakyAgent.failures, FlakyAgent.created, FlakyAgent.closed = 0, 0, 0
+    return FlakyAgent
+
+
+def _engine(**kwargs):
+    kwargs.setdefault("ready_timeout", 1)
+    kwargs.setdefault("retry_backoff", 0)
+    return RAGEngine(**kwargs)
+
+
+def test_not_ready_then_ready(flaky):
+    async def scenario():
+        engine = _engine()
+        assert engine.status()["state"] == "starting" and not engine.is_ready
+        engine.start()
+        agent = await engine.get()
+        assert isinstance(agent, FlakyAgent) and engine.is_ready
+        assert engine.status()["attempts"] == 1
+        await engine.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_warm_up_is_retried_with_backoff(flaky, monkeypatch):
+    flaky.failures = 2
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(engine_module.asyncio, "sleep", fake_sleep)
+
+    async def scenario():
+        engine = _engine(retry_attempts=3, retry_backoff=2, retry_max_backoff=3)
+        engine.start()
+        await engine.get()
+        assert engine.state == "ready" and engine.error is None
+        assert engine.attempts == 3
+        assert delays == [2, 3]  # 2 * 2**0, then 2 * 2**1 capped at 3
+
+    asyncio.run(scenario())
+
+
+def test_exhausted_retries_fail_until_cooldown_then_recover(flaky):
+    flaky.failures = 2
+
+    async def scenario():
+        engine = _engine(retry_attempts=1, retry_cooldown=3600)
+        engine.start()
+        with pytest.raises(EngineNotReadyError, match="failed to start"):
+            await engine.get()
+        assert engine.state == "failed" and "#2" in engine.error
+
+        # Still inside the cool-down: no new attempt.
+        with pytest.raises(EngineNotReadyError):
+            await engine.get()
+        assert flaky.created == 2
+
+        engine.retry_cooldown = 0
+        agent = await engine.get()
+        assert isinstance(agent, FlakyAgent) and engine.state == "ready"
+        assert engine.attempts == 3
+
+    asyncio.run(scenario())
+
+
+def test_agent_is_closed_when_async_init_fails(flaky, monkeypatch):
+    async def broken_init(self):
+        raise RuntimeError("MCP unavailable")
+
+    monkeypatch.setattr(FlakyAgent, "async_init", broken_init)
+
+    async def scenario():
+        engine = _engine(retry_attempts=0)
+        engine.start()
+        with pytest.raises(EngineNotReadyError, match="MCP unavailable"):
+            await engine.get()
+        assert flaky.closed == 1
+
+    asyncio.run(scenario())
+
+
+def test_health_is_503_until_ready():
+    from prod_assistant.router.main import app
+
+    engine = RAGEngine()
+    app.state.engine = engine
+    client = TestClient(app)
+
+    response = client.get("/health")
+    assert response.status_code == 503
+    assert response.json()["engine"]["state"] == "starting"
+
+    engine.state = "failed"
+    assert client.get("/health").status_code == 503
+
+    engine.state = "ready"
+    response = client.get("/health")
+    assert response.status_code == 200 and response.json()["ok"] is True
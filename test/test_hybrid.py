@@ -0,0 +1,81 @@
+import asyncio
+from typing import List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from prod_assistant.retriever.bm25_index import BM25Index
+from prod_assistant.retriever.hybrid import HybridRetriever, reciprocal_rank_fusion
+from prod_assistant.retriever.numeric_index import metadata_filter_mask
+
+
+def _docs(*texts):
+    return [Document(page_content=t) for t in texts]
+
+
+class ListRetriever(BaseRetriever):
+    """Dense stand-in: returns its documents in order, honouring a metadata filter."""
+
+    docs: List[Document]
+    filters: list = []
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun,
+                                filter: Optional[dict] = None) -> List[Document]:
+        self.filters.append(filter)
+        mask = metadata_filter_mask(filter, [d.metadata for d in self.docs])
+        return [d for d, keep in zip(self.docs, mask) if keep]
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun,
+                                       filter: Optional[dict] = None) -> List[Document]:
+        return self._get_relevant_documents(query, run_manager=run_manager, filter=filter)
+
+
+def test_rrf_rewards_documents_in_both_lists():
+    fused = reciprocal_rank_fusion([_docs("a", "b", "c"), _docs("c", "d", "a")], k=60)
+    # a: 1/61 + 1/63, c: 1/63 + 1/61 (tie, a first from the earlier list), then b (1/62), d (1/62)
+    assert [d.page_content for d in fused] == ["a", "c", "b", "d"]
+
+
+def test_rrf_limit_and_empty_lists():
+    assert [d.page_content for d in reciprocal_rank_fusion([_docs("a", "b"), []], limit=1)] == ["a"]
+    assert reciprocal_rank_fusion([[], []]) == []
+
+
+def test_rrf_matches_documents_by_content():
+    dense = [Document(id="vec-1", page_content="x")]
+    lexical = [Document(id="bm25-1", page_content="x"), Document(page_content="y")]
+    fused = reciprocal_rank_fusion([dense, lexical])
+    assert [d.page_content for d in fused] == ["x", "y"]
+    assert fused[0].id == "vec-1"
+
+
+def _hybrid(tmp_path, **kwargs):
+    docs = [
+        Document(page_content="Samsung Galaxy budget phone", metadata={"price_value": 15000.0}),
+        Document(page_content="Apple iPhone 16 premium phone", metadata={"price_value": 80000.0}),
+        Document(page_content="OnePlus Nord budget phone", metadata={"price_value": 25000.0}),
+    ]
+    lexical = BM25Index(str(tmp_path), metadata_fields=())
+    lexical.add_documents(docs, ids=["s", "a", "o"])
+    dense = ListRetriever(docs=docs, filters=[])
+    return HybridRetriever(dense=dense, lexical=lexical, **kwargs), dense
+
+
+def test_hybrid_fuses_dense_and_lexical(tmp_path):
+    retriever, dense = _hybrid(tmp_path, k=3)
+    results = retriever.invoke("iphone")
+    assert results[0].page_content == "Apple iPhone 16 premium phone"
+    assert len(results) == 3
+    assert dense.filters == [None]
+
+
+def test_hybrid_applies_filter_to_both_sides(tmp_path):
+    retriever, dense = _hybrid(tmp_path, k=4)
+    filter = {"price_value": {"$lte": 30000}}
+    results = retriever.invoke("iphone phone", filter=filter)
+    assert dense.filters == [filter]
+    assert {d.page_content for d in results} == {"Samsung Galaxy budget phone", "OnePlus Nord budget phone"}
+
+    results = asyncio.run(retriever.ainvoke("iphone phone", filter=filter))
+    assert all(d.metadata["price_value"] <= 30000 for d in results)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.documents import Document
+
+from prod_assistant.cache.web_search_cache import WebSearchCache
+from prod_assistant.mcp_servers import product_search_saver as server
+from prod_assistant.mcp_servers.inprocess import InProcessTools
+from prod_assistant.workflow import agentic_workflow_with_mcp_websearch as wf
+
+
+def _doc(title, review):
+    return Document(page_content=review, metadata={"product_title": title, "price": "₹999", "rating": "4.5"})
+
+
+class StubRetriever:
+    """Retriever stand-in: load_retriever() returns itself, queries map to fixed documents."""
+
+    def __init__(self, docs_by_query):
+        self.docs_by_query = docs_by_query
+        self.loads = 0
+
+    def load_retriever(self):
+        self.loads += 1
+        return self
+
+    async def ainvoke(self, query):
+        return self.docs_by_query.get(query, [])
+
+    async def abatch_retrieve(self, queries):
+        return {query: self.docs_by_query.get(query, []) for query in queries}
+
+
+class StubSearch:
+    def __init__(self):
+        self.queries = []
+
+    async def ainvoke(self, query):
+        self.queries.append(query)
+        return f"web results for {query}"
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    retriever = StubRetriever({
+        "pixel 8": [_doc("Google Pixel 8", "Great camera")],
+        "price of pixel 8": [_doc("Google Pixel 8", "Great camera"), _doc("Google Pixel 8 Pro", "Bright screen")],
+    })
+    search = StubSearch()
+    # Reset the server's globals so use_retriever() and the caches do not leak between tests.
+    monkeypatch.setattr(server, "retriever_obj", None)
+    monkeypatch.setattr(server, "duckduckgo", search)
+    monkeypatch.setattr(server, "web_cache", WebSearchCache())
+    return retriever, search
+
+
+def test_tools_call_the_server_functions_in_process(backends):
+    retriever, search = backends
+
+    async def main():
+        tools = InProcessTools(retriever)
+        assert set(await tools.get_tools()) == {"get_product_info", "get_product_info_batch", "web_search"}
+        assert retriever.loads == 1  # warmed on first get_tools()
+
+        product = await (await tools.get_tool("get_product_info")).ainvoke({"query": "pixel 8"})
+        assert "Title: Google Pixel 8" in product and "Great camera" in product
+        assert await (await tools.get_tool("get_product_info")).ainvoke({"query": "nokia"}) == "No local results found."
+
+        batch = json.loads(await (await tools.get_tool("get_product_info_batch")).ainvoke(
+            {"queries": ["pixel 8", "nokia"]}))
+        assert "Google Pixel 8" in batch["pixel 8"] and batch["nokia"] == "No local results found."
+
+        web = await tools.get_tool("web_search")
+        assert await web.ainvoke({"query": "iphone 16 price"}) == "web results for iphone 16 price"
+        assert await web.ainvoke({"query": "iPhone 16 price?"}) == "web results for iphone 16 price"
+        assert search.queries == ["iphone 16 price"]  # second call served by the web search cache
+
+        stats = tools.stats()
+        assert stats["transport"] == "inprocess" and stats["web_search_cache"]["hits"] == 1
+        assert await tools.get_tool("missing") is None
+        await tools.aclose()
+
+    asyncio.run(main())
+
+
+@pytest.mark.usefixtures("backends")
+def test_failed_warm_up_is_reported_per_call():
+
+    class BrokenRetriever(StubRetriever):
+        def load_retriever(self):
+            raise RuntimeError("vector store unreachable")
+
+    async def main():
+        tools = InProcessTools(BrokenRetriever({}))
+        assert "get_product_info" in await tools.get_tools()
+        reply = await (await tools.get_tool("get_product_info")).ainvoke({"query": "pixel 8"})
+        assert reply == "Error retrieving product info: vector store unreachable"
+
+    asyncio.run(main())
+
+
+def test_agent_with_inprocess_transport_answers_without_http_client(backends, make_agent, monkeypatch):
+    retriever, search = backends
+
+    def no_http_client(*args, **kwargs):
+        raise AssertionError("streamable-HTTP MCP client built for the in-process transport")
+
+    monkeypatch.setattr(wf, "MultiServerMCPClient", no_http_client)
+    agent = make_agent(config={"mcp": {"transport": "inprocess"}}, retriever=retriever)
+    assert isinstance(agent.mcp_pool, InProcessTools) and agent.mcp_client is None
+
+    async def main():
+        await agent.async_init()
+        answer = await agent.run("price of pixel 8", thread_id="t1")
+        assert answer == agent.llm.answer
+        assert agent.llm.calls == ["grade", "answer"]
+        assert await agent._search_web("pixel 8") == "web results for pixel 8"
+        assert search.queries == ["pixel 8"]
+        await agent.aclose()
+
+    asyncio.run(main())
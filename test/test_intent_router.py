@@ -0,0 +1,114 @@
+import numpy as np
+
+from prod_assistant.workflow.intent_router import (
+    CANNED_REPLIES,
+    INTENT_EXAMPLES,
+    Intent,
+    IntentRouter,
+    split_comparison,
+)
+
+AXES = {intent: i for i, intent in enumerate(INTENT_EXAMPLES)}
+
+
+class StubEmbeddings:
+    """Embeds every seed example on its intent's axis; queries get the vector set in `queries`."""
+
+    def __init__(self):
+        self.queries = {}
+
+    def embed_documents(self, texts):
+        axis_of = {text: AXES[intent] for intent, examples in INTENT_EXAMPLES.items() for text in examples}
+        return [np.eye(len(AXES))[axis_of[text]].tolist() for text in texts]
+
+    def embed_query(self, text):
+        return self.queries[text]
+
+
+def _query(**scores):
+    """Query vector with the given (unnormalized) component per intent name."""
+    vector = np.zeros(len(AXES), dtype=np.float32)
+    for name, value in scores.items():
+        vector[AXES[Intent[name.upper()]]] = value
+    return vector.tolist()
+
+
+def _router(**queries):
+    embeddings = StubEmbeddings()
+    embeddings.queries = queries
+    return IntentRouter(embeddings, min_confidence=0.35, min_margin=0.05)
+
+
+def test_clear_winner_is_returned():
+    router = _router(q=_query(product_lookup=1.0, chit_chat=0.1))
+    decision = router.classify("q")
+    assert decision.intent == Intent.PRODUCT_LOOKUP
+    assert decision.margin > 0.05
+
+
+def test_low_confidence_returns_none():
+    # Equal parts of every intent: cosine 0.5 with each centroid, below min_confidence=0.6.
+    router = _router(q=_query(product_lookup=1, comparison=1, chit_chat=1, off_topic=1))
+    router.min_confidence = 0.6
+    decision = router.classify("q")
+    assert decision.intent is None
+    assert abs(decision.score - 0.5) < 1e-6
+
+
+def test_narrow_chit_chat_win_goes_to_retrieval_runner_up():
+    router = _router(q=_query(chit_chat=1.0, product_lookup=0.97))
+    assert router.classify("q").intent == Intent.PRODUCT_LOOKUP
+
+
+def test_narrow_win_between_non_retrieval_intents_returns_none():
+    router = _router(q=_query(chit_chat=1.0, off_topic=0.98))
+    assert router.classify("q").intent is None
+
+
+def test_clear_chit_chat_win_keeps_canned_intent():
+    router = _router(hello=_query(chit_chat=1.0, product_lookup=0.2))
+    assert router.classify("hello").intent == Intent.CHIT_CHAT
+
+
+def test_product_words_override_non_retrieval_winner():
+    query = "thanks, and what's the price of the pixel 8?"
+    router = _router(**{query: _query(chit_chat=1.0, product_lookup=0.2)})
+    assert router.classify(query).intent == Intent.PRODUCT_LOOKUP
+
+
+def test_product_words_route_low_confidence_query_to_retrieval():
+    query = "redmi note 13 pro"
+    router = _router(**{query: _query(product_lookup=1, comparison=1, chit_chat=1, off_topic=1)})
+    router.min_confidence = 0.6
+    assert router.classify(query).intent == Intent.PRODUCT_LOOKUP
+
+
+def test_product_words_do_not_change_comparison():
+    query = "pixel 8 vs iphone 16"
+    router = _router(**{query: _query(comparison=1.0)})
+    assert router.classify(query).intent == Intent.COMPARISON
+
+
+def test_chit_chat_reply_depends_on_sub_type():
+    greeting = IntentRouter.canned_reply(Intent.CHIT_CHAT, "hey, good morning")
+    thanks = IntentRouter.canned_reply(Intent.CHIT_CHAT, "thanks, that helps")
+    bye = IntentRouter.canned_reply(Intent.CHIT_CHAT, "bye, see you later")
+    capabilities = IntentRouter.canned_reply(Intent.CHIT_CHAT, "what can you do?")
+
+    assert greeting == CANNED_REPLIES[Intent.CHIT_CHAT]
+    assert "welcome" in thanks
+    assert "Goodbye" in bye
+    assert "comparison" in capabilities
+    assert len({greeting, thanks, bye, capabilities}) == 4
+
+
+def test_canned_reply_for_off_topic_and_retrieval_intents():
+    assert IntentRouter.canned_reply(Intent.OFF_TOPIC, "tell me a joke") == CANNED_REPLIES[Intent.OFF_TOPIC]
+    assert IntentRouter.canned_reply(Intent.PRODUCT_LOOKUP, "price of iphone") is None
+    assert IntentRouter.canned_reply(None) is None
+
+
+def test_split_comparison():
+    assert split_comparison("Compare OnePlus 12 and Google Pixel 8") == ["OnePlus 12", "Google Pixel 8"]
+    assert split_comparison("iPhone 16 vs Samsung Galaxy S24, which is better?") == ["iPhone 16", "Samsung Galaxy S24"]
+    assert split_comparison("price of iPhone 16") == ["price of iPhone 16"]
@@ -0,0 +1,146 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from prod_assistant.retriever.local_store import LocalVectorStore
+from prod_assistant.retriever.quantization import QUANTIZERS
+
+DIM = 32
+
+
+def _store(path, storage, **kwargs):
+    return LocalVectorStore(DeterministicFakeEmbedding(size=DIM), path=str(path), storage=storage,
+                            pq_m=8, rerank_k=20, **kwargs)
+
+
+def _vectors(n, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _fill(store, vectors, prefix="p"):
+    ids = [f"{prefix}{i}" for i in range(len(vectors))]
+    store.add_vectors(vectors, [f"text {i}" for i in ids], [{"n": i} for i in range(len(vectors))], ids)
+    return ids
+
+
+def _top_id(store, vector, **kwargs):
+    return store.similarity_search_by_vector(vector.tolist(), k=1, **kwargs)[0].id
+
+
+@pytest.mark.parametrize("storage", QUANTIZERS)
+def test_search_finds_exact_neighbour(tmp_path, storage):
+    store = _store(tmp_path, storage)
+    vectors = _vectors(300)
+    _fill(store, vectors)
+    for row in (0, 57, 299):
+        assert _top_id(store, vectors[row]) == f"p{row}"
+    results = store.similarity_search_with_score_by_vector(vectors[10].tolist(), k=3)
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)  # re-ranked with exact float32 scores
+
+
+@pytest.mark.parametrize("storage", QUANTIZERS)
+def test_upsert_replaces_document(tmp_path, storage):
+    store = _store(tmp_path, storage)
+    vectors = _vectors(300)
+    _fill(store, vectors)
+    moved = _vectors(1, seed=1)
+    store.add_vectors(moved, ["text p7 v2"], [{"n": 7}], ["p7"])
+
+    assert store.count == 300
+    assert [d.page_content for d in store.get_by_ids(["p7"])] == ["text p7 v2"]
+    assert _top_id(store, moved[0]) == "p7"
+    assert _top_id(store, vectors[7]) != "p7"
+
+
+@pytest.mark.parametrize("storage", QUANTIZERS)
+def test_delete_removes_from_results(tmp_path, storage):
+    store = _store(tmp_path, storage)
+    vectors = _vectors(300)
+    _fill(store, vectors)
+    assert store.delete(["p3", "missing"]) is True
+    assert store.delete(["missing"]) is False
+
+    assert store.count == 299
+    assert store.get_by_ids(["p3"]) == []
+    hits = store.similarity_search_by_vector(vectors[3].tolist(), k=299)
+    assert "p3" not in {d.id for d in hits}
+
+
+@pytest.mark.parametrize("storage", QUANTIZERS)
+def test_reload_keeps_codes_and_documents(tmp_path, storage):
+    store = _store(tmp_path, storage)
+    vectors = _vectors(300)
+    _fill(store, vectors)
+    store.delete(["p4"])
+    store.add_vectors(_vectors(1, seed=2), ["text p9 v2"], [{"n": 9}], ["p9"])
+
+    reloaded = _store(tmp_path, storage)
+    assert reloaded.count == 299
+    assert reloaded.get_by_ids(["p4"]) == []
+    assert reloaded.get_by_ids(["p9"])[0].page_content == "text p9 v2"
+    assert _top_id(reloaded, vectors[120]) == "p120"
+    if storage != "float32":
+        assert reloaded._quantizer.kind == storage
+        np.testing.assert_array_equal(reloaded._codes, store._codes)
+
+
+def test_reload_with_other_storage_re_encodes(tmp_path):
+    vectors = _vectors(300)
+    _fill(_store(tmp_path, "int8"), vectors)
+
+    reloaded = _store(tmp_path, "pq")
+    assert reloaded._quantizer.kind == "pq"
+    assert reloaded._codes.shape == (300, 8)
+    assert _top_id(reloaded, vectors[42]) == "p42"
+
+
+def test_writer_changes_visible_to_reader(tmp_path):
+    writer = _store(tmp_path, "int8")
+    vectors = _vectors(300)
+    _fill(writer, vectors)
+    reader = _store(tmp_path, "int8")
+    writer.delete(["p8"])
+    assert reader.get_by_ids(["p8"]) == []
+
+
+@pytest.mark.parametrize("storage", QUANTIZERS)
+def test_filter_restricts_candidates(tmp_path, storage):
+    store = _store(tmp_path, storage)
+    vectors = _vectors(300)
+    _fill(store, vectors)
+    hits = store.similarity_search_by_vector(vectors[5].tolist(), k=5, filter={"n": {"$gte": 200}})
+    assert hits and all(d.metadata["n"] >= 200 for d in hits)
+
+
+def test_compact_storage_rejects_hnsw(tmp_path):
+    with pytest.raises(ValueError, match="Compact vector storage"):
+        _store(tmp_path, "int8", index="hnsw")
+
+
+@pytest.mark.parametrize("storage, index", [(s, "flat") for s in QUANTIZERS] + [("float32", "auto")])
+def test_masked_rows_are_compacted_past_ratio(tmp_path, storage, index):
+    store = _store(tmp_path, storage, index=index, compact_ratio=0.4)
+    vectors = _vectors(300)
+    _fill(store, vectors)
+    store.delete([f"p{i}" for i in range(100)])
+    assert len(store._records) == 300  # a third masked, below the ratio
+
+    moved = _vectors(60, seed=1)
+    store.add_vectors(moved, [f"v2 {i}" for i in range(60)], [{"n": i} for i in range(100, 160)],
+                      [f"p{i}" for i in range(100, 160)])
+    # 160 of 360 rows masked: compacted down to the 200 live ones.
+    assert len(store._records) == store.count == 200
+    assert store._alive.all() and store._vectors.shape == (200, DIM)
+    if store._codes is not None:
+        assert store._codes.shape[0] == 200
+
+    assert store.get_by_ids(["p5"]) == []
+    assert _top_id(store, moved[3]) == "p103"
+    assert _top_id(store, vectors[250]) == "p250"
+
+    reloaded = _store(tmp_path, storage, index=index)
+    assert reloaded.count == 200 and len(reloaded._records) == 200
+    assert _top_id(reloaded, moved[3]) == "p103"
+    assert _top_id(reloaded, vectors[250]) == "p250"
@@ -0,0 +1,87 @@
+import json
+
+from langchain_core.documents import Document
+
+from prod_assistant.etl.manifest import IngestionManifest, content_hash, document_id
+
+
+def _doc(doc_id, text="Apple iPhone 16", price=79999.0):
+    return Document(id=doc_id, page_content=text, metadata={"product_id": doc_id, "price_value": price})
+
+
+def _ingested(path, docs, target="local:ecommercedata:minilm"):
+    manifest = IngestionManifest(str(path), target)
+    manifest.apply(manifest.diff(docs))
+    manifest.save()
+    return IngestionManifest(str(path), target)
+
+
+def test_document_id():
+    assert document_id("  B0CX1 ") == "B0CX1"
+    assert document_id(12345) == "12345"
+    missing = document_id(float("nan"), "Apple iPhone 16")
+    assert missing.startswith("title-")
+    assert missing == document_id(None, "Apple iPhone 16") == document_id("", "Apple iPhone 16")
+    assert missing != document_id(None, "Apple iPhone 15")
+
+
+def test_content_hash_covers_text_and_metadata():
+    base = content_hash(_doc("a"))
+    assert base == content_hash(_doc("a"))
+    assert base != content_hash(_doc("a", text="Apple iPhone 16 Pro"))
+    assert base != content_hash(_doc("a", price=74999.0))
+
+
+def test_first_run_adds_everything(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), "t")
+    diff = manifest.diff([_doc("a"), _doc("b")])
+    assert [d.id for d in diff.added] == ["a", "b"]
+    assert not diff.updated and not diff.unchanged and not diff.deleted
+    assert diff.summary() == "2 added, 0 updated, 0 unchanged, 0 deleted"
+
+
+def test_diff_added_updated_unchanged_deleted(tmp_path):
+    path = tmp_path / "manifest.json"
+    manifest = _ingested(path, [_doc("a"), _doc("b"), _doc("c")])
+
+    rows = [_doc("a"), _doc("b", price=69999.0), _doc("d")]
+    diff = manifest.diff(rows, delete_missing=True)
+    assert [d.id for d in diff.added] == ["d"]
+    assert [d.id for d in diff.updated] == ["b"]
+    assert [d.id for d in diff.unchanged] == ["a"]
+    assert diff.deleted == ["c"]
+    assert [d.id for d in diff.upserts] == ["d", "b"]
+
+    assert manifest.diff(rows).deleted == []  # deletes are opt-in
+
+
+def test_duplicate_rows_last_wins(tmp_path):
+    manifest = IngestionManifest(str(tmp_path / "manifest.json"), "t")
+    diff = manifest.diff([_doc("a", price=1.0), _doc("a", price=2.0)])
+    assert diff.duplicates == 1
+    assert [d.metadata["price_value"] for d in diff.added] == [2.0]
+    assert "1 duplicate product rows skipped" in diff.summary()
+
+
+def test_apply_and_save_round_trip(tmp_path):
+    path = tmp_path / "manifest.json"
+    manifest = _ingested(path, [_doc("a"), _doc("b"), _doc("c")])
+    diff = manifest.diff([_doc("a"), _doc("b", price=1.0)], delete_missing=True)
+    manifest.apply(diff)
+    manifest.save()
+
+    reloaded = IngestionManifest(str(path), "local:ecommercedata:minilm")
+    assert set(reloaded.hashes) == {"a", "b"}
+    assert reloaded.hashes["b"] == content_hash(_doc("b", price=1.0))
+    again = reloaded.diff([_doc("a"), _doc("b", price=1.0)], delete_missing=True)
+    assert not again.upserts and not again.deleted
+    assert not (tmp_path / "manifest.json.tmp").exists()
+
+
+def test_manifest_for_other_target_is_ignored(tmp_path):
+    path = tmp_path / "manifest.json"
+    _ingested(path, [_doc("a")], target="astra:ecommercedata:minilm")
+    manifest = IngestionManifest(str(path), "local:ecommercedata:minilm")
+    assert manifest.hashes == {}
+    assert [d.id for d in manifest.diff([_doc("a")]).added] == ["a"]
+    assert json.loads(path.read_text())["target"] == "astra:ecommercedata:minilm"
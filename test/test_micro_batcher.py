@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from prod_assistant.workflow.agentic_workflow_with_mcp_websearch import AgenticRAG
+from prod_assistant.workflow.micro_batcher import MicroBatcher, parse_numbered_lines
+
+
+class Recorder:
+    def __init__(self, fail_on=None):
+        self.calls = []
+        self.fail_on = fail_on
+
+    async def __call__(self, items):
+        self.calls.append(list(items))
+        await asyncio.sleep(0)
+        if self.fail_on in items:
+            raise RuntimeError("provider down")
+        return [item * 10 for item in items]
+
+
+def test_concurrent_items_within_window_share_a_batch():
+    flush = Recorder()
+
+    async def main():
+        batcher = MicroBatcher("t", flush, window_ms=20, max_batch_size=8)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    assert results == [0, 10, 20]
+    assert flush.calls == [[0, 1, 2]]
+    assert batcher.stats() == {"batches": 1, "items": 3, "avg_batch_size": 3.0, "largest_batch": 3}
+    assert not batcher._tasks
+
+
+def test_items_after_the_window_go_in_a_new_batch():
+    flush = Recorder()
+
+    async def main():
+        batcher = MicroBatcher("t", flush, window_ms=5)
+        first = await asyncio.gather(batcher.submit(1), batcher.submit(2))
+        second = await batcher.submit(3)
+        return first, second
+
+    assert asyncio.run(main()) == ([10, 20], 30)
+    assert flush.calls == [[1, 2], [3]]
+
+
+def test_full_batch_flushes_without_waiting_for_the_window():
+    flush = Recorder()
+
+    async def main():
+        batcher = MicroBatcher("t", flush, window_ms=10_000, max_batch_size=2)
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=2)
+
+    assert asyncio.run(main()) == [0, 10, 20, 30]
+    assert flush.calls == [[0, 1], [2, 3]]
+
+
+def test_failed_flush_raises_in_every_caller():
+    async def main():
+        batcher = MicroBatcher("t", Recorder(fail_on=2), window_ms=5)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_per_item_exceptions_reach_only_their_caller():
+    async def flush(items):
+        return [ValueError(item) if item == 1 else item for item in items]
+
+    async def main():
+        batcher = MicroBatcher("t", flush, window_ms=5)
+        return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+
+    first, second, third = asyncio.run(main())
+    assert (first, third) == (0, 2)
+    assert isinstance(second, ValueError)
+
+
+def test_cancelled_caller_is_dropped_from_the_batch():
+    flush = Recorder()
+
+    async def main():
+        batcher = MicroBatcher("t", flush, window_ms=20)
+        cancelled = asyncio.ensure_future(batcher.submit(1))
+        kept = asyncio.ensure_future(batcher.submit(2))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+
+    assert asyncio.run(main()) == 20
+    assert flush.calls == [[2]]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1: yes\n2: no\n3: yes", ["yes", "no", "yes"]),
+    ("Item 1: yes\nitem 2 - no\n 3) maybe ", ["yes", "no", "maybe"]),
+    ("2. second\n1. first", ["first", "second"]),
+    ("1: yes\n3: yes", ["yes", None, "yes"]),
+    ("1: first\n1: again\n9: out of range", ["first", None]),
+    ("no numbering at all", [None, None]),
+    (None, [None]),
+])
+def test_parse_numbered_lines(text, expected):
+    assert parse_numbered_lines(text, len(expected)) == expected
+
+
+def _fake_agent(reply, mode="prompt"):
+    calls = []
+
+    async def call_llm(chain, inputs, config=None):
+        calls.append(inputs)
+        return await chain.ainvoke(inputs)
+
+    async def call_llm_batch(chain, items):
+        return await asyncio.gather(*(call_llm(chain, item) for item in items))
+
+    agent = SimpleNamespace(micro_batch_mode=mode, llm=RunnableLambda(lambda _: reply),
+                            _call_llm=call_llm, _call_llm_batch=call_llm_batch)
+    return agent, calls
+
+
+def test_run_batch_retries_items_missing_from_the_reply():
+    agent, calls = _fake_agent("1: yes\n3: no")
+    single = RunnableLambda(lambda item: f"single {item['q']}")
+    items = [{"q": "a"}, {"q": "b"}, {"q": "c"}]
+    multi = PromptTemplate.from_template("{items}")
+
+    answers = asyncio.run(AgenticRAG._run_batch(agent, items, single, multi, {"items": "..."}))
+    assert answers == ["yes", "single b", "no"]
+    assert calls == [{"items": "..."}, {"q": "b"}]
+
+
+def test_run_batch_abatch_mode_calls_each_item():
+    agent, calls = _fake_agent("unused", mode="abatch")
+    single = RunnableLambda(lambda item: f"single {item['q']}")
+    items = [{"q": "a"}, {"q": "b"}]
+
+    answers = asyncio.run(AgenticRAG._run_batch(agent, items, single, None, {}))
+    assert answers == ["single a", "single b"]
+    assert calls == items
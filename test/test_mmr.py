@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
+
+from prod_assistant.retriever.mmr import mmr_select, mmr_select_batch
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("fetch_k, k, lambda_mult", [(25, 4, 0.6), (10, 10, 0.5), (50, 8, 0.2), (3, 5, 1.0)])
+def test_mmr_select_matches_langchain(seed, fetch_k, k, lambda_mult):
+    rng = np.random.default_rng(seed)
+    query = rng.standard_normal(32).astype(np.float32)
+    candidates = rng.standard_normal((fetch_k, 32)).astype(np.float32)
+    expected = maximal_marginal_relevance(query, candidates, lambda_mult=lambda_mult, k=k)
+    assert mmr_select(query, candidates, k, lambda_mult) == expected
+
+
+def test_batch_matches_single_queries_with_ragged_candidates():
+    rng = np.random.default_rng(7)
+    queries = rng.standard_normal((4, 16)).astype(np.float32)
+    sets = [rng.standard_normal((n, 16)).astype(np.float32) for n in (20, 5, 1, 12)]
+    batched = mmr_select_batch(queries, sets, k=6, lambda_mult=0.6)
+    assert batched == [mmr_select(q, c, 6, 0.6) for q, c in zip(queries, sets)]
+    assert [len(b) for b in batched] == [6, 5, 1, 6]
+
+
+def test_empty_inputs():
+    assert mmr_select(np.ones(4), np.zeros((0, 4)), 3) == []
+    assert mmr_select_batch(np.ones((2, 4)), [np.zeros((0, 4)), np.ones((2, 4))], k=0) == [[], []]
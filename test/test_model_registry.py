@@ -0,0 +1,84 @@
+import copy
+import threading
+import time
+
+import pytest
+
+from prod_assistant.utils import model_loader
+from prod_assistant.utils.config_loader import load_config
+from prod_assistant.utils.model_loader import ModelLoader, loaded_models, shared_model
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch):
+    monkeypatch.setattr(model_loader, "_MODELS", {})
+    monkeypatch.setattr(model_loader, "_MODEL_LOCKS", {})
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """ModelLoader on config.yaml whose builders return a fresh object per call."""
+    config = copy.deepcopy(load_config())
+    config["embedding_cache"] = {"enabled": False}
+    monkeypatch.setattr(model_loader, "load_config", lambda: config)
+    monkeypatch.setattr(ModelLoader, "_build_embeddings", lambda self, *args: object())
+    monkeypatch.setattr(ModelLoader, "_build_llm", lambda self, *args: object())
+    monkeypatch.setenv("LLM_PROVIDER", "groq")
+    return ModelLoader, config
+
+
+def test_shared_model_builds_once_for_concurrent_callers():
+    builds = []
+
+    def factory():
+        time.sleep(0.05)
+        builds.append(object())
+        return builds[-1]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(shared_model(("llm", "p", "m"), factory)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(builds) == 1
+    assert all(r is builds[0] for r in results) and len(results) == 8
+    assert loaded_models() == {"llm:p:m": 1}
+
+
+def test_different_keys_get_different_instances():
+    first = shared_model(("llm", "p", "m", 0), object)
+    second = shared_model(("llm", "p", "m", 0.7), object)
+    assert first is not second
+    assert shared_model(("llm", "p", "m", 0), object) is first
+    assert loaded_models() == {"llm:p:m": 2}
+
+
+def test_loaders_share_embeddings_and_llm(loader):
+    loader_cls, _ = loader
+    a, b = loader_cls(), loader_cls()
+    assert a.load_embeddings() is b.load_embeddings()
+    assert a.load_llm() is b.load_llm()
+    assert len(loaded_models()) == 2
+
+
+def test_changed_settings_load_a_new_model(loader):
+    loader_cls, config = loader
+    first = loader_cls().load_llm()
+    config["llm"]["groq"]["temperature"] = 0.7
+    assert loader_cls().load_llm() is not first
+
+    embeddings = loader_cls().load_embeddings()
+    config["embedding_model"]["backend"] = "onnx"
+    assert loader_cls().load_embeddings() is not embeddings
+
+
+def test_cached_wrappers_share_the_underlying_model(loader):
+    loader_cls, config = loader
+    config["embedding_cache"] = {"enabled": True}
+    first, second = loader_cls().load_embeddings(), loader_cls().load_embeddings()
+    assert first is not second
+    assert first.embeddings is second.embeddings
+    assert first.cache is second.cache
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from prod_assistant.retriever.numeric_index import NumericIndex, metadata_filter_mask
+
+METADATAS = [
+    {"price_value": 300.0, "brand": "apple"},
+    {"price_value": 100.0, "brand": "samsung"},
+    {"brand": "apple"},
+    {"price_value": 200.0, "brand": "apple"},
+    {"price_value": float("nan"), "brand": "apple"},
+    {"price_value": "150", "brand": "samsung"},
+]
+
+
+def test_range_rows_in_value_order():
+    index = NumericIndex(METADATAS)
+    assert index.range_rows("price_value").tolist() == [1, 3, 0]
+    assert index.range_rows("price_value", gte=100, lt=300).tolist() == [1, 3]
+    assert index.range_rows("price_value", gt=100, lte=300).tolist() == [3, 0]
+    assert index.range_rows("price_value", gt=500).tolist() == []
+    assert index.range_rows("missing_field", lte=1).tolist() == []
+
+
+def test_filter_mask_combines_equality_and_ranges():
+    mask = metadata_filter_mask({"brand": "apple", "price_value": {"$lte": 250}}, METADATAS)
+    assert np.flatnonzero(mask).tolist() == [3]
+    assert metadata_filter_mask(None, METADATAS).all()
+    assert np.flatnonzero(metadata_filter_mask({"brand": "samsung"}, METADATAS)).tolist() == [1, 5]
+
+
+def test_filter_mask_reuses_numeric_index():
+    index = NumericIndex(METADATAS)
+    mask = metadata_filter_mask({"price_value": {"$gte": 150}}, METADATAS, index)
+    assert np.flatnonzero(mask).tolist() == [0, 3]
+    assert "price_value" in index._columns
+
+
+def test_unsupported_operator_raises():
+    with pytest.raises(ValueError):
+        metadata_filter_mask({"price_value": {"$in": [1, 2]}}, METADATAS)
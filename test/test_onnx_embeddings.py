@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from prod_assistant.utils.onnx_embeddings import find_onnx_model, quantized_model
+
+onnx = pytest.importorskip("onnx")
+ort = pytest.importorskip("onnxruntime")
+pytest.importorskip("onnxruntime.quantization")
+
+
+def _matmul_model(path):
+    from onnx import TensorProto, helper, numpy_helper
+
+    weights = np.random.default_rng(0).standard_normal((64, 32)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("MatMul", ["x", "w"], ["y"])],
+        "tiny",
+        [helper.make_tensor_value_info("x", TensorProto.FLOAT, [None, 64])],
+        [helper.make_tensor_value_info("y", TensorProto.FLOAT, [None, 32])],
+        [numpy_helper.from_array(weights, "w")],
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)], ir_version=9)
+    onnx.save(model, str(path))
+    return weights
+
+
+def test_find_onnx_model(tmp_path):
+    (tmp_path / "onnx").mkdir()
+    _matmul_model(tmp_path / "onnx" / "model.onnx")
+    assert find_onnx_model(tmp_path) == tmp_path / "onnx" / "model.onnx"
+    with pytest.raises(FileNotFoundError):
+        find_onnx_model(tmp_path / "onnx" / "missing")
+
+
+def test_concurrent_quantization_publishes_a_complete_model(tmp_path):
+    model_path = tmp_path / "model.onnx"
+    weights = _matmul_model(model_path)
+
+    with ThreadPoolExecutor(4) as pool:
+        targets = list(pool.map(lambda _: quantized_model(model_path), range(4)))
+
+    target = tmp_path / "model_int8.onnx"
+    assert targets == [target] * 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model.onnx", "model_int8.onnx"]  # no temp files left
+
+    x = np.random.default_rng(1).standard_normal((3, 64)).astype(np.float32)
+    session = ort.InferenceSession(str(target), providers=["CPUExecutionProvider"])
+    np.testing.assert_allclose(session.run(None, {"x": x})[0], x @ weights, rtol=0.1, atol=0.2)
+    assert quantized_model(model_path) == target  # already quantized: reused
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.documents import Document
+
+from prod_assistant.mcp_servers import product_search_saver as server
+from prod_assistant.utils.concurrency import ProviderLimiter
+
+
+def _doc(title, review="Good value"):
+    return Document(page_content=review, metadata={"product_title": title, "price": "₹999", "rating": "4.5"})
+
+
+class SlowRetriever:
+    """Async retriever that takes `delay` seconds per query without blocking the loop."""
+
+    def __init__(self, docs_by_query, delay=0.0, error=None):
+        self.docs_by_query = docs_by_query
+        self.delay = delay
+        self.error = error
+        self.batches = []
+
+    def load_retriever(self):
+        return self
+
+    async def ainvoke(self, query):
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return self.docs_by_query.get(query, [])
+
+    async def abatch_retrieve(self, queries):
+        self.batches.append(list(queries))
+        if self.error:
+            raise self.error
+        return {query: self.docs_by_query.get(query, []) for query in dict.fromkeys(queries)}
+
+
+@pytest.fixture
+def use_retriever(monkeypatch):
+    def use(retriever):
+        monkeypatch.setattr(server, "retriever_obj", retriever)
+        monkeypatch.setattr(server, "retrieval_limiter", ProviderLimiter("retriever", max_concurrency=8))
+        return retriever
+
+    return use
+
+
+def test_get_product_info_formats_documents(use_retriever):
+    use_retriever(SlowRetriever({"pixel 8": [_doc("Google Pixel 8", "Great camera")]}))
+    context = asyncio.run(server.get_product_info("pixel 8"))
+    assert context == "Title: Google Pixel 8\nPrice: ₹999\nRating: 4.5\nReviews:\nGreat camera"
+    assert asyncio.run(server.get_product_info("nokia")) == "No local results found."
+
+
+def test_get_product_info_reports_errors(use_retriever):
+    use_retriever(SlowRetriever({}, error=RuntimeError("AstraDB unreachable")))
+    assert asyncio.run(server.get_product_info("pixel 8")) == "Error retrieving product info: AstraDB unreachable"
+
+
+def test_concurrent_get_product_info_calls_overlap(use_retriever):
+    use_retriever(SlowRetriever({"q": [_doc("Phone")]}, delay=0.2))
+
+    async def main():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(server.get_product_info("q") for _ in range(5)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(main())
+    assert all("Title: Phone" in r for r in results)
+    assert elapsed < 0.6  # five 0.2 s retrievals awaited concurrently, not one after another
+
+
+def test_get_product_info_batch_maps_results_by_query(use_retriever):
+    retriever = use_retriever(SlowRetriever({
+        "iphone 16": [_doc("Apple iPhone 16")],
+        "galaxy s24": [_doc("Samsung Galaxy S24"), _doc("Samsung Galaxy S24+")],
+    }))
+    reply = json.loads(asyncio.run(server.get_product_info_batch(["iphone 16", "galaxy s24", "nokia", "iphone 16"])))
+
+    assert list(reply) == ["iphone 16", "galaxy s24", "nokia"]
+    assert reply["iphone 16"].startswith("Title: Apple iPhone 16")
+    assert reply["galaxy s24"].count("Title:") == 2 and "\n\n---\n\n" in reply["galaxy s24"]
+    assert reply["nokia"] == "No local results found."
+    assert len(retriever.batches) == 1  # one retriever call for the whole batch
+
+
+def test_get_product_info_batch_reports_errors_per_query(use_retriever):
+    use_retriever(SlowRetriever({}, error=RuntimeError("AstraDB unreachable")))
+    reply = json.loads(asyncio.run(server.get_product_info_batch(["a", "b"])))
+    assert reply == {q: "Error retrieving product info: AstraDB unreachable" for q in ("a", "b")}
+
+
+def test_workflow_merges_batch_results(make_agent):
+    from test.agent_fakes import make_tools
+
+    separator = "\n\n---\n\n"
+    reply = {
+        "iPhone 16": separator.join(["Title: iPhone 16", "Title: iPhone 16 Plus"]),
+        "Galaxy S24": separator.join(["Title: Galaxy S24", "Title: iPhone 16"]),  # shared chunk kept once
+        "Pixel 8": "No local results found.",
+    }
+    requested = []
+    agent = make_agent(tools=make_tools(batch=lambda queries: requested.append(queries) or json.dumps(reply)))
+
+    merged = asyncio.run(agent._retrieve_batch(["iPhone 16", "Galaxy S24", "Pixel 8"]))
+    assert requested == [["iPhone 16", "Galaxy S24", "Pixel 8"]]
+    assert merged.split(separator) == ["Title: iPhone 16", "Title: iPhone 16 Plus", "Title: Galaxy S24"]
+
+    agent.mcp_pool.tools = make_tools(batch=json.dumps({"Pixel 8": "No local results found."}))
+    assert asyncio.run(agent._retrieve_batch(["Pixel 8", "Pixel 9"])) == "No local results found."
+    agent.mcp_pool.tools = make_tools(batch="not json")
+    assert asyncio.run(agent._retrieve_batch(["a", "b"])).startswith("Error invoking retriever")
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from prod_assistant.retriever.quantization import QUANTIZERS, load_quantizer, make_quantizer
+
+
+def _vectors(n=600, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("kind", QUANTIZERS)
+def test_encode_width_and_dtype(kind):
+    vectors = _vectors()
+    quantizer = make_quantizer(kind, pq_m=8).fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.dtype == quantizer.dtype
+    assert codes.shape == (len(vectors), quantizer.width(32))
+    assert quantizer.bytes_per_vector(32) == codes.nbytes // len(codes)
+    assert quantizer.trained_on == len(vectors)
+
+
+@pytest.mark.parametrize("kind, tolerance", [("float32", 1e-6), ("float16", 1e-3), ("int8", 0.05)])
+def test_scores_approximate_inner_products(kind, tolerance):
+    vectors = _vectors()
+    quantizer = make_quantizer(kind).fit(vectors)
+    query = vectors[3]
+    scores = quantizer.scores(query, quantizer.encode(vectors))
+    np.testing.assert_allclose(scores, vectors @ query, atol=tolerance)
+
+
+def test_pq_keeps_the_nearest_neighbour_near_the_top():
+    vectors = _vectors()
+    quantizer = make_quantizer("pq", pq_m=8).fit(vectors)
+    scores = quantizer.scores(vectors[5], quantizer.encode(vectors))
+    assert 5 in np.argsort(-scores)[:10]
+
+
+def test_pq_rejects_indivisible_dimension():
+    with pytest.raises(ValueError, match="not divisible"):
+        make_quantizer("pq", pq_m=5).fit(_vectors())
+
+
+def test_unknown_kind():
+    with pytest.raises(ValueError, match="Unsupported vector storage"):
+        make_quantizer("bf16")
+
+
+@pytest.mark.parametrize("kind", QUANTIZERS)
+def test_save_load_round_trip(kind, tmp_path):
+    vectors = _vectors()
+    quantizer = make_quantizer(kind, pq_m=8).fit(vectors[:400])
+    path = tmp_path / "quantizer.npz"
+    quantizer.save(str(path))
+
+    loaded = load_quantizer(str(path))
+    assert loaded.kind == kind
+    assert loaded.trained_on == 400
+    assert loaded.width(32) == quantizer.width(32)
+    np.testing.assert_array_equal(loaded.encode(vectors), quantizer.encode(vectors))
+    codes = quantizer.encode(vectors)
+    np.testing.assert_array_equal(loaded.scores(vectors[0], codes), quantizer.scores(vectors[0], codes))
+
+
+def test_load_missing_file(tmp_path):
+    assert load_quantizer(str(tmp_path / "missing.npz")) is None
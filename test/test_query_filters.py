@@ -0,0 +1,58 @@
+import pytest
+from langchain_core.documents import Document
+
+from prod_assistant.retriever.query_filters import (
+    PRICE_FIELD, RATING_FIELD, REVIEWS_FIELD, numeric_metadata, parse_number, parse_query_constraints,
+)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("phone under 30000", {PRICE_FIELD: {"$lte": 30000.0}}),
+    ("phone under 30000 with good camera", {PRICE_FIELD: {"$lte": 30000.0}}),
+    ("laptop under 50k with 16gb ram", {PRICE_FIELD: {"$lte": 50000.0}}),
+    ("tv under 40000 which is best", {PRICE_FIELD: {"$lte": 40000.0}}),
+    ("phones under 20000 within budget", {PRICE_FIELD: {"$lte": 20000.0}}),
+    ("phone under 25000 when on sale", {PRICE_FIELD: {"$lte": 25000.0}}),
+    ("iphone under 1,00,000 INR", {PRICE_FIELD: {"$lte": 100000.0}}),
+    ("phone below ₹15,999", {PRICE_FIELD: {"$lte": 15999.0}}),
+    ("laptop under 1.5 lakh", {PRICE_FIELD: {"$lte": 150000.0}}),
+    ("phone above 20k", {PRICE_FIELD: {"$gte": 20000.0}}),
+    ("phones between 10k and 20k", {PRICE_FIELD: {"$gte": 10000.0, "$lte": 20000.0}}),
+    ("phone rated 4.5+ under 30000", {PRICE_FIELD: {"$lte": 30000.0}, RATING_FIELD: {"$gte": 4.5}}),
+    ("phones with at least 1000 reviews", {REVIEWS_FIELD: {"$gte": 1000}}),
+])
+def test_price_rating_and_review_filters(query, expected):
+    assert parse_query_constraints(query).to_filter() == expected
+
+
+@pytest.mark.parametrize("query", [
+    "phone with 5000 mah battery",
+    "laptop with 512 gb ssd",
+    "phone with 65 w charging",
+    "tv under 55 inches",
+    "phone with 120 hz display",
+    "best phone for photos",
+])
+def test_spec_numbers_are_not_prices(query):
+    assert parse_query_constraints(query).to_filter() is None
+
+
+def test_spec_number_and_price_in_one_query():
+    constraints = parse_query_constraints("phone with 5000 mah battery under 20k")
+    assert constraints.to_filter() == {PRICE_FIELD: {"$lte": 20000.0}}
+
+
+def test_sort_order_puts_missing_values_last():
+    constraints = parse_query_constraints("cheapest iphone")
+    docs = [Document(page_content=str(p), metadata={PRICE_FIELD: p} if p else {}) for p in (300, None, 100, 200)]
+    assert constraints.sort_by == PRICE_FIELD and not constraints.descending
+    assert [d.page_content for d in constraints.order(docs)] == ["100", "200", "300", "None"]
+
+
+def test_numeric_metadata_parses_display_values():
+    assert parse_number("₹89,900") == 89900.0
+    assert parse_number(float("nan")) is None
+    assert numeric_metadata("₹89,900", "4.6", "1,234 Reviews") == {
+        PRICE_FIELD: 89900.0, RATING_FIELD: 4.6, REVIEWS_FIELD: 1234,
+    }
+    assert numeric_metadata("N/A", None, "") == {}
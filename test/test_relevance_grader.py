@@ -0,0 +1,84 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from prod_assistant.workflow.relevance_grader import LocalRelevanceGrader
+
+SEPARATOR = "\n\n---\n\n"
+
+
+class ScoreEmbeddings:
+    """The question is the x axis; a chunk "score=0.4" gets cosine 0.4 with it."""
+
+    def embed_documents(self, texts):
+        vectors = []
+        for text in texts:
+            if text.startswith("score="):
+                score = float(text.split("=")[1])
+                vectors.append([score, np.sqrt(1 - score ** 2)])
+            else:
+                vectors.append([1.0, 0.0])
+        return vectors
+
+
+def _docs(*scores):
+    return SEPARATOR.join(f"score={s}" for s in scores)
+
+
+def _grader(mode="hybrid"):
+    return LocalRelevanceGrader(ScoreEmbeddings(), mode=mode, accept_above=0.55, reject_below=0.25,
+                                separator=SEPARATOR)
+
+
+def test_best_chunk_decides_the_score():
+    assert _grader().score("q", _docs(0.1, 0.7, 0.3)) == pytest.approx(0.7)
+    assert _grader().score("q", "") == 0.0
+
+
+@pytest.mark.parametrize("scores, grade", [
+    ((0.9,), "yes"),
+    ((0.55,), "yes"),  # accept_above is inclusive
+    ((0.1, 0.2), "no"),
+    ((0.4,), None),  # ambiguous: ask the LLM
+    ((0.25,), None),
+])
+def test_hybrid_bands(scores, grade):
+    assert _grader().decide("q", _docs(*scores)) == grade
+
+
+@pytest.mark.parametrize("score, grade", [(0.45, "yes"), (0.35, "no")])
+def test_local_mode_splits_the_ambiguous_band(score, grade):
+    assert _grader("local").decide("q", _docs(score)) == grade  # midpoint 0.4
+
+
+def test_llm_mode_always_defers_and_counts():
+    grader = _grader("llm")
+    assert grader.decide("q", _docs(0.99)) is None
+    grader2 = _grader()
+    for scores in ((0.9,), (0.1,), (0.4,), (0.4,)):
+        grader2.decide("q", _docs(*scores))
+    assert grader.stats()["llm"] == 1
+    assert grader2.stats() == {"mode": "hybrid", "local_yes": 1, "local_no": 1, "llm": 2, "llm_rate": 0.5}
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported grader mode"):
+        _grader("rerank")
+
+
+def test_ambiguous_score_falls_back_to_llm_grader(make_agent):
+    agent = make_agent(config={"grader": {"mode": "hybrid"}})
+    agent.relevance_grader = _grader()
+    agent.llm.grade = "Yes, they are relevant."
+
+    async def main():
+        assert await agent._grade("q", _docs(0.9)) == "yes"
+        assert await agent._grade("q", _docs(0.1)) == "no"
+        assert agent.llm.calls == []  # decisive scores never reach the LLM
+        assert await agent._grade("q", _docs(0.4)) == "yes"
+        agent.llm.grade = "no"
+        assert await agent._grade("q", _docs(0.4)) == "no"
+        assert agent.llm.calls == ["grade", "grade"]
+
+    asyncio.run(main())
@@ -0,0 +1,131 @@
+import os
+
+import numpy as np
+import pytest
+
+from prod_assistant.cache.semantic_cache import SemanticCache, key_tokens, mark_catalog_updated
+
+
+def _unit(*values):
+    vector = np.asarray(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+A = _unit(1, 0, 0)
+A_NEAR = _unit(1, 0.05, 0)  # cosine ~0.999 with A
+B = _unit(0, 1, 0)
+C = _unit(0, 0, 1)
+
+
+def _cache(tmp_path, **kwargs):
+    kwargs.setdefault("invalidation_file", str(tmp_path / ".catalog_version"))
+    return SemanticCache(similarity_threshold=0.95, **kwargs)
+
+
+def test_similar_query_hits_and_dissimilar_misses(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(A, "price of pixel", "answer A")
+    assert cache.lookup(A_NEAR) == "answer A"
+    assert cache.lookup(B) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_expired_entry_is_a_miss_and_dropped(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=-1)
+    cache.put(A, "q", "stale")
+    assert cache.lookup(A) is None
+    assert cache.stats()["size"] == 0
+
+
+def test_entry_within_ttl_hits(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.put(A, "q", "fresh")
+    assert cache.lookup(A) == "fresh"
+
+
+def test_lru_entry_is_evicted_first(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put(A, "a", "answer A")
+    cache.put(B, "b", "answer B")
+    assert cache.lookup(A) == "answer A"  # B is now least recently used
+    cache.put(C, "c", "answer C")
+
+    assert cache.lookup(B) is None
+    assert cache.lookup(A) == "answer A"
+    assert cache.lookup(C) == "answer C"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_similar_put_replaces_entry(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put(A, "q", "old")
+    cache.put(A_NEAR, "q", "new")
+    assert cache.stats()["size"] == 1
+    assert cache.lookup(A) == "new"
+
+
+def test_invalidate_clears_everything(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(A, "a", "answer A")
+    cache.invalidate()
+    assert cache.lookup(A) is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_catalog_update_invalidates(tmp_path):
+    marker = tmp_path / ".catalog_version"
+    cache = _cache(tmp_path)
+    cache.put(A, "a", "answer A")
+    mark_catalog_updated(str(marker))
+    assert cache.lookup(A) is None
+    assert cache.stats()["invalidations"] == 1
+
+    cache.put(A, "a", "answer A2")
+    stat = marker.stat()
+    os.utime(marker, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert cache.lookup(A) is None
+    assert cache.stats()["invalidations"] == 2
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("price of iPhone 15", {"15"}),
+    ("Price of iPhone 15.", {"15"}),
+    ("Galaxy S24 Ultra 256GB", {"s24", "ultra", "256gb"}),
+    ("phones under 50,000", {"50000"}),
+    ("iPhone 15 Pro Max", {"15", "pro", "max"}),
+    ("best budget phone", set()),
+])
+def test_key_tokens(query, expected):
+    assert key_tokens(query) == expected
+
+
+def test_different_model_numbers_do_not_share_answers(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(A, "price of iPhone 16", "iPhone 16 costs 79,900")
+    assert cache.lookup(A_NEAR, "price of iPhone 15") is None
+    assert cache.lookup(A_NEAR, "Price of iPhone 16?") == "iPhone 16 costs 79,900"
+    assert cache.lookup(A_NEAR, "price of iPhone 16 Pro") is None
+    assert cache.stats()["key_mismatches"] == 2
+
+
+def test_guarded_put_keeps_both_models(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put(A, "price of iPhone 16", "sixteen")
+    cache.put(A_NEAR, "price of iPhone 15", "fifteen")
+    assert cache.stats()["size"] == 2
+    assert cache.lookup(A, "price of iphone 16") == "sixteen"
+    assert cache.lookup(A, "price of iphone 15") == "fifteen"
+
+
+def test_guard_can_be_disabled(tmp_path):
+    cache = _cache(tmp_path, match_key_tokens=False)
+    cache.put(A, "price of iPhone 16", "sixteen")
+    assert cache.lookup(A_NEAR, "price of iPhone 15") == "sixteen"
+
+
+@pytest.mark.parametrize("max_entries", [0, -5])
+def test_non_positive_max_entries_disables_cache(tmp_path, max_entries):
+    cache = _cache(tmp_path, max_entries=max_entries)
+    cache.put(A, "q", "answer")
+    assert cache.lookup(A) is None
+    assert cache.stats()["size"] == 0 and cache.stats()["max_entries"] == 0
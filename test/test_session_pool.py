@@ -0,0 +1,119 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from langchain_core.tools import ToolException
+
+from prod_assistant.mcp_servers import session_pool
+from prod_assistant.mcp_servers.session_pool import MCPSessionPool
+
+
+class FakeSession:
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.pings = 0
+
+    async def send_ping(self):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("ping failed")
+
+
+class FakeTool:
+    def __init__(self, session):
+        self.name = "get_product_info"
+        self.session = session
+
+    async def ainvoke(self, args):
+        if not self.session.alive:
+            raise ConnectionError("session closed")
+        if args.get("fail"):
+            raise ToolException("bad query")
+        return f"session {self.session.number}: {args['query']}"
+
+
+class FakeClient:
+    """MultiServerMCPClient stand-in: every session() call opens a new numbered FakeSession."""
+
+    def __init__(self):
+        self.sessions = []
+
+    @asynccontextmanager
+    async def session(self, server_name):
+        session = FakeSession(len(self.sessions) + 1)
+        self.sessions.append(session)
+        yield session
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def load_tools(session):
+        return [FakeTool(session)]
+
+    monkeypatch.setattr(session_pool, "load_mcp_tools", load_tools)
+    return FakeClient()
+
+
+def test_calls_share_one_session(client):
+    pool = MCPSessionPool(client, "hybrid_search")
+
+    async def main():
+        replies = await asyncio.gather(*(pool.call("get_product_info", {"query": f"q{i}"}) for i in range(5)))
+        await pool.aclose()
+        return replies
+
+    assert asyncio.run(main()) == [f"session 1: q{i}" for i in range(5)]
+    assert len(client.sessions) == 1
+    assert pool.stats()["connects"] == 1 and pool.stats()["calls"] == 5
+
+
+def test_dropped_session_is_reopened_and_call_retried(client):
+    pool = MCPSessionPool(client, "hybrid_search")
+
+    async def main():
+        first = await pool.call("get_product_info", {"query": "a"})
+        client.sessions[0].alive = False  # the server went away under the open session
+        second = await pool.call("get_product_info", {"query": "b"})
+        stats = pool.stats()
+        await pool.aclose()
+        return first, second, stats
+
+    first, second, stats = asyncio.run(main())
+    assert (first, second) == ("session 1: a", "session 2: b")
+    assert stats["connects"] == 2 and stats["connected"] is True and stats["in_flight"] == 0
+
+
+def test_tool_error_does_not_reconnect(client):
+    pool = MCPSessionPool(client, "hybrid_search")
+
+    async def main():
+        with pytest.raises(ToolException):
+            await pool.call("get_product_info", {"query": "a", "fail": True})
+        reply = await pool.call("get_product_info", {"query": "b"})
+        await pool.aclose()
+        return reply
+
+    assert asyncio.run(main()) == "session 1: b"
+    assert len(client.sessions) == 1
+
+
+def test_failed_keepalive_ping_reconnects(client):
+    pool = MCPSessionPool(client, "hybrid_search", keepalive_seconds=0.01)
+
+    async def main():
+        await pool.get_tools()
+        client.sessions[0].alive = False
+        for _ in range(300):  # reconnect backoff starts at 1s
+            await asyncio.sleep(0.01)
+            if len(client.sessions) == 2 and pool.stats()["connected"]:
+                break
+        reply = await pool.call("get_product_info", {"query": "a"})
+        stats = pool.stats()
+        await pool.aclose()
+        return reply, stats
+
+    reply, stats = asyncio.run(main())
+    assert reply == "session 2: a"
+    assert stats["failures"] == 1 and stats["connects"] == 2
+    assert pool.stats()["connected"] is False  # closed
@@ -0,0 +1,74 @@
+import asyncio
+
+from langchain_core.messages import HumanMessage
+from langchain_core.tools import StructuredTool
+
+from test.agent_fakes import PRODUCT_CONTEXT, make_tools
+
+WEAK_CONTEXT = "Title: Apple iPhone 16\nPrice: 79,900"  # a single chunk counts as weak retrieval
+
+
+def _state(docs):
+    return {"question": "price of iphone 16", "messages": [HumanMessage(content=docs)]}
+
+
+def _slow_web(started, cancelled):
+    """web_search tool that blocks until cancelled, recording both."""
+
+    async def web_search(query: str) -> str:
+        """Web search."""
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(query)
+            raise
+        return "too late"
+
+    return web_search
+
+
+def test_speculative_search_is_cancelled_when_docs_are_relevant(make_agent):
+    async def main():
+        started, cancelled = asyncio.Event(), []
+        tools = make_tools(product=WEAK_CONTEXT)
+        tools["web_search"] = StructuredTool.from_function(coroutine=_slow_web(started, cancelled))
+        agent = make_agent(tools=tools)
+
+        async def grade_after_search_starts(question, docs):
+            await started.wait()
+            return "yes"
+
+        agent._grade = grade_after_search_starts
+        result = await agent._grade_documents(_state(WEAK_CONTEXT))
+        await asyncio.sleep(0)  # let the cancellation reach the tool
+        assert result == {"grade": "yes"}
+        assert cancelled == ["rewritten query"]
+
+    asyncio.run(main())
+
+
+def test_speculative_result_is_used_when_docs_are_irrelevant(make_agent):
+    agent = make_agent(tools=make_tools(product=WEAK_CONTEXT, web=lambda q: f"web results for {q}"))
+    agent.llm.grade = "no"
+
+    async def main():
+        result = await agent._grade_documents(_state(WEAK_CONTEXT))
+        assert result["grade"] == "web"
+        assert result["messages"][0].content == "web results for rewritten query"
+
+        events = [e async for e in agent.stream("price of iphone 16", thread_id="t1")]
+        nodes = [e["node"] for e in events if e["type"] == "node"]
+        # The Grader already searched: no Rewriter / WebSearch nodes, straight to the Generator.
+        assert nodes == ["Assistant", "Retriever", "Grader", "WebSearch", "Generator"]
+        assert {"type": "node", "node": "WebSearch", "speculative": True} in events
+
+    asyncio.run(main())
+
+
+def test_strong_retrieval_starts_no_speculative_search(make_agent):
+    searched = []
+    agent = make_agent(tools=make_tools(product=PRODUCT_CONTEXT, web=lambda q: searched.append(q) or "web"))
+    agent.llm.grade = "no"
+    result = asyncio.run(agent._grade_documents(_state(PRODUCT_CONTEXT)))
+    assert result == {"grade": "no"} and searched == []
@@ -0,0 +1,27 @@
+import re
+
+import pytest
+
+from prod_assistant.utils.config_loader import load_config
+from prod_assistant.utils.startup_benchmark import (
+    DEFAULT_IMPORT_BUDGET, DEFAULT_LAZY_MODULES, measure_import,
+)
+
+# Only the lazy-import half of the startup budget is checked here; timings stay a manual benchmark
+# (python -m prod_assistant.utils.startup_benchmark) since they depend on the machine.
+BUDGET = load_config().get("startup_budget", {})
+ENTRYPOINTS = list(BUDGET.get("import_seconds", DEFAULT_IMPORT_BUDGET))
+LAZY_MODULES = BUDGET.get("lazy_modules", DEFAULT_LAZY_MODULES)
+
+
+@pytest.mark.parametrize("module", ENTRYPOINTS)
+def test_entrypoint_does_not_import_lazy_modules(module):
+    try:
+        _, loaded = measure_import(module, LAZY_MODULES, runs=1)
+    except RuntimeError as e:
+        # A missing lazy module imported eagerly is a failure, any other missing package a skip.
+        missing = re.search(r"No module named '([\w.]+)'", str(e))
+        if missing and missing.group(1).split(".")[0] not in LAZY_MODULES:
+            pytest.skip(f"{module} needs a package that is not installed: {e}")
+        raise
+    assert loaded == [], f"importing {module} loaded {loaded}"
@@ -0,0 +1,91 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from prod_assistant.router.engine import RAGEngine
+from test.agent_fakes import PRODUCT_CONTEXT, make_tools
+
+
+def _collect(agent, query, thread_id="t1"):
+    async def main():
+        return [event async for event in agent.stream(query, thread_id=thread_id)]
+
+    return asyncio.run(main())
+
+
+def test_stream_yields_nodes_then_tokens_then_done(make_agent):
+    agent = make_agent(tools=make_tools(product=PRODUCT_CONTEXT, web="web"))
+    events = _collect(agent, "price of iphone 16")
+
+    nodes = [e["node"] for e in events if e["type"] == "node"]
+    assert nodes == ["Assistant", "Retriever", "Grader", "Generator"]
+    tokens = [e["content"] for e in events if e["type"] == "token"]
+    assert len(tokens) > 1 and "".join(tokens) == agent.llm.answer
+    assert events[-1] == {"type": "done", "answer": agent.llm.answer}
+    # Tokens come after the Generator starts, and only from answer nodes (not the grader's "yes").
+    first_token = next(i for i, e in enumerate(events) if e["type"] == "token")
+    assert events[first_token - 1] == {"type": "node", "node": "Generator"}
+
+
+def test_stream_reports_rewrite_and_web_search_path(make_agent):
+    agent = make_agent(tools=make_tools(product=PRODUCT_CONTEXT, web="web says 80k"),
+                       config={"workflow": {"speculative_fallback": False}})
+    agent.llm.grade = "no"
+    events = _collect(agent, "price of iphone 16")
+    nodes = [e["node"] for e in events if e["type"] == "node"]
+    assert nodes == ["Assistant", "Retriever", "Grader", "Rewriter", "WebSearch", "Generator"]
+    assert events[-1]["type"] == "done"
+
+
+def test_stream_cache_hit_skips_the_graph(make_agent):
+    agent = make_agent(tools=make_tools(product=PRODUCT_CONTEXT, web="web"),
+                       config={"semantic_cache": {"enabled": True, "invalidation_file": None}})
+    first = _collect(agent, "price of iphone 16")
+    calls = list(agent.llm.calls)
+
+    again = _collect(agent, "price of iphone 16", thread_id="t2")
+    assert again == [{"type": "done", "answer": first[-1]["answer"], "cached": True}]
+    assert agent.llm.calls == calls
+
+
+def _client(agent):
+    from prod_assistant.router.main import app
+
+    engine = RAGEngine()
+    engine.agent, engine.state = agent, "ready"
+    engine._ready.set()
+    app.state.engine = engine
+    return TestClient(app)
+
+
+def _frames(body: str):
+    assert body.endswith("\n\n")
+    frames = body[:-2].split("\n\n")
+    assert all(frame.startswith("data: ") for frame in frames)
+    return [json.loads(frame[len("data: "):]) for frame in frames]
+
+
+def test_stream_endpoint_sends_sse_frames(make_agent):
+    agent = make_agent(tools=make_tools(product=PRODUCT_CONTEXT, web="web"))
+    response = _client(agent).post("/stream", data={"msg": "price of iphone 16"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "shopbuddy_session" in response.cookies
+    events = _frames(response.text)
+    assert events[0] == {"type": "node", "node": "Assistant"}
+    assert events[-1] == {"type": "done", "answer": agent.llm.answer}
+
+
+def test_stream_endpoint_reports_errors_as_a_frame(make_agent):
+    agent = make_agent(tools=make_tools(product=PRODUCT_CONTEXT, web="web"))
+
+    async def broken(query, thread_id):
+        yield {"type": "node", "node": "Assistant"}
+        raise RuntimeError("boom")
+
+    agent.stream = broken
+    events = _frames(_client(agent).post("/stream", data={"msg": "hi"}).text)
+    assert events[0] == {"type": "node", "node": "Assistant"}
+    assert events[-1]["type"] == "error" and "boom" not in events[-1]["message"]
@@ -0,0 +1,144 @@
+import asyncio
+import sqlite3
+import time
+
+
+from prod_assistant.cache.web_search_cache import WebSearchCache, normalize_query
+
+
+def _fetcher(results=None):
+    calls = []
+
+    async def fetch(query):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        return (results or {}).get(query, f"result for {query}")
+
+    return fetch, calls
+
+
+def test_normalize_query():
+    assert normalize_query("  Price of  iPhone 16?\n") == "price of iphone 16"
+
+
+def test_hit_after_miss_with_normalized_key():
+    cache = WebSearchCache()
+    fetch, calls = _fetcher()
+
+    async def main():
+        first = await cache.get_or_fetch("iPhone 16 price", lambda: fetch("a"))
+        second = await cache.get_or_fetch("iphone 16  PRICE?", lambda: fetch("b"))
+        return first, second
+
+    assert asyncio.run(main()) == ("result for a", "result for a")
+    assert calls == ["a"]
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_expired_entry_is_fetched_again():
+    cache = WebSearchCache(ttl_seconds=-1)
+    fetch, calls = _fetcher()
+
+    async def main():
+        await cache.get_or_fetch("q", lambda: fetch("a"))
+        return await cache.get_or_fetch("q", lambda: fetch("b"))
+
+    assert asyncio.run(main()) == "result for b"
+    assert calls == ["a", "b"]
+    assert cache.get("q") is None
+
+
+def test_lru_eviction():
+    cache = WebSearchCache(max_entries=2)
+
+    async def main():
+        await cache.put("a", "A")
+        await cache.put("b", "B")
+        assert cache.get("a") == "A"  # b is now least recently used
+        await cache.put("c", "C")
+
+    asyncio.run(main())
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("A", "C")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_concurrent_misses_share_one_search():
+    cache = WebSearchCache()
+    fetch, calls = _fetcher()
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_fetch("same query", lambda: fetch("x")) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result for x"] * 5
+    assert calls == ["x"]
+    assert cache.stats()["coalesced"] == 4
+
+
+def test_failures_are_not_cached():
+    cache = WebSearchCache()
+    fetch, calls = _fetcher()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("search down")
+
+    async def main():
+        results = await asyncio.gather(*(cache.get_or_fetch("q", fail) for _ in range(2)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        return await cache.get_or_fetch("q", lambda: fetch("retry"))
+
+    assert asyncio.run(main()) == "result for retry"
+
+
+def test_sqlite_persists_across_restarts(tmp_path):
+    path = str(tmp_path / "web.sqlite")
+    cache = WebSearchCache(sqlite_path=path, max_entries=2)
+
+    async def main():
+        await cache.put("a", "A")
+        await cache.put("b", "B")
+        await cache.put("c", "C")  # evicts a, in memory and on disk
+
+    asyncio.run(main())
+    cache.close()
+
+    reopened = WebSearchCache(sqlite_path=path, max_entries=2)
+    assert (reopened.get("a"), reopened.get("b"), reopened.get("c")) == (None, "B", "C")
+    assert reopened.stats()["persistent"] is True
+    reopened.close()
+
+
+def test_expired_rows_are_pruned_on_open(tmp_path):
+    path = str(tmp_path / "web.sqlite")
+    cache = WebSearchCache(sqlite_path=path, ttl_seconds=60)
+    asyncio.run(cache.put("fresh", "F"))
+    cache.close()
+    with sqlite3.connect(path) as db:
+        db.execute("INSERT INTO web_search_cache VALUES (?, ?, ?)", ("old", "O", time.time() - 120))
+
+    reopened = WebSearchCache(sqlite_path=path, ttl_seconds=60)
+    assert reopened.get("fresh") == "F"
+    assert reopened.get("old") is None
+    reopened.close()
+    with sqlite3.connect(path) as db:
+        assert [row[0] for row in db.execute("SELECT query FROM web_search_cache")] == ["fresh"]
+
+
+def test_cancelled_owner_lets_waiter_search_again():
+    cache = WebSearchCache()
+    fetch, calls = _fetcher()
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def main():
+        owner = asyncio.ensure_future(cache.get_or_fetch("q", slow))
+        await asyncio.sleep(0)
+        waiter = asyncio.ensure_future(cache.get_or_fetch("q", lambda: fetch("again")))
+        await asyncio.sleep(0)
+        owner.cancel()
+        return await asyncio.wait_for(waiter, timeout=2)
+
+    assert asyncio.run(main()) == "result for again"
+    assert calls == ["again"]